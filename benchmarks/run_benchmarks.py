@@ -0,0 +1,425 @@
+"""
+Benchmarks of the test harness itself, run against the local stub app.
+
+Times the wait helpers, the driver/auth fixtures, save_screenshot and
+configure_logging over many iterations, with no tenant or network access.
+The stub's artificial latency is part of the recorded configuration, so
+results are only compared between runs with the same settings.
+
+Examples:
+    python -m benchmarks.run_benchmarks --iterations 30 --output benchmarks/results/baseline.json
+    python -m benchmarks.run_benchmarks --baseline benchmarks/results/baseline.json --max-regression 0.2
+    python -m benchmarks.run_benchmarks --skip-browser --only logging
+"""
+import argparse
+import functools
+import json
+import logging
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.stub_app import EVENT_NAME, PASSWORD, USERNAME, StubApp
+from utils.auth_cache import AuthStateCache
+from utils.browser_profiles import PROFILES, launch_chrome
+from utils.catalog_scanner import CatalogScanner
+from utils.driver_pool import DriverPool, reset_driver
+from utils.locators import GlobalLibraryPage, LobbyPage, LoginPage, click
+from utils.log_config import configure_logging, per_test_log, stop_logging
+from utils.screenshot_helpers import flush_screenshots, save_screenshot
+from utils.timing import histogram, instrument_driver, timed_step
+from utils.wait_engine import network_sequence
+from utils.wait_helpers import (
+    close_global_library,
+    is_element_present,
+    query_locators,
+    verify_global_library_player_button_presence,
+    verify_single_player_gallery_items_absence,
+    wait_for_api_response,
+    wait_for_button_to_be_available,
+    wait_for_element_to_be_visible,
+    wait_for_element_to_be_visible_and_clickable,
+    wait_for_network_idle,
+    wait_for_page_to_load,
+    wait_for_url_to_change,
+)
+
+DEFAULT_ITERATIONS = 20
+DEFAULT_RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+STEP_PREFIX = "bench."
+# Regressions smaller than this (seconds) are treated as noise whatever their ratio
+MIN_REGRESSION_DELTA = 0.002
+
+BENCHMARKS = []
+
+
+def benchmark(name, browser=True, iterations=None):
+    """
+    Register a benchmark.
+
+    :param name: Name recorded as the "bench.<name>" step.
+    :param browser: The benchmark needs Chrome and the stub app.
+    :param iterations: Fixed iteration count, for benchmarks too slow for the default.
+    """
+    def decorator(func):
+        BENCHMARKS.append((name, browser, iterations, func))
+        return func
+    return decorator
+
+
+class BenchmarkContext:
+    """State shared by the benchmarks of one run: stub app, browser and scratch directory."""
+
+    def __init__(self, app, iterations, warmup, work_dir):
+        self.app = app
+        self.iterations = iterations
+        self.warmup = warmup
+        self.work_dir = work_dir
+        self._driver = None
+        self._logged_in = False
+
+    @property
+    def driver(self):
+        if self._driver is None:
+            self._driver = instrument_driver(launch_chrome(PROFILES["fast"]))
+        return self._driver
+
+    def login(self, driver=None):
+        """UI login on the stub, the same steps as login_to_lobby in the test suite."""
+        driver = driver or self.driver
+        driver.get(self.app.login_url)
+        wait_for_page_to_load(driver)
+        wait_for_element_to_be_visible_and_clickable(driver, *LoginPage.USERNAME).send_keys(USERNAME)
+        wait_for_element_to_be_visible_and_clickable(driver, *LoginPage.PASSWORD).send_keys(PASSWORD)
+        wait_for_element_to_be_visible_and_clickable(driver, *LoginPage.SIGN_IN).click()
+        return wait_for_element_to_be_visible_and_clickable(driver, *LoginPage.WELCOME_MESSAGE, timeout=30)
+
+    def open_lobby(self, settle=True):
+        """Load the lobby, by default also letting it finish loading, outside of the measured block."""
+        if not self._logged_in:
+            self.login()
+            self._logged_in = True
+        self.driver.get(self.app.lobby_url)
+        if settle:
+            wait_for_network_idle(self.driver)
+
+    def repeat(self, name, action, setup=None, teardown=None, iterations=None):
+        """
+        Time `action` as the "bench.<name>" step.
+
+        :param setup: Called before each iteration, untimed; its return value is passed to `action`.
+        :param teardown: Called after each iteration with the action's return value, untimed.
+        :param iterations: Overrides the run's iteration count.
+        """
+        total = iterations or self.iterations
+        for index in range(self.warmup + total):
+            state = setup() if setup else None
+            if index < self.warmup:
+                result = action(state)
+            else:
+                with timed_step(f"{STEP_PREFIX}{name}"):
+                    result = action(state)
+            if teardown:
+                teardown(result)
+
+    def close(self):
+        if self._driver is not None:
+            self._driver.quit()
+            self._driver = None
+
+
+# --- Wait helpers -----------------------------------------------------------------------------
+
+@benchmark("wait_for_page_to_load")
+def bench_wait_for_page_to_load(ctx, name, iterations):
+    # Measured right after navigation, while the events API request is still pending
+    ctx.repeat(name, lambda _: wait_for_page_to_load(ctx.driver), lambda: ctx.open_lobby(settle=False),
+               iterations=iterations)
+
+
+@benchmark("wait_for_url_to_change")
+def bench_wait_for_url_to_change(ctx, name, iterations):
+    def action(original_url):
+        ctx.driver.execute_script("window.location.hash = '#/' + Date.now();")
+        wait_for_url_to_change(ctx.driver, original_url)
+
+    def setup():
+        ctx.open_lobby()
+        return ctx.driver.current_url
+    ctx.repeat(name, action, setup, iterations=iterations)
+
+
+@benchmark("wait_for_element_to_be_visible")
+def bench_wait_for_element_to_be_visible(ctx, name, iterations):
+    ctx.repeat(name, lambda _: wait_for_element_to_be_visible(ctx.driver, *LoginPage.WELCOME_MESSAGE),
+               ctx.open_lobby, iterations=iterations)
+
+
+@benchmark("wait_for_element_to_be_visible_and_clickable")
+def bench_wait_for_element_to_be_visible_and_clickable(ctx, name, iterations):
+    ctx.repeat(name, lambda _: wait_for_element_to_be_visible_and_clickable(ctx.driver, *LobbyPage.GLOBAL_GALLERY_BUTTON),
+               ctx.open_lobby, iterations=iterations)
+
+
+@benchmark("wait_for_button_to_be_available")
+def bench_wait_for_button_to_be_available(ctx, name, iterations):
+    ctx.repeat(name, lambda _: wait_for_button_to_be_available(ctx.driver, *LobbyPage.GLOBAL_GALLERY_BUTTON),
+               ctx.open_lobby, iterations=iterations)
+
+
+@benchmark("wait_for_network_idle")
+def bench_wait_for_network_idle(ctx, name, iterations):
+    ctx.repeat(name, lambda _: wait_for_network_idle(ctx.driver), ctx.open_lobby, iterations=iterations)
+
+
+@benchmark("wait_for_api_response")
+def bench_wait_for_api_response(ctx, name, iterations):
+    def action(_):
+        since = network_sequence(ctx.driver)
+        click(ctx.driver, LobbyPage.GLOBAL_GALLERY_BUTTON)
+        wait_for_api_response(ctx.driver, "/api/campaigns", since=since)
+    ctx.repeat(name, action, ctx.open_lobby, iterations=iterations)
+
+
+@benchmark("query_locators")
+def bench_query_locators(ctx, name, iterations):
+    locators = [LoginPage.WELCOME_MESSAGE, LobbyPage.GLOBAL_GALLERY_BUTTON, LobbyPage.EVENT_NAMES,
+                LobbyPage.JOIN_BUTTON, GlobalLibraryPage.TITLE]
+    ctx.repeat(name, lambda _: query_locators(ctx.driver, locators), ctx.open_lobby, iterations=iterations)
+
+
+@benchmark("is_element_present")
+def bench_is_element_present(ctx, name, iterations):
+    ctx.repeat(name, lambda _: is_element_present(ctx.driver, *GlobalLibraryPage.MAIN_CONTAINER),
+               ctx.open_lobby, iterations=iterations)
+
+
+@benchmark("verify_single_player_gallery_items_absence")
+def bench_verify_single_player_gallery_items_absence(ctx, name, iterations):
+    ctx.repeat(name, lambda _: verify_single_player_gallery_items_absence(ctx.driver), ctx.open_lobby,
+               iterations=iterations)
+
+
+@benchmark("verify_global_library_player_button_presence")
+def bench_verify_global_library_player_button_presence(ctx, name, iterations):
+    ctx.repeat(name, lambda _: verify_global_library_player_button_presence(ctx.driver), ctx.open_lobby,
+               iterations=iterations)
+
+
+# verify_global_library_player_button_absence is not benchmarked: its duration is its fixed 5 s timeout.
+
+
+@benchmark("close_global_library")
+def bench_close_global_library(ctx, name, iterations):
+    def setup():
+        ctx.open_lobby()
+        click(ctx.driver, LobbyPage.GLOBAL_GALLERY_BUTTON)
+        wait_for_element_to_be_visible(ctx.driver, *GlobalLibraryPage.TITLE)
+    ctx.repeat(name, lambda _: close_global_library(ctx.driver), setup, iterations=iterations)
+
+
+@benchmark("catalog_scan.find")
+def bench_catalog_scan(ctx, name, iterations):
+    ctx.repeat(name, lambda _: CatalogScanner(ctx.driver, LobbyPage.EVENT_NAMES).find(EVENT_NAME), ctx.open_lobby,
+               iterations=iterations)
+
+
+# --- Fixtures ---------------------------------------------------------------------------------
+
+@benchmark("fixture.launch_chrome", iterations=3)
+def bench_launch_chrome(ctx, name, iterations):
+    ctx.repeat(name, lambda _: launch_chrome(PROFILES["fast"]), teardown=lambda driver: driver.quit(),
+               iterations=iterations)
+
+
+@benchmark("fixture.setup_driver")
+def bench_setup_driver(ctx, name, iterations):
+    """Release (reset) and re-acquire a pooled browser, as setup_driver does between two tests."""
+    pool = DriverPool(size=1, factory=functools.partial(launch_chrome, PROFILES["fast"])).start()
+    leased = [pool.acquire()]
+
+    def setup():
+        ctx.login(leased[0])  # Leave cookies, storage and a loaded page behind, like a test would
+
+    def action(_):
+        pool.release(leased[0])
+        leased[0] = pool.acquire()
+    try:
+        ctx.repeat(name, action, setup, iterations=iterations)
+    finally:
+        pool.release(leased[0])
+        pool.close()
+
+
+@benchmark("fixture.player_driver.cached")
+def bench_player_driver_cached(ctx, name, iterations):
+    auth_cache = AuthStateCache(lambda driver, role: ctx.login(driver))
+    auth_cache.authenticate(ctx.driver, "player")
+    ctx.repeat(name, lambda _: auth_cache.authenticate(ctx.driver, "player"), lambda: reset_driver(ctx.driver),
+               iterations=iterations)
+    ctx.open_lobby()
+
+
+@benchmark("fixture.player_driver.ui_login")
+def bench_player_driver_ui_login(ctx, name, iterations):
+    auth_cache = AuthStateCache(lambda driver, role: ctx.login(driver))
+
+    def setup():
+        auth_cache.invalidate("player")
+        reset_driver(ctx.driver)
+    ctx.repeat(name, lambda _: auth_cache.authenticate(ctx.driver, "player"), setup, iterations=iterations)
+    ctx.open_lobby()
+
+
+# --- Screenshots ------------------------------------------------------------------------------
+
+@benchmark("save_screenshot")
+def bench_save_screenshot(ctx, name, iterations):
+    """Time spent in the test: capture and hand-off to the background pipeline."""
+    directory = os.path.join(ctx.work_dir, "screenshots")
+    ctx.repeat(name, lambda _: save_screenshot(ctx.driver, directory, f"{name}.png"), ctx.open_lobby,
+               iterations=iterations)
+    flush_screenshots()
+
+
+@benchmark("save_screenshot.flushed")
+def bench_save_screenshot_flushed(ctx, name, iterations):
+    """Capture plus the background decode and write, end to end."""
+    directory = os.path.join(ctx.work_dir, "screenshots")
+
+    def action(_):
+        save_screenshot(ctx.driver, directory, f"{name}.png")
+        flush_screenshots()
+    ctx.repeat(name, action, ctx.open_lobby, iterations=iterations)
+
+
+# --- Logging ----------------------------------------------------------------------------------
+
+@benchmark("configure_logging.first_call", browser=False)
+def bench_configure_logging_first_call(ctx, name, iterations):
+    session_log = os.path.join(ctx.work_dir, "session.log")
+    ctx.repeat(name, lambda _: configure_logging(session_log), setup=stop_logging, iterations=iterations)
+
+
+@benchmark("logging.per_test_log_100_records", browser=False)
+def bench_per_test_log(ctx, name, iterations):
+    configure_logging(os.path.join(ctx.work_dir, "session.log"))
+
+    def action(_):
+        with per_test_log(os.path.join(ctx.work_dir, "per_test.log")):
+            for index in range(100):
+                logging.info(f"Benchmark record {index}.")
+    ctx.repeat(name, action, iterations=iterations)
+
+
+def run_benchmarks(iterations=DEFAULT_ITERATIONS, warmup=1, latency_ms=0, api_latency_ms=0,
+                   skip_browser=False, only=None):
+    """
+    Run the registered benchmarks.
+
+    :param iterations: Timed iterations per benchmark (after `warmup` untimed ones).
+    :param latency_ms: Stub app delay for page responses.
+    :param api_latency_ms: Stub app delay for API responses.
+    :param skip_browser: Only run the benchmarks that need no browser.
+    :param only: Only run benchmarks whose name contains one of these substrings.
+    :return: Results dict: run configuration and one timing row per benchmark.
+    """
+    histogram.reset()
+    work_dir = tempfile.mkdtemp(prefix="harness_bench_")
+    app = StubApp(latency_ms=latency_ms, api_latency_ms=api_latency_ms).start()
+    ctx = BenchmarkContext(app, iterations, warmup, work_dir)
+    configure_logging(os.path.join(work_dir, "session.log"))
+    try:
+        for name, browser, fixed_iterations, func in BENCHMARKS:
+            if (skip_browser and browser) or (only and not any(part in name for part in only)):
+                continue
+            started = time.perf_counter()
+            func(ctx, name, fixed_iterations)
+            print(f"{name}: done in {time.perf_counter() - started:.1f} s", file=sys.stderr)
+    finally:
+        ctx.close()
+        app.stop()
+        stop_logging()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    rows = [dict(row, step=row["step"][len(STEP_PREFIX):]) for row in histogram.summary()
+            if row["step"].startswith(STEP_PREFIX)]
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {"iterations": iterations, "warmup": warmup, "latency_ms": latency_ms,
+                   "api_latency_ms": api_latency_ms, "profile": "fast"},
+        "benchmarks": rows,
+    }
+
+
+def compare_results(current, baseline, max_regression=0.2, statistic="p50"):
+    """
+    Find benchmarks that got slower than the baseline.
+
+    :param current: Results of this run.
+    :param baseline: Results of an earlier run, loaded from its JSON file.
+    :param max_regression: Allowed relative slowdown, e.g. 0.2 for 20 %.
+    :param statistic: Timing statistic to compare ("p50", "p95", "mean", ...).
+    :return: List of dicts (benchmark, baseline, current, ratio), slowest first.
+    """
+    if current["config"] != baseline["config"]:
+        logging.warning(f"Comparing runs with different settings: {baseline['config']} vs {current['config']}.")
+    previous = {row["step"]: row for row in baseline["benchmarks"]}
+    regressions = []
+    for row in current["benchmarks"]:
+        before = previous.get(row["step"])
+        if before is None or not before[statistic]:
+            continue
+        ratio = row[statistic] / before[statistic]
+        if ratio > 1 + max_regression and row[statistic] - before[statistic] > MIN_REGRESSION_DELTA:
+            regressions.append({"benchmark": row["step"], "baseline": before[statistic],
+                                "current": row[statistic], "ratio": ratio})
+    return sorted(regressions, key=lambda regression: -regression["ratio"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the test harness against the local stub app.")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--latency-ms", type=int, default=0, help="Stub app delay for page responses.")
+    parser.add_argument("--api-latency-ms", type=int, default=0, help="Stub app delay for API responses.")
+    parser.add_argument("--skip-browser", action="store_true", help="Only run benchmarks that need no browser.")
+    parser.add_argument("--only", nargs="*", help="Only run benchmarks whose name contains one of these.")
+    parser.add_argument("--output", default=None,
+                        help="Results file (default: benchmarks/results/benchmark_<timestamp>.json).")
+    parser.add_argument("--baseline", default=None, help="Earlier results file to compare against.")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed relative slowdown of p50.")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.iterations, args.warmup, args.latency_ms, args.api_latency_ms,
+                             args.skip_browser, args.only)
+    output = args.output or os.path.join(
+        DEFAULT_RESULTS_DIR, f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"{'benchmark':<50}{'p50 ms':>10}{'p95 ms':>10}{'commands':>10}")
+    for row in results["benchmarks"]:
+        print(f"{row['step']:<50}{row['p50'] * 1000:>10.1f}{row['p95'] * 1000:>10.1f}{row['commands_per_call']:>10.1f}")
+    print(f"Results written to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_results(results, json.load(f), args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION {regression['benchmark']}: {regression['baseline'] * 1000:.1f} ms -> "
+                  f"{regression['current'] * 1000:.1f} ms ({regression['ratio']:.2f}x)")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""
+Local stand-in for the application under test, used by the harness benchmarks.
+
+Serves a login page, a lobby with an events gallery and a "Join" button, and a
+Global Library overlay whose campaigns are loaded from a JSON API - with the
+class names, element names and texts the locators in utils/locators.py expect.
+Every response can be delayed to emulate a slower tenant.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+USERNAME = "44@cympire.com"
+PASSWORD = "234!"
+EVENT_NAME = "Extreme Measures"
+
+LOGIN_PAGE = """<!DOCTYPE html>
+<html><head><title>Login</title></head><body>
+<form method="post" action="/login">
+  <input name="username" type="text">
+  <input name="password" type="password">
+  <button name="sign in" type="submit">Sign in</button>
+</form>
+</body></html>"""
+
+LOBBY_PAGE = """<!DOCTYPE html>
+<html><head><title>Lobby</title>
+<style>
+  .GlobalLibraryMainContainer { display: none; }
+  .GlobalLibraryMainContainer.open { display: block; }
+  .LobbyJoinButton, .PickItButton { visibility: hidden; }
+  .EventsGalleryItemContainer:hover .LobbyJoinButton, .CampaignItem:hover .PickItButton { visibility: visible; }
+</style></head><body>
+<div class="WelcomeMsgName">Hello Player</div>
+<button class="sc-a GlobalGalleryButton">Gallery</button>
+<div id="events"></div>
+<span id="event-welcome"></span>
+<div class="sc-b GlobalLibraryMainContainer">
+  <div class="sc-c GlobalLibraryTitle">Global Library</div>
+  <button class="close_GlobalLibrary_button">Close</button>
+  <input class="search-filter_search_field__1ZFKm" type="text">
+  <div id="campaigns"></div>
+</div>
+<script>
+  var library = document.querySelector(".GlobalLibraryMainContainer");
+  function loadCampaigns(query) {
+    return fetch("/api/campaigns?q=" + encodeURIComponent(query || "")).then(function (r) { return r.json(); })
+      .then(function (names) {
+        document.getElementById("campaigns").innerHTML = names.map(function (name) {
+          return '<div class="CampaignItem"><div class="sc-d CampaignName">' + name + '</div>' +
+                 '<button class="sc-e PickItButton">Pick it</button></div>';
+        }).join("");
+      });
+  }
+  fetch("/api/events").then(function (r) { return r.json(); }).then(function (names) {
+    document.getElementById("events").innerHTML = names.map(function (name) {
+      return '<div class="sc-eNSrOW bfIymq EventsGalleryItemContainer"><span class="sc-kCMKrZ x">' + name + '</span>' +
+             '<button class="sc-f LobbyJoinButton">Join</button></div>';
+    }).join("");
+  });
+  document.querySelector(".GlobalGalleryButton").addEventListener("click", function () {
+    library.classList.add("open");
+    loadCampaigns("");
+  });
+  document.querySelector(".close_GlobalLibrary_button").addEventListener("click", function () {
+    library.classList.remove("open");
+  });
+  document.querySelector(".search-filter_search_field__1ZFKm").addEventListener("input", function (e) {
+    loadCampaigns(e.target.value);
+  });
+  document.addEventListener("click", function (e) {
+    if (e.target.classList.contains("LobbyJoinButton")) {
+      document.getElementById("event-welcome").textContent = "Welcome to " + e.target.previousSibling.textContent;
+    }
+  });
+</script>
+</body></html>"""
+
+
+class StubApp:
+    """
+    The stand-in application served from a background thread.
+
+    :param latency_ms: Delay added to every page response.
+    :param api_latency_ms: Delay added to every /api response.
+    :param events: Number of events in the Lobby gallery (the target event is last).
+    :param campaigns: Number of campaigns in the Global Library (the target event is last).
+    """
+
+    def __init__(self, latency_ms=0, api_latency_ms=0, events=20, campaigns=50):
+        self.latency_ms = latency_ms
+        self.api_latency_ms = api_latency_ms
+        self.events = [f"Event {i}" for i in range(events - 1)] + [EVENT_NAME]
+        self.campaigns = [f"Campaign {i}" for i in range(campaigns - 1)] + [EVENT_NAME]
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def login_url(self):
+        return f"{self.base_url}/login"
+
+    @property
+    def lobby_url(self):
+        return f"{self.base_url}/lobby"
+
+    def start(self):
+        app = self
+
+        class Handler(_StubHandler):
+            stub = app
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-app", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    stub = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+    def _send(self, status, body=b"", content_type="text/html", headers=()):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authenticated(self):
+        return f"session={USERNAME}" in self.headers.get("Cookie", "")
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path.startswith("/api/"):
+            time.sleep(self.stub.api_latency_ms / 1000)
+            if not self._authenticated():
+                return self._send(401, b"[]", "application/json")
+            if url.path == "/api/events":
+                return self._send(200, json.dumps(self.stub.events).encode(), "application/json")
+            if url.path == "/api/campaigns":
+                query = parse_qs(url.query).get("q", [""])[0].lower()
+                names = [name for name in self.stub.campaigns if query in name.lower()]
+                return self._send(200, json.dumps(names).encode(), "application/json")
+            return self._send(404)
+        time.sleep(self.stub.latency_ms / 1000)
+        if url.path in ("/", "/login"):
+            return self._send(200, LOGIN_PAGE.encode())
+        if url.path == "/lobby":
+            if not self._authenticated():
+                return self._send(302, headers=[("Location", "/login")])
+            return self._send(200, LOBBY_PAGE.encode())
+        return self._send(404)
+
+    def do_POST(self):
+        time.sleep(self.stub.latency_ms / 1000)
+        length = int(self.headers.get("Content-Length", 0))
+        form = parse_qs(self.rfile.read(length).decode())
+        if urlsplit(self.path).path != "/login":
+            return self._send(404)
+        if form.get("username") == [USERNAME] and form.get("password") == [PASSWORD]:
+            return self._send(303, headers=[("Location", "/lobby"), ("Set-Cookie", f"session={USERNAME}; Path=/")])
+        return self._send(303, headers=[("Location", "/login")])
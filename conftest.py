@@ -0,0 +1 @@
+pytest_plugins = ["pytester", "utils.duration_scheduler", "utils.artifact_recorder", "utils.resilience"]
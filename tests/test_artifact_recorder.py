@@ -0,0 +1,129 @@
+import base64
+import json
+import os
+
+from utils.artifact_recorder import ArtifactRecorder
+from utils.screenshot_helpers import flush_screenshots
+
+PNG = base64.b64encode(b"\x89PNG fake screenshot").decode()
+
+
+class FakeDriver:
+    """Counts the browser reads a recorder makes."""
+
+    def __init__(self):
+        self.url = "https://tenant.example.com/#/lobby"
+        self.reads = 0
+
+    def execute_script(self, script, *args):
+        self.reads += 1
+        return [self.url, "<html><body>Lobby</body></html>"]
+
+    def get_screenshot_as_base64(self):
+        self.reads += 1
+        return PNG
+
+
+def written(artifact_dir):
+    return sorted(os.listdir(artifact_dir))
+
+
+def test_ring_keeps_the_last_steps_with_running_indexes(tmp_path):
+    recorder = ArtifactRecorder(str(tmp_path), capacity=3)
+    for step in ("login", "lobby", "gallery", "join"):
+        recorder.record(FakeDriver(), step)
+
+    assert [(s.index, s.step) for s in recorder.snapshots] == [(2, "lobby"), (3, "gallery"), (4, "join")]
+
+
+def test_steps_do_not_read_the_browser_by_default(tmp_path):
+    driver = FakeDriver()
+    recorder = ArtifactRecorder(str(tmp_path), step_capture=False)
+    recorder.record(driver, "login")
+    recorder.record(driver, "lobby", error="Join button missing")
+    assert driver.reads == 0
+
+    recorder.dump(error="test failed")
+    flush_screenshots()
+
+    # Only the final failure snapshot reads the browser: DOM and URL, then the screenshot
+    assert driver.reads == 2
+    assert written(tmp_path) == ["001_login.json", "002_lobby.json", "003_failure.html", "003_failure.json",
+                                 "003_failure.png"]
+    with open(tmp_path / "002_lobby.json") as f:
+        assert json.load(f)["error"] == "Join button missing"
+    with open(tmp_path / "003_failure.json") as f:
+        assert json.load(f)["url"] == "https://tenant.example.com/#/lobby"
+
+
+def test_step_capture_reads_the_browser_at_every_step(tmp_path):
+    driver = FakeDriver()
+    recorder = ArtifactRecorder(str(tmp_path), step_capture=True)
+    recorder.record(driver, "login")
+    recorder.record(driver, "lobby")
+
+    assert driver.reads == 4
+    assert all(s.dom and s.screenshot_base64 == PNG for s in recorder.snapshots)
+
+
+def test_only_the_first_dump_writes(tmp_path):
+    recorder = ArtifactRecorder(str(tmp_path))
+    recorder.record(FakeDriver(), "login")
+
+    assert recorder.dump(error="explicit") != []
+    assert recorder.dump(error="from the hook") == []
+    flush_screenshots()
+    assert len([name for name in written(tmp_path) if name.endswith("_failure.json")]) == 1
+
+
+def test_passing_test_writes_nothing(tmp_path):
+    recorder = ArtifactRecorder(str(tmp_path / "artifacts"))
+    recorder.record(FakeDriver(), "login")
+
+    assert not os.path.exists(tmp_path / "artifacts")
+
+
+def test_hook_dumps_failed_tests_once(pytester):
+    pytester.makepyfile(test_sample="""
+        import os
+        import pytest
+        from utils.artifact_recorder import recording
+
+        class Driver:
+            def execute_script(self, script, *args):
+                return ["https://tenant.example.com/#/lobby", "<html></html>"]
+
+            def get_screenshot_as_base64(self):
+                return ""
+
+        @pytest.fixture()
+        def recorder(request):
+            with recording(request.node, os.path.join("artifacts", request.node.name)) as recorder:
+                yield recorder
+
+        def test_passes(recorder):
+            recorder.record(Driver(), "login")
+
+        def test_fails(recorder):
+            recorder.record(Driver(), "login")
+            try:
+                assert False, "Welcome message missing"
+            except AssertionError as e:
+                recorder.dump(error=e)
+                raise
+
+        def test_fails_without_dump(recorder):
+            recorder.record(Driver(), "login")
+            assert False, "Join button missing"
+    """)
+
+    result = pytester.runpytest("-p", "utils.artifact_recorder")
+
+    result.assert_outcomes(passed=1, failed=2)
+    assert sorted(os.listdir(pytester.path / "artifacts")) == ["test_fails", "test_fails_without_dump"]
+    failures = [name for name in os.listdir(pytester.path / "artifacts" / "test_fails") if "failure" in name]
+    assert sorted(failures) == ["002_failure.html", "002_failure.json"]
+    with open(pytester.path / "artifacts" / "test_fails" / "002_failure.json") as f:
+        assert "Welcome message missing" in json.load(f)["error"]
+    with open(pytester.path / "artifacts" / "test_fails_without_dump" / "002_failure.json") as f:
+        assert "call failed: AssertionError: Join button missing" in json.load(f)["error"]
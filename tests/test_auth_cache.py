@@ -0,0 +1,132 @@
+from utils import auth_cache
+from utils.auth_cache import AuthStateCache
+
+LOGIN_URL = "https://tenant.example.com/#/login"
+LOBBY_URL = "https://tenant.example.com/#/lobby"
+
+
+class FakeApplication:
+    """Server side of the fake tenant: which session cookies it still accepts."""
+
+    def __init__(self):
+        self.valid_sessions = set()
+        self.sessions = 0
+        # How a rejected session shows: a 401 on the API call or a client-side redirect to the login page
+        self.rejection = "xhr"
+
+
+class FakeDriver:
+    """Just enough of a WebDriver for AuthStateCache and the network-idle wait."""
+
+    def __init__(self, app):
+        self.app = app
+        self.current_url = "about:blank"
+        self.cookies = []
+        self.storage = {"local": {}, "session": {}}
+        self.statuses = []
+        self.visited = []
+
+    def get(self, url):
+        self.visited.append(url)
+        self.current_url = url
+        self.statuses = [200]
+
+    def get_cookies(self):
+        return list(self.cookies)
+
+    def add_cookie(self, cookie):
+        self.cookies.append(cookie)
+
+    def set_script_timeout(self, timeout):
+        pass
+
+    def execute_async_script(self, script, *args):
+        # The page goes idle: its session check has answered and the SPA has reacted to it
+        if self.current_url == LOBBY_URL and not self._session_accepted():
+            if self.app.rejection == "redirect":
+                self.current_url = LOGIN_URL
+            else:
+                self.statuses.append(401)
+        return True
+
+    def execute_script(self, script, *args):
+        if script == auth_cache._SNAPSHOT_STORAGE_SCRIPT:
+            return self.storage
+        if script == auth_cache._RESTORE_STORAGE_SCRIPT:
+            self.storage = args[0]
+            return None
+        if script == auth_cache._RESPONSE_STATUSES_SCRIPT:
+            return list(self.statuses)
+        raise AssertionError("Unexpected script")
+
+    def _session_accepted(self):
+        return any(cookie["value"] in self.app.valid_sessions for cookie in self.cookies)
+
+
+def make_cache(app, **kwargs):
+    logins = []
+
+    def login(driver, role):
+        app.sessions += 1
+        session = f"session-{app.sessions}"
+        app.valid_sessions.add(session)
+        driver.cookies = [{"name": "sid", "value": session, "expiry": 1.9e9}]
+        driver.storage = {"local": {"token": session}, "session": {}}
+        driver.current_url = LOBBY_URL
+        logins.append(role)
+
+    return AuthStateCache(login, **kwargs), logins
+
+
+def test_second_driver_restores_the_cached_session():
+    app = FakeApplication()
+    cache, logins = make_cache(app)
+    cache.authenticate(FakeDriver(app), "player")
+
+    driver = FakeDriver(app)
+    cache.authenticate(driver, "player")
+
+    assert logins == ["player"]
+    assert driver.visited == ["https://tenant.example.com/favicon.ico", LOBBY_URL]
+    assert driver.cookies == [{"name": "sid", "value": "session-1", "expiry": 1900000000}]
+    assert driver.storage["local"] == {"token": "session-1"}
+
+
+def test_session_rejected_by_an_api_call_logs_in_again():
+    app = FakeApplication()
+    cache, logins = make_cache(app)
+    cache.authenticate(FakeDriver(app), "player")
+    app.valid_sessions.clear()  # e.g. the server revoked the session
+
+    driver = FakeDriver(app)
+    cache.authenticate(driver, "player")
+
+    assert logins == ["player", "player"]
+    assert driver.cookies[-1]["value"] == "session-2"
+    # The new session is cached and restored next time
+    cache.authenticate(FakeDriver(app), "player")
+    assert logins == ["player", "player"]
+
+
+def test_client_side_redirect_to_login_logs_in_again():
+    app = FakeApplication()
+    app.rejection = "redirect"
+    cache, logins = make_cache(app)
+    cache.authenticate(FakeDriver(app), "player")
+    app.valid_sessions.clear()
+
+    cache.authenticate(FakeDriver(app), "player")
+
+    assert logins == ["player", "player"]
+
+
+def test_expired_snapshot_is_not_restored():
+    app = FakeApplication()
+    cache, logins = make_cache(app, ttl=-1)
+    cache.authenticate(FakeDriver(app), "player")
+
+    driver = FakeDriver(app)
+    cache.authenticate(driver, "player")
+
+    assert logins == ["player", "player"]
+    assert driver.visited == []
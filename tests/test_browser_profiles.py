@@ -0,0 +1,14 @@
+from fnmatch import fnmatchcase
+
+import pytest
+
+from utils.auth_cache import AuthStateCache
+from utils.browser_profiles import PROFILES
+
+
+@pytest.mark.parametrize("profile", PROFILES.values(), ids=list(PROFILES))
+def test_auth_restore_path_is_not_blocked(profile):
+    restore_url = "https://tenant.example.com" + AuthStateCache(login=None).restore_path
+    blocked = [pattern for pattern in profile.blocked_urls if fnmatchcase(restore_url, pattern)]
+
+    assert not blocked, f"{profile.name} blocks the auth restore page {restore_url} with {blocked}"
@@ -0,0 +1,123 @@
+import itertools
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from utils.driver_pool import DriverPool, reset_driver
+
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, handle):
+        self.driver.current_window_handle = handle
+
+
+class FakeDriver:
+    """Just enough of a Chrome WebDriver for the pool and reset_driver."""
+    ids = itertools.count(1)
+
+    def __init__(self, fail_reset=False):
+        self.id = next(self.ids)
+        self.fail_reset = fail_reset
+        self.window_handles = ["main", "popup"]
+        self.current_window_handle = "main"
+        self.origins = {"main": "https://tenant.example.com", "popup": "https://sso.example.com"}
+        self.switch_to = FakeSwitchTo(self)
+        self.cdp_commands = []
+        self.closed_windows = []
+        self.url = None
+        self.quit_called = False
+
+    def execute(self, command, params=None):
+        return {"value": None}
+
+    def execute_script(self, script, *args):
+        if self.fail_reset:
+            raise WebDriverException("chrome not reachable")
+        return self.origins[self.current_window_handle]
+
+    def execute_cdp_cmd(self, command, params):
+        self.cdp_commands.append((command, params))
+        return {}
+
+    def close(self):
+        self.closed_windows.append(self.current_window_handle)
+        self.window_handles.remove(self.current_window_handle)
+
+    def get(self, url):
+        self.url = url
+
+    def quit(self):
+        self.quit_called = True
+
+
+class FlakyFactory:
+    def __init__(self):
+        self.fail = False
+        self.launched = []
+
+    def __call__(self):
+        if self.fail:
+            raise WebDriverException("session not created")
+        driver = FakeDriver()
+        self.launched.append(driver)
+        return driver
+
+
+def test_reset_clears_cookies_of_every_domain_and_storage_of_open_origins():
+    driver = FakeDriver()
+    reset_driver(driver)
+
+    assert driver.closed_windows == ["popup"]
+    assert driver.current_window_handle == "main" and driver.url == "about:blank"
+    assert driver.cdp_commands == [
+        ("Network.clearBrowserCookies", {}),
+        ("Storage.clearDataForOrigin", {"origin": "https://sso.example.com", "storageTypes": "all"}),
+        ("Storage.clearDataForOrigin", {"origin": "https://tenant.example.com", "storageTypes": "all"}),
+    ]
+
+
+def test_browser_is_recycled_after_max_uses():
+    factory = FlakyFactory()
+    pool = DriverPool(size=1, max_uses=2, factory=factory).start()
+    first = pool.acquire(timeout=1)
+    pool.release(first)
+    assert pool.acquire(timeout=1) is first
+    pool.release(first)
+
+    assert first.quit_called
+    assert pool.acquire(timeout=1) is factory.launched[1]
+
+
+def test_failed_replacement_is_relaunched_on_next_acquire():
+    factory = FlakyFactory()
+    pool = DriverPool(size=1, max_uses=1, factory=factory).start()
+    driver = pool.acquire(timeout=1)
+    factory.fail = True
+    pool.release(driver)  # Recycling fails; the slot is left vacant
+
+    with pytest.raises(WebDriverException):
+        pool.acquire(timeout=1)  # Fails with the launch error instead of waiting for the timeout
+    factory.fail = False
+    replacement = pool.acquire(timeout=1)
+    assert replacement is factory.launched[-1] and replacement is not driver
+
+
+def test_browser_whose_reset_fails_is_replaced():
+    factory = FlakyFactory()
+    pool = DriverPool(size=1, factory=factory).start()
+    driver = pool.acquire(timeout=1)
+    driver.fail_reset = True
+    pool.release(driver)
+
+    assert driver.quit_called
+    assert pool.acquire(timeout=1) is factory.launched[1]
+
+
+def test_acquire_times_out_when_every_browser_is_leased():
+    pool = DriverPool(size=1, factory=FlakyFactory()).start()
+    pool.acquire(timeout=1)
+    with pytest.raises(TimeoutError):
+        pool.acquire(timeout=0.1)
@@ -0,0 +1,133 @@
+import pytest
+
+from utils.duration_scheduler import GROUP_PREFIX, DurationDatabase, DurationScheduler, lpt_partition
+
+
+class FakeConfig:
+    def __init__(self, rootpath, **options):
+        self.rootpath = rootpath
+        self.options = {"durations_db": None, "numprocesses": None, "dist": "no", **options}
+
+    def getoption(self, name, default=None):
+        return self.options.get(name, default)
+
+
+class FakeItem:
+    def __init__(self, nodeid, fixturenames=(), markers=()):
+        self.nodeid = nodeid
+        self.fixturenames = list(fixturenames)
+        self.markers = {name: pytest.Mark(name, (), {}) for name in markers}
+
+    def get_closest_marker(self, name):
+        return self.markers.get(name)
+
+    def add_marker(self, marker):
+        self.markers[marker.name] = marker.mark
+
+    def __repr__(self):
+        return self.nodeid
+
+
+def scheduler(tmp_path, history=None, **options):
+    if history:
+        db = DurationDatabase(str(tmp_path / ".pytest_durations.sqlite"))
+        db.record({nodeid: (duration, failed, "fast") for nodeid, (duration, failed) in history.items()})
+        db.close()
+    return DurationScheduler(FakeConfig(tmp_path, **options))
+
+
+def test_lpt_partition_balances_longest_first():
+    bins = lpt_partition([(5, "a"), (3, "c"), (4, "b"), (3, "d"), (3, "e")], 2)
+
+    assert bins == [["a", "d"], ["b", "c", "e"]]
+
+
+def test_lpt_partition_leaves_extra_bins_empty():
+    assert lpt_partition([(1, "a")], 3) == [["a"], [], []]
+
+
+def test_order_runs_failed_tests_first_then_longest_first(tmp_path):
+    sched = scheduler(tmp_path, {"t::short": (1.0, False), "t::long": (9.0, False), "t::failed": (2.0, True)})
+    items = [FakeItem("t::short"), FakeItem("t::long"), FakeItem("t::failed"), FakeItem("t::new")]
+
+    sched.order(items)
+
+    # A never-recorded test counts as the median recorded duration (2 s)
+    assert [item.nodeid for item in items] == ["t::failed", "t::long", "t::new", "t::short"]
+
+
+def test_order_keeps_auth_groups_together_and_marks_them_for_loadgroup(tmp_path):
+    sched = scheduler(tmp_path, dist="loadgroup")
+    items = [FakeItem("t::a", ["player_driver"]), FakeItem("t::solo", ["setup_driver"]),
+             FakeItem("t::b", ["player_driver"])]
+
+    sched.order(items)
+
+    groups = {item.nodeid: item.get_closest_marker("xdist_group").args[0] for item in items}
+    assert groups["t::a"] == groups["t::b"] != groups["t::solo"]
+    assert all(group.startswith(GROUP_PREFIX) for group in groups.values())
+
+
+def test_auth_group_bigger_than_a_worker_share_is_chunked(tmp_path):
+    sched = scheduler(tmp_path, {f"t::p{i}": (10.0, False) for i in range(4)} | {"t::solo": (10.0, False)},
+                      numprocesses=2)
+    items = [FakeItem(f"t::p{i}", ["player_driver"]) for i in range(4)] + [FakeItem("t::solo")]
+
+    units = sched._units(items, workers=2)
+
+    chunks = sorted(len(members) for _, _, members in units if members[0].nodeid != "t::solo")
+    assert chunks == [2, 2]  # 25 s per worker: two 10 s tests fit, a third would not
+
+
+def test_nodeid_strips_only_scheduler_group_suffix(tmp_path):
+    sched = scheduler(tmp_path)
+
+    assert sched._nodeid(f"tests/t.py::test_a@{GROUP_PREFIX}3") == "tests/t.py::test_a"
+    assert sched._nodeid("tests/t.py::test_a[user@example.com]") == "tests/t.py::test_a[user@example.com]"
+    assert sched._nodeid("tests/t.py::test_a@manual") == "tests/t.py::test_a@manual"
+
+
+def test_shards_are_disjoint_balanced_and_cover_every_test(tmp_path):
+    durations = {f"t::{i}": (float(i + 1), False) for i in range(10)}
+    sched = scheduler(tmp_path, durations)
+    shards = []
+    for index in range(3):
+        items = [FakeItem(nodeid) for nodeid in durations]
+        deselected = sched.shard(items, 3, index)
+        assert len(items) + len(deselected) == len(durations)
+        shards.append({item.nodeid for item in items})
+
+    assert set().union(*shards) == set(durations)
+    assert sum(len(shard) for shard in shards) == len(durations)
+    loads = [sum(durations[nodeid][0] for nodeid in shard) for shard in shards]
+    assert max(loads) - min(loads) <= 1.0
+
+
+def test_plugin_records_durations_and_runs_last_failure_first(pytester):
+    pytester.makepyfile(test_sample="""
+        import os
+
+        def test_passes():
+            pass
+
+        def test_fails_once():
+            assert os.path.exists("second_run")
+    """)
+    args = ["-p", "utils.duration_scheduler", "-v"]
+
+    first = pytester.runpytest(*args)
+    first.assert_outcomes(passed=1, failed=1)
+    (pytester.path / "second_run").touch()
+    second = pytester.runpytest(*args)
+
+    second.assert_outcomes(passed=2)
+    second.stdout.re_match_lines([r".*test_fails_once PASSED.*", r".*test_passes PASSED.*"])
+
+
+def test_plugin_shards_deselect_the_other_shards(pytester):
+    pytester.makepyfile(test_sample="".join(f"def test_{i}():\n    pass\n\n" for i in range(6)))
+    args = ["-p", "utils.duration_scheduler", "--shard-count", "2"]
+
+    counts = [pytester.runpytest(*args, "--shard-index", str(index)).parseoutcomes()["passed"] for index in range(2)]
+
+    assert counts == [3, 3]
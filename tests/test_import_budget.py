@@ -0,0 +1,41 @@
+import json
+import os
+import subprocess
+import sys
+
+# Wall time allowed for importing the UI test module after pytest itself is loaded
+IMPORT_BUDGET_SECONDS = float(os.environ.get("IMPORT_BUDGET_SECONDS", "0.25"))
+TEST_MODULE = "tests.test_player_parametrize_login_suite_load"
+# Only needed once a test runs, never at collection
+DEFERRED_MODULES = [
+    "pandas", "numpy", "PIL.Image", "openpyxl", "aiohttp",
+    "selenium.webdriver.common.action_chains", "selenium.webdriver.chrome.webdriver",
+]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MEASURE = f"""
+import json, sys, time
+import pytest
+start = time.perf_counter()
+import {TEST_MODULE}
+elapsed = time.perf_counter() - start
+# Lazily bound modules are not executed yet; touching any of their attributes would load them
+loaded = [name for name in {DEFERRED_MODULES!r}
+          if name in sys.modules and type(sys.modules[name]).__name__ != "_LazyModule"]
+print(json.dumps({{"elapsed": elapsed, "loaded": loaded}}))
+"""
+
+
+def measure_import():
+    result = subprocess.run([sys.executable, "-c", MEASURE], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_collection_imports_stay_within_budget():
+    measure_import()  # Warm up the bytecode and file system caches
+    measurement = measure_import()
+
+    assert measurement["loaded"] == [], f"Imported at collection time: {measurement['loaded']}"
+    assert measurement["elapsed"] < IMPORT_BUDGET_SECONDS, \
+        f"Importing {TEST_MODULE} took {measurement['elapsed']:.3f} s (budget {IMPORT_BUDGET_SECONDS} s)"
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from utils.load_generator import run_login_load
+
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp import web  # noqa: E402
+
+VALID_USERS = {"player1@cympire.com": "234!", "player2@cympire.com": "567!"}
+
+
+def create_stand_in_app():
+    """Local stand-in for the login page and lobby of the application."""
+    async def login_page(request):
+        return web.Response(text="<form><input name='username'><input name='password'><button name='sign in'></form>",
+                            content_type="text/html")
+
+    async def login_submit(request):
+        form = await request.post()
+        if VALID_USERS.get(form.get("username")) != form.get("password") or "sign in" not in form:
+            raise web.HTTPFound("/login")
+        response = web.HTTPFound("/lobby")
+        response.set_cookie("session", form["username"])
+        raise response
+
+    async def lobby(request):
+        if request.cookies.get("session") not in VALID_USERS:
+            raise web.HTTPUnauthorized()
+        return web.Response(text="<div class='WelcomeMsgName'>Hello Player</div>", content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/login", login_page)
+    app.router.add_post("/login", login_submit)
+    app.router.add_get("/lobby", lobby)
+    return app
+
+
+async def run_against_stand_in(users, **kwargs):
+    runner = web.AppRunner(create_stand_in_app())
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    try:
+        return await run_login_load(f"http://127.0.0.1:{port}/login", f"http://127.0.0.1:{port}/lobby", users, **kwargs)
+    finally:
+        await runner.cleanup()
+
+
+def test_login_load_against_stand_in_server():
+    users = [{"username": name, "password": password} for name, password in VALID_USERS.items()]
+    report = asyncio.run(run_against_stand_in(users, rate=200, duration=1.0, ramp_up=0.2, concurrency=50, seed=1))
+
+    assert report["arrivals"] > 50
+    assert report["failed"] == 0
+    assert report["completed"] == report["arrivals"]
+    assert report["throughput"] > 0
+    assert report["steps"]["flow"]["p99"] >= report["steps"]["flow"]["p50"] > 0
+
+
+def test_login_load_reports_rejected_logins():
+    users = [{"username": "player1@cympire.com", "password": "wrong"}]
+    report = asyncio.run(run_against_stand_in(users, rate=50, duration=0.3, concurrency=10, seed=1))
+
+    assert report["completed"] == 0
+    assert report["error_rate"] == 1.0
+    assert report["errors"] == {"login_submit:rejected": report["failed"]}
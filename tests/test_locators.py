@@ -0,0 +1,128 @@
+import pytest
+from selenium.webdriver.common.by import By
+
+from utils.locators import REGISTRY, compile_locator, validate_locator
+
+COMPILED = [
+    ("//button[contains(@class, 'GlobalGalleryButton')]", "button[class*='GlobalGalleryButton']"),
+    ("//input[@class='search-filter_search_field__1ZFKm']", "input[class='search-filter_search_field__1ZFKm']"),
+    ("//a[starts-with(@href, '#/')]", "a[href^='#/']"),
+    ("//input[@disabled]", "input[disabled]"),
+    ("//*[@data-id=\"7\"]", "[data-id=\"7\"]"),
+    ("//div[@role='list'][contains(@class, 'Gallery')]", "div[role='list'][class*='Gallery']"),
+    ("//div[contains(@class, 'Gallery')]//span[@class='Name']", "div[class*='Gallery'] span[class='Name']"),
+    # "//" and "]" inside quoted values are part of the value, not separators
+    ("//a[@href='//cdn.example.com/x']", "a[href='//cdn.example.com/x']"),
+    ("//div[@title='a]b']//span", "div[title='a]b'] span"),
+]
+
+KEPT_AS_XPATH = [
+    "//span[contains(text(), 'Welcome')]",            # text() has no CSS equivalent
+    "//*[normalize-space(text())='Dashboard']",
+    "//li[2]",                                        # positions
+    "//div[@a='x' or @b='y']",                        # boolean logic
+    "//div/span",                                     # child axis
+    "//div[contains(@class, '')]",                    # true for any element; CSS *='' matches nothing
+    "//div[starts-with(@id, \"\")]",
+    "//a[@title='C:\\temp']",                         # backslash is an escape in CSS only
+    "(//div)[1]",
+    ".//div[@id='x']",
+]
+
+# Every registered locator and the form the wait helpers receive
+REGISTERED = {
+    "login.username": (By.CSS_SELECTOR, "[name='username']"),
+    "login.password": (By.CSS_SELECTOR, "[name='password']"),
+    "login.sign_in": (By.CSS_SELECTOR, "[name='sign in']"),
+    "login.welcome_message": (By.CSS_SELECTOR, ".WelcomeMsgName"),
+    "lobby.global_gallery_button": (By.CSS_SELECTOR, "button[class*='GlobalGalleryButton']"),
+    "lobby.global_library_button": (By.CSS_SELECTOR, ".GlobalLibraryButton"),
+    "lobby.event_names": (By.CSS_SELECTOR,
+                          "div[class='sc-eNSrOW bfIymq EventsGalleryItemContainer'] span[class*='sc-kCMKrZ']"),
+    "lobby.join_button": (By.CSS_SELECTOR, "button[class*='LobbyJoinButton']"),
+    "lobby.event_welcome_message": (By.XPATH, "//span[contains(text(), 'Welcome to Extreme Measures')]"),
+    "global_library.main_container": (By.CSS_SELECTOR, "div[class*='GlobalLibraryMainContainer']"),
+    "global_library.title": (By.CSS_SELECTOR, "div[class*='GlobalLibraryTitle']"),
+    "global_library.search_field": (By.CSS_SELECTOR, "input[class='search-filter_search_field__1ZFKm']"),
+    "global_library.campaign_names": (By.CSS_SELECTOR, "div[class*='CampaignName']"),
+    "global_library.pick_it_button": (By.CSS_SELECTOR, "button[class*='PickItButton']"),
+    "global_library.close_button": (By.CSS_SELECTOR, ".close_GlobalLibrary_button"),
+}
+
+INVALID = [
+    ("by", "unknown", "x"),
+    ("empty", By.ID, ""),
+    ("whitespace", By.ID, " x"),
+    ("class with space", By.CLASS_NAME, "a b"),
+    ("unbalanced quote", By.XPATH, "//div[@id='x]"),
+    ("unbalanced bracket", By.XPATH, "//div[@id='x'"),
+    ("unbalanced paren", By.CSS_SELECTOR, "div:not(.x"),
+    ("relative xpath", By.XPATH, "div[@id='x']"),
+]
+
+
+@pytest.mark.parametrize("xpath, css", COMPILED)
+def test_simple_xpath_compiles_to_equivalent_css(xpath, css):
+    assert compile_locator(By.XPATH, xpath) == (By.CSS_SELECTOR, css)
+
+
+@pytest.mark.parametrize("xpath", KEPT_AS_XPATH)
+def test_xpath_without_exact_css_equivalent_is_kept(xpath):
+    assert compile_locator(By.XPATH, xpath) == (By.XPATH, xpath)
+
+
+@pytest.mark.parametrize("by, value, expected", [
+    (By.CLASS_NAME, "WelcomeMsgName", (By.CSS_SELECTOR, ".WelcomeMsgName")),
+    (By.ID, "main", (By.CSS_SELECTOR, "#main")),
+    (By.NAME, "sign in", (By.CSS_SELECTOR, "[name='sign in']")),
+    (By.NAME, "it's", (By.NAME, "it's")),
+    (By.ID, "1st", (By.ID, "1st")),
+])
+def test_class_id_and_name_compile_to_css(by, value, expected):
+    assert compile_locator(by, value) == expected
+
+
+def test_every_registered_locator_is_covered():
+    assert sorted(REGISTRY) == sorted(REGISTERED)
+
+
+@pytest.mark.parametrize("name", sorted(REGISTERED))
+def test_registered_locator_compiles_to_expected_form(name):
+    assert tuple(REGISTRY[name]) == REGISTERED[name]
+
+
+@pytest.mark.parametrize("name, by, value", INVALID, ids=[case[0] for case in INVALID])
+def test_malformed_locators_are_rejected(name, by, value):
+    with pytest.raises(ValueError):
+        validate_locator(name, by, value)
+
+
+HTML = """
+<html><body>
+  <button class="sc-a GlobalGalleryButton">1</button>
+  <button class="GlobalGalleryButtonX">2</button>
+  <button>3</button>
+  <input class="search-filter_search_field__1ZFKm">
+  <input class="search-filter_search_field__1ZFKm other">
+  <a href="//cdn.example.com/x">4</a><a href="#/teams">5</a>
+  <div class="sc-eNSrOW bfIymq EventsGalleryItemContainer"><span class="sc-kCMKrZ x">Extreme Measures</span></div>
+  <div class="sc-eNSrOW EventsGalleryItemContainer"><span class="sc-kCMKrZ">Other</span></div>
+  <div title="a]b"><span>6</span></div>
+</body></html>
+"""
+
+
+@pytest.mark.parametrize("xpath", [xpath for xpath, _ in COMPILED] + [
+    locator.source[1] for locator in REGISTRY.values() if locator.source[0] == By.XPATH
+])
+def test_compiled_css_matches_the_same_elements(xpath):
+    # Extra check against a real XPath/CSS engine where lxml and cssselect are installed;
+    # the compiled strings themselves are asserted above
+    html = pytest.importorskip("lxml.html")
+    cssselect = pytest.importorskip("lxml.cssselect")
+    document = html.fromstring(HTML)
+    by, value = compile_locator(By.XPATH, xpath)
+    if by != By.CSS_SELECTOR:
+        pytest.skip("Not compiled to CSS.")
+
+    assert document.xpath(xpath) == cssselect.CSSSelector(value)(document)
@@ -0,0 +1,93 @@
+import json
+import logging
+import time
+
+import pytest
+
+from utils import log_config
+from utils.log_config import configure_logging, per_test_log, stop_logging
+
+
+@pytest.fixture(autouse=True)
+def private_logging(monkeypatch):
+    """Run each test with its own listener, leaving the suite's logging set up as it was."""
+    handlers, level = logging.root.handlers[:], logging.root.level
+    for name in ("_listener", "_routing_handler", "_flusher"):
+        monkeypatch.setattr(log_config, name, None)
+    yield
+    stop_logging()
+    logging.root.handlers[:] = handlers
+    logging.root.setLevel(level)
+
+
+def drain():
+    log_config._listener.queue.join()
+
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def test_records_reach_the_session_log(tmp_path):
+    session_log = tmp_path / "logs" / "session.log"
+    configure_logging(str(session_log))
+    logging.info("Session started.")
+    stop_logging()
+
+    assert "INFO - Session started." in read(session_log)
+
+
+def test_quiet_periods_are_flushed_without_stopping(tmp_path):
+    session_log = tmp_path / "session.log"
+    configure_logging(str(session_log))
+    logging.info("Only record.")
+    drain()
+
+    deadline = time.monotonic() + 5 * log_config.FLUSH_INTERVAL
+    while "Only record." not in read(session_log) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert "Only record." in read(session_log)
+
+
+def test_per_test_log_gets_only_the_records_of_its_block(tmp_path):
+    session_log, first, second = tmp_path / "session.log", tmp_path / "first.log", tmp_path / "second.log"
+    configure_logging(str(session_log))
+    logging.info("Before the tests.")
+    with per_test_log(str(first)):
+        logging.info("In the first test.")
+    with per_test_log(str(second)):
+        logging.info("In the second test.")
+    logging.info("After the tests.")
+    drain()
+
+    # Each file is complete and closed once its block's records are written
+    assert log_config._routing_handler._files == {}
+    assert "In the first test." in read(first) and "second" not in read(first)
+    assert "In the second test." in read(second) and "first" not in read(second)
+    stop_logging()
+    session = read(session_log)
+    assert all(line in session for line in ("Before", "In the first", "In the second", "After"))
+    assert "Per-test log complete." not in session
+
+
+def test_repeated_configure_does_not_reroute_later_records(tmp_path):
+    configure_logging(str(tmp_path / "session.log"))
+    configure_logging(str(tmp_path / "test.log"))
+    logging.info("Still the session.")
+    stop_logging()
+
+    assert not (tmp_path / "test.log").exists()
+    assert "Still the session." in read(tmp_path / "session.log")
+
+
+def test_json_lines_carry_level_and_test_log(tmp_path):
+    jsonl, test_log = tmp_path / "run.jsonl", tmp_path / "test.log"
+    configure_logging(str(tmp_path / "session.log"), jsonl_file=str(jsonl))
+    with per_test_log(str(test_log)):
+        logging.error("Join button missing.")
+    stop_logging()
+
+    records = [json.loads(line) for line in read(jsonl).splitlines()]
+    assert [(r["level"], r["message"], r["test_log"]) for r in records] == [
+        ("ERROR", "Join button missing.", str(test_log))]
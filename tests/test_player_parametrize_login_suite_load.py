@@ -1,21 +1,39 @@
 
+import functools
 import logging
 import os
 from datetime import datetime
-import time
 import pytest
-import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.action_chains import ActionChains
-from utils.log_config import configure_logging
-from utils.screenshot_helpers import save_screenshot
-from utils.wait_helpers import is_element_present, wait_for_page_to_load, wait_for_element_to_be_visible_and_clickable, wait_for_element_to_be_visible
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from utils.artifact_recorder import attach_driver, recorded, recording
+from utils.auth_cache import AuthStateCache
+from utils.browser_profiles import launch_chrome, profile_for_markers
+from utils.catalog_scanner import CatalogScanner
+from utils.driver_pool import DriverPool
+from utils.lazy import lazy_import
+from utils.locators import GlobalLibraryPage, LobbyPage, LoginPage, click
+from utils.log_config import configure_logging, per_test_log, stop_logging
+from utils.resilience import adaptive_wait, retrying
+from utils.screenshot_helpers import compare_screenshot, flush_screenshots
+from utils.tenant_fanout import TenantFanout, load_tenants, write_tenant_report
+from utils.test_data import iter_test_rows, load_test_cases
+from utils.timing import timed, timed_step, write_timing_report
+from utils.wait_helpers import is_element_present, wait_for_network_idle, wait_for_page_to_load, wait_for_element_to_be_visible_and_clickable, wait_for_element_to_be_visible
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
+
+# Only needed once a flow hovers over an element; keeps collection fast
+action_chains = lazy_import("selenium.webdriver.common.action_chains")
 
 # Base directory for logs
 BASE_LOGS_DIR = "logs"
 
+# Login page of the tenant under test
+BASE_URL = os.environ.get("BASE_URL", "")
+
+# Credentials used when a test only needs an authenticated user of a given role
+ROLE_CREDENTIALS = {
+    "player": ("44@cympire.com", "234!"),
+}
+
 # Path to the Excel test data file
 test_data_file = os.path.join(os.path.dirname(__file__), '../data/test_data.xlsx')
 
@@ -35,84 +53,205 @@ def setup_run_directory():
     yield run_directory  # Provide the path to the run directory to the tests
 
 
+@pytest.fixture(scope="session")
+def driver_pools():
+    """Browser pools of this worker, one per launch profile, quit at the end of the session."""
+    pools = {}
+    yield pools
+    for pool in pools.values():
+        pool.close()
+    logging.info("All browsers closed successfully.")
+
+
+@pytest.fixture()
+def setup_driver(request, driver_pools):
+    """Fixture to lease a WebDriver instance, launched with the profile the test's markers ask for."""
+    profile = profile_for_markers(marker.name for marker in request.node.iter_markers())
+    with timed_step("fixture.lease_driver"):
+        if profile.name not in driver_pools:
+            driver_pools[profile.name] = DriverPool(factory=functools.partial(launch_chrome, profile)).start()
+        driver_pool = driver_pools[profile.name]
+        driver = driver_pool.acquire()
+    attach_driver(driver)
+    try:
+        yield driver
+    finally:
+        # The browser is reset and returned to the pool after the test
+        with timed_step("fixture.release_driver"):
+            driver_pool.release(driver)
+
+
+@pytest.fixture(scope="session")
+def auth_cache():
+    """Cache of logged-in sessions per role, so only login tests pay for a UI login."""
+    def login(driver, role):
+        username, password = ROLE_CREDENTIALS[role]
+        login_to_lobby(driver, username, password)
+
+    return AuthStateCache(login)
+
+
 @pytest.fixture()
-def setup_driver():
-    """Fixture to setup the WebDriver instance. This driver will remain open."""
-    driver = webdriver.Chrome()  # Ensure ChromeDriver is in your PATH
-    driver.maximize_window()
-    yield driver  # Keep the browser open for further use after tests
+def player_driver(setup_driver, auth_cache):
+    """Pooled driver already logged in as a player."""
+    with timed_step("fixture.authenticate_player"):
+        return auth_cache.authenticate(setup_driver, "player")
 
 
 @pytest.fixture(scope="session", autouse=True)
 def setup_suite(request):
-    """Setup the test suite, configure logging, and initialize WebDriver."""
-    global driver
+    """Setup the test suite and configure logging."""
     # Get the suite name and add a timestamp with milliseconds
     suite_name = request.config.getoption("markexpr", default="test_suite").split("_")[0]
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S.%f")[:-3]  # Current timestamp with milliseconds
-    log_file = f"{BASE_LOGS_DIR}/{suite_name}_{timestamp}_test_suite.log"  # Log file with timestamp
+    worker_id = os.environ.get("PYTEST_XDIST_WORKER", "main")
+    log_file = f"{BASE_LOGS_DIR}/{suite_name}_{timestamp}_{worker_id}_test_suite.log"  # Log file with timestamp
 
     configure_logging(log_file)
     logging.info(f"Starting {suite_name} Test Suite with logs in {log_file}.")
 
-    # Initialize the WebDriver for the session
-    driver = webdriver.Chrome()  # Ensure ChromeDriver is in your PATH
-    driver.maximize_window()
+    yield
 
-    yield driver  # Yield the driver to the tests
+    # Make sure every screenshot queued by the tests reaches the disk
+    for test_name, result in flush_screenshots():
+        logging.error(f"Visual regression in {test_name}: {result.diff_ratio:.2%} of pixels changed, diff at {result.diff_path}.")
+    write_timing_report(f"{BASE_LOGS_DIR}/{suite_name}_{timestamp}_{worker_id}_timings")
+    logging.info(f"{suite_name} Test Suite Completed.")
+    stop_logging()
 
-    # Clean up WebDriver after all tests are complete
-    if driver:
-        driver.quit()
-        logging.info("All browsers closed successfully.")
 
-    logging.info(f"{suite_name} Test Suite Completed.")
+@pytest.fixture(autouse=True)
+def test_log_file(request, setup_run_directory):
+    """Route each test's log records to its own file in the run directory."""
+    log_file = os.path.join(setup_run_directory, f"{request.node.name}.log")
+    with per_test_log(log_file):
+        yield log_file
+
+
+@pytest.fixture(autouse=True)
+def artifact_recorder(request, setup_run_directory):
+    """Keep the test's last steps in memory; they are written to the run directory only if the test fails."""
+    with recording(request.node, os.path.join(setup_run_directory, "artifacts", request.node.name)) as recorder:
+        yield recorder
 
 
 def get_test_data(file_path):
-    """Read test data from an Excel file."""
-    return pd.read_excel(file_path)
+    """Stream test data rows (as dicts) from the cached Excel file."""
+    return iter_test_rows(file_path)
 
 
-def test_positive_player_login(setup_run_directory, setup_driver):
-    test_name = "Positive_Login_Test"
-    log_file = os.path.join(setup_run_directory, f"{test_name}.log")
-    configure_logging(log_file)
-    logging.info("Starting test for positive login.")
+@timed()
+def submit_login(driver, username, password, url=None):
+    """
+    Fill in and submit the login form.
 
-    driver = setup_driver
+    :param driver: WebDriver instance.
+    :param username: Username to type into the login form.
+    :param password: Password to type into the login form.
+    :param url: Login page of the tenant; defaults to BASE_URL.
+    """
+    driver.get(url or BASE_URL)
+    logging.info("Navigated to login page.")
 
-    try:
-        driver.get("")
-        logging.info("Navigated to login page.")
+    wait_for_page_to_load(driver)
 
-        wait_for_page_to_load(driver)
+    # Enter credentials
+    wait_for_element_to_be_visible_and_clickable(driver, *LoginPage.USERNAME).send_keys(username)
+    logging.info("Username entered successfully.")
+    wait_for_element_to_be_visible_and_clickable(driver, *LoginPage.PASSWORD).send_keys(password)
+    logging.info("Password entered successfully.")
+    wait_for_element_to_be_visible_and_clickable(driver, *LoginPage.SIGN_IN).click()
+    logging.info("Sign-in button clicked.")
 
-        # Enter credentials
-        wait_for_element_to_be_visible_and_clickable(driver, By.NAME, "username").send_keys("44@cympire.com")
-        logging.info("Username entered successfully.")
-        wait_for_element_to_be_visible_and_clickable(driver, By.NAME, "password").send_keys("234!")
-        logging.info("Password entered successfully.")
-        wait_for_element_to_be_visible_and_clickable(driver, By.NAME, "sign in").click()
-        logging.info("Sign-in button clicked.")
 
-        welcome_message = wait_for_element_to_be_visible_and_clickable(driver, By.CLASS_NAME, "WelcomeMsgName", timeout=30)
+@recorded()
+@timed()
+def login_to_lobby(driver, username, password, url=None):
+    """
+    Log in through the login form and return the welcome message element.
+
+    :param driver: WebDriver instance.
+    :param username: Username to type into the login form.
+    :param password: Password to type into the login form.
+    :param url: Login page of the tenant; defaults to BASE_URL.
+    """
+    submit_login(driver, username, password, url)
+    return wait_for_element_to_be_visible_and_clickable(driver, *LoginPage.WELCOME_MESSAGE, timeout=30)
+
+
+@pytest.mark.player_login_positive_team_player
+def test_positive_player_login(setup_run_directory, setup_driver, artifact_recorder):
+    test_name = "Positive_Team_Player_Login_Test"
+    logging.info("Starting test for positive login.")
+
+    driver = setup_driver
+
+    try:
+        welcome_message = login_to_lobby(driver, "44@cympire.com", "234!")
         assert "Hello Player" in welcome_message.text, "Welcome message not displayed as expected."
         logging.info(f"Welcome message verified: {welcome_message.text}")
+        # Compared with data/expected_images/<test_name>_Expected.png; only written when it differs
+        comparison = compare_screenshot(driver, setup_run_directory, test_name)
+        assert comparison is None or comparison.matched, (
+            f"Lobby differs from the baseline: {comparison.diff_ratio:.2%} of pixels changed, diff at {comparison.diff_path}.")
 
         interact_with_global_library_event(driver)
-
-        screenshot_name = f"{test_name}_success.png"
-        save_screenshot(driver, setup_run_directory, screenshot_name)
     except Exception as e:
         logging.error(f"An error occurred: {e}")
-        screenshot_name = f"{test_name}_error.png"
-        save_screenshot(driver, setup_run_directory, screenshot_name)
+        artifact_recorder.dump(error=e)
+        raise
     finally:
         # Do not close the driver here, keep it open for subsequent tests
         logging.info(f"Finished test: {test_name}")
 
 
+@pytest.mark.player_login_positive
+@pytest.mark.parametrize("row", load_test_cases(test_data_file, id_column="username"))
+def test_parametrized_player_login(setup_run_directory, setup_driver, row):
+    test_name = f"Parametrized_Login_Test_{row['username']}"
+    logging.info(f"Starting parametrized login test for {row['username']}.")
+
+    driver = setup_driver
+
+    try:
+        welcome_message = login_to_lobby(driver, row["username"], row["password"])
+        expected_message = row.get("expected_message") or "Hello"
+        assert expected_message in welcome_message.text, "Welcome message not displayed as expected."
+        logging.info(f"Welcome message verified: {welcome_message.text}")
+    finally:
+        logging.info(f"Finished test: {test_name}")
+
+
+@pytest.mark.player_login_positive
+def test_player_global_library_event(setup_run_directory, player_driver):
+    test_name = "Player_Global_Library_Event_Test"
+    logging.info("Starting Global Library event test with a cached player session.")
+
+    driver = player_driver
+
+    try:
+        interact_with_global_library_event(driver)
+    finally:
+        logging.info(f"Finished test: {test_name}")
+
+
+@pytest.mark.tenants_login
+def test_tenants_login(setup_run_directory):
+    tenants = load_tenants(test_data_file)
+    if not tenants:
+        pytest.skip("No tenants in the test data.")
+    logging.info(f"Checking login on {len(tenants)} tenant rows.")
+
+    def login(driver, row):
+        login_to_lobby(driver, row["username"], row["password"], url=row["url"])
+
+    results = TenantFanout(login).run(tenants)
+    summary = write_tenant_report(results, os.path.join(setup_run_directory, "tenants_report.json"))
+    assert not summary["failed_tenants"], f"Login failed on tenants: {', '.join(summary['failed_tenants'])}"
+
+
+@recorded()
+@timed()
 def interact_with_global_library_event(driver):
     """
     Interacts with the Global Library and manages events like terminating or joining.
@@ -121,117 +260,110 @@ def interact_with_global_library_event(driver):
     """
     try:
         # Check if the Global Library is currently visible
-        global_library_container_xpath = "//div[contains(@class, 'GlobalLibraryMainContainer')]"
-        
-        if is_element_present(driver, By.XPATH, global_library_container_xpath):
+        if is_element_present(driver, *GlobalLibraryPage.MAIN_CONTAINER):
             logging.info("Global Library is open. Proceeding to search for 'Extreme Measures'.")
             search_for_extreme_measures_in_global_library(driver)
         else:
             logging.info("Global Library not open, checking for 'Extreme Measures' in Lobby.")
 
-            # Define the XPath for the 'Extreme Measures' event in the specified structure
-            extreme_measures_xpath = "//div[@class='sc-eNSrOW bfIymq EventsGalleryItemContainer']//span[contains(@class, 'sc-kCMKrZ') and text()='Extreme Measures']"
-            
-            # Check for the 'Extreme Measures' event in the Lobby
-            if wait_for_element_to_be_visible(driver, By.XPATH, extreme_measures_xpath):
+            # Check for the 'Extreme Measures' event in the Lobby, scrolling through the gallery at most once
+            lobby_scanner = CatalogScanner(driver, LobbyPage.EVENT_NAMES)
+            if lobby_scanner.find("Extreme Measures") is not None:
                 logging.info("Event 'Extreme Measures' found in Lobby.")
-                join_event_in_lobby(driver, extreme_measures_xpath)
+                join_event_in_lobby(driver, lobby_scanner, "Extreme Measures")
             else:
                 logging.warning("Event 'Extreme Measures' not found in Lobby. Searching for Global Gallery button.")
                 access_global_gallery(driver)
-    
     except Exception as e:
         logging.error(f"An error occurred while trying to interact with the Global Library event: {e}")
+        raise
 
-    finally:
-        logging.info("Event interaction completed successfully.")
+    logging.info("Event interaction completed successfully.")
 
 
+@recorded()
+@timed()
 def search_for_extreme_measures_in_global_library(driver):
     """
     Searches for the 'Extreme Measures' event in the Global Library and interacts with it.
 
     :param driver: WebDriver instance.
     """
-    search_field_xpath = "//input[@class='search-filter_search_field__1ZFKm']"
-    wait_for_element_to_be_visible_and_clickable(driver, By.XPATH, search_field_xpath)
+    search_field = wait_for_element_to_be_visible_and_clickable(driver, *GlobalLibraryPage.SEARCH_FIELD)
 
     # Enter search text for "Extreme Measures"
-    search_field = driver.find_element(By.XPATH, search_field_xpath)
     search_field.clear()
     search_field.send_keys("Extreme Measures")
     logging.info("Entered 'Extreme Measures' in the search field.")
 
-    # Wait for the search results to load
-    time.sleep(2)  # This could be replaced with a better waiting strategy
-
-    while True:
-        try:
-            extreme_measures_xpath = "//div[contains(@class, 'CampaignName') and text()='Extreme Measures']"
-            if wait_for_element_to_be_visible(driver, By.XPATH, extreme_measures_xpath):
-                logging.info("Event 'Extreme Measures' found in Global Library.")
-                
-                # Hover over the event item to reveal the "Pick It" button
-                event_item = driver.find_element(By.XPATH, extreme_measures_xpath)
-                ActionChains(driver).move_to_element(event_item).perform()
-                logging.info("Hovered over the 'Extreme Measures' event.")
-                
-                # Wait for the "Pick It" button to appear
-                pick_it_button_xpath = "//button[contains(@class, 'PickItButton')]"
-                wait_for_element_to_be_visible(driver, By.XPATH, pick_it_button_xpath)
-                pick_it_button = driver.find_element(By.XPATH, pick_it_button_xpath)
-                pick_it_button.click()
-                logging.info("Clicked the 'Pick It' button.")
-                break  # Break the loop since the element has been found
-
-        except NoSuchElementException:
-            # Scroll down to reveal more events
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)  # Wait for the new events to load
-            logging.info("Scrolling down to load more events...")
+    # The search is served by the API; wait for its requests to settle instead of sleeping
+    wait_for_network_idle(driver)
+
+    # Index rendered events page by page until the target shows up or the gallery is exhausted;
+    # the first scan step also waits for the search results to settle
+    scanner = CatalogScanner(driver, GlobalLibraryPage.CAMPAIGN_NAMES)
+    event_item = scanner.find("Extreme Measures")
+    if event_item is None:
+        raise NoSuchElementException("Event 'Extreme Measures' not found in Global Library.")
+    logging.info("Event 'Extreme Measures' found in Global Library.")
+
+    # Hover over the event item to reveal the "Pick It" button
+    action_chains.ActionChains(driver).move_to_element(event_item).perform()
+    logging.info("Hovered over the 'Extreme Measures' event.")
+
+    # Wait for the "Pick It" button to appear
+    pick_it_button = wait_for_element_to_be_visible(driver, *GlobalLibraryPage.PICK_IT_BUTTON)
+    pick_it_button.click()
+    logging.info("Clicked the 'Pick It' button.")
 
     # Confirm exiting the gallery
     logging.info("Exiting the gallery...")
 
 
-def join_event_in_lobby(driver, event_xpath):
+@recorded()
+@timed()
+@retrying()
+def join_event_in_lobby(driver, lobby_scanner, event_name):
     """
-    Joins the 'Extreme Measures' event in the Lobby after hovering over it.
+    Joins an event in the Lobby after hovering over it.
+
+    The event element is the one the Lobby scan indexed. If the gallery re-rendered under it
+    (stale element), the scan is repeated in place and the join retried.
 
     :param driver: WebDriver instance.
-    :param event_xpath: XPath for the 'Extreme Measures' event.
+    :param lobby_scanner: CatalogScanner of the Lobby gallery that found the event.
+    :param event_name: Event name as indexed by the scanner, e.g. "Extreme Measures".
     """
-    extreme_measures_container = driver.find_element(By.XPATH, event_xpath)
-    ActionChains(driver).move_to_element(extreme_measures_container).perform()
-    logging.info("Hovered over the 'Extreme Measures' container.")
-
-    join_button_xpath = "//button[contains(@class, 'LobbyJoinButton')]"
-    if wait_for_element_to_be_visible(driver, By.XPATH, join_button_xpath, timeout=240):
-        join_button = driver.find_element(By.XPATH, join_button_xpath)
-        join_button.click()
-        logging.info("Clicked the 'Join' button after waiting.")
-
-        # After clicking "Join," verify that the expected content appears
-        welcome_message_xpath = "//span[contains(text(), 'Welcome to Extreme Measures')]"
-        if wait_for_element_to_be_visible(driver, By.XPATH, welcome_message_xpath):
-                        logging.info("Successfully navigated to the 'Extreme Measures' event page.")
-        else:
-            logging.warning("Could not find the welcome message for 'Extreme Measures'.")
-    else:
-        logging.warning("Timed out waiting for the 'Join' button to appear.")
+    event_item = lobby_scanner.find(event_name)
+    if event_item is None:
+        raise NoSuchElementException(f"Event '{event_name}' not found in Lobby.")
+    try:
+        action_chains.ActionChains(driver).move_to_element(event_item).perform()
+    except StaleElementReferenceException:
+        lobby_scanner.invalidate()
+        raise
+    logging.info(f"Hovered over the '{event_name}' container.")
+
+    # The button takes longer under load; its timeout follows the latency observed so far
+    join_button = adaptive_wait("lobby.join_button", wait_for_element_to_be_visible, driver, *LobbyPage.JOIN_BUTTON,
+                                default=60, ceiling=120)
+    join_button.click()
+    logging.info("Clicked the 'Join' button.")
 
+    # After clicking "Join," verify that the expected content appears
+    wait_for_element_to_be_visible(driver, *LobbyPage.EVENT_WELCOME_MESSAGE)
+    logging.info(f"Successfully navigated to the '{event_name}' event page.")
 
+
+@recorded()
+@timed()
 def access_global_gallery(driver):
     """
     Access the Global Gallery if the Global Library is not available.
 
     :param driver: WebDriver instance.
     """
-    global_gallery_button_xpath = "//button[contains(@class, 'GlobalGalleryButton')]"
-    wait_for_element_to_be_visible_and_clickable(driver, By.XPATH, global_gallery_button_xpath)
-
-    global_gallery_button = driver.find_element(By.XPATH, global_gallery_button_xpath)
-    global_gallery_button.click()
+    click(driver, LobbyPage.GLOBAL_GALLERY_BUTTON)
     logging.info("Clicked on the Global Gallery button.")
 
 
@@ -0,0 +1,149 @@
+import pytest
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, WebDriverException
+
+from utils import resilience, timing
+from utils.resilience import CircuitBreaker, adaptive_timeout, current_page, page_of, resilient, retry
+from utils.timing import StepHistogram
+
+
+@pytest.fixture()
+def histogram(monkeypatch):
+    histogram = StepHistogram()
+    monkeypatch.setattr(resilience, "histogram", histogram)
+    monkeypatch.setattr(timing, "histogram", histogram)
+    return histogram
+
+
+@pytest.fixture()
+def no_sleep(monkeypatch):
+    delays = []
+    monkeypatch.setattr(resilience.time, "sleep", delays.append)
+    return delays
+
+
+def test_retry_repeats_transient_errors_with_bounded_backoff(no_sleep):
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise StaleElementReferenceException("stale element reference")
+        return "joined"
+
+    assert retry(flaky, attempts=3) == "joined"
+    assert len(calls) == 3
+    assert len(no_sleep) == 2 and all(0 <= delay <= resilience.RETRY_MAX_DELAY for delay in no_sleep)
+
+
+def test_retry_does_not_repeat_other_errors(no_sleep):
+    calls = []
+
+    def slow():
+        calls.append(1)
+        raise TimeoutException("Join button not visible")
+
+    with pytest.raises(TimeoutException):
+        retry(slow, attempts=3)
+    assert len(calls) == 1 and no_sleep == []
+
+
+def test_adaptive_timeout_follows_observed_latency(histogram):
+    assert adaptive_timeout("lobby.join_button", default=60) == 60
+    for _ in range(10):
+        histogram.record("lobby.join_button", 12.0)
+
+    assert adaptive_timeout("lobby.join_button", default=60, ceiling=120) == pytest.approx(12.0 * resilience.ADAPTIVE_TIMEOUT_FACTOR)
+    assert adaptive_timeout("lobby.join_button", default=60, ceiling=30) == 30
+
+
+def test_adaptive_timeout_never_drops_below_the_floor(histogram):
+    for _ in range(5):
+        histogram.record("lobby.join_button", 0.3)
+
+    # Fast calls only trim the default, so an ordinary slowdown does not fail the wait
+    assert adaptive_timeout("lobby.join_button", default=20) == 20 * resilience.ADAPTIVE_TIMEOUT_FLOOR
+    assert adaptive_timeout("lobby.join_button", default=20, floor=1.0) == 1.0
+
+
+def test_adaptive_timeout_grows_after_timeouts_and_recovers(histogram, monkeypatch):
+    monkeypatch.setattr(resilience, "ADAPTIVE_TIMEOUT_WINDOW", 20)
+    for _ in range(5):
+        histogram.record("lobby.join_button", 1.0)
+    timeouts = []
+    for _ in range(4):
+        # The application slowed down: every wait runs into its timeout, which is recorded as failed
+        timeouts.append(adaptive_timeout("lobby.join_button", default=20, ceiling=60))
+        histogram.record("lobby.join_button", timeouts[-1], failed=True)
+    assert timeouts == [10.0, 30.0, 60, 60]
+
+    for _ in range(20):
+        histogram.record("lobby.join_button", 1.0)
+    assert adaptive_timeout("lobby.join_button", default=20, ceiling=60) == 10.0
+
+
+def test_resilient_wait_adapts_its_default_timeout_and_retries(histogram, no_sleep):
+    calls = []
+
+    @resilient()
+    def wait_for_element(driver, by, value, timeout=10):
+        calls.append(timeout)
+        if len(calls) == 1:
+            raise StaleElementReferenceException("stale element reference")
+        return value
+
+    assert wait_for_element(None, "css selector", ".JoinButton") == ".JoinButton"
+    assert calls == [10, 10] and len(no_sleep) == 1
+    assert len(histogram.durations("adaptive.wait_for_element[css selector=.JoinButton]")) == 1
+
+    for _ in range(5):
+        histogram.record("adaptive.wait_for_element[css selector=.JoinButton]", 20.0)
+    calls.clear()
+    wait_for_element(None, "css selector", ".JoinButton")
+    assert calls[-1] == 30  # Three times the declared default at most
+
+    calls.clear()
+    wait_for_element(None, "css selector", ".JoinButton", timeout=2)
+    assert calls[-1] == 2  # Explicit timeouts are kept
+
+
+def test_page_waits_are_keyed_by_page(histogram, no_sleep):
+    class Driver:
+        current_url = "https://tenant.example.com/app/?session=1#/lobby?tab=events"
+
+    @resilient(key=current_page)
+    def wait_for_page(driver, timeout=30):
+        return timeout
+
+    assert page_of(Driver.current_url) == "tenant.example.com/app/#/lobby"
+    wait_for_page(Driver())
+    assert histogram.durations("adaptive.wait_for_page[tenant.example.com/app/#/lobby]")
+
+
+def test_failure_is_reported_once_after_the_retries(histogram, no_sleep):
+    failures = []
+
+    @resilient(on_failure=lambda arguments, error: failures.append((arguments["value"], type(error))))
+    def wait_for_element(driver, by, value, timeout=10):
+        raise StaleElementReferenceException("stale element reference")
+
+    with pytest.raises(StaleElementReferenceException):
+        wait_for_element(None, "css selector", ".JoinButton")
+    assert failures == [(".JoinButton", StaleElementReferenceException)]
+    assert len(no_sleep) == resilience.RETRY_ATTEMPTS - 1
+
+
+def test_circuit_breaker_opens_after_consecutive_infrastructure_failures():
+    breaker = CircuitBreaker(threshold=2, health_url="")
+    breaker.record_failure(WebDriverException("unknown error: net::ERR_CONNECTION_REFUSED"))
+    breaker.record_failure(AssertionError("Welcome message not displayed as expected."))
+    assert breaker.failures == 0  # The application answered
+
+    breaker.record_failure(WebDriverException("chrome not reachable"))
+    breaker.record_failure(TimeoutException("no health check URL"))
+    assert not breaker.open
+
+    breaker.record_failure(WebDriverException("unknown error: net::ERR_NAME_NOT_RESOLVED"))
+    breaker.record_failure(WebDriverException("unknown error: net::ERR_CONNECTION_REFUSED"))
+    assert breaker.open
+    breaker.record_success()
+    assert breaker.open
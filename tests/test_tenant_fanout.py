@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+from utils.tenant_fanout import TenantFanout, write_tenant_report
+
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, handle):
+        self.driver.current_window_handle = handle
+
+
+class FakeDriver:
+    """Just enough of a Chrome WebDriver for isolated browser contexts."""
+
+    def __init__(self):
+        self.current_window_handle = "main"
+        self.current_url = "about:blank"
+        self.switch_to = FakeSwitchTo(self)
+        self.contexts = []
+        self.disposed = []
+
+    def execute_cdp_cmd(self, command, params):
+        if command == "Target.createBrowserContext":
+            self.contexts.append(f"context-{len(self.contexts) + 1}")
+            return {"browserContextId": self.contexts[-1]}
+        if command == "Target.createTarget":
+            return {"targetId": f"page-of-{params['browserContextId']}"}
+        if command == "Target.disposeBrowserContext":
+            self.disposed.append(params["browserContextId"])
+        return {}
+
+
+def login(driver, row):
+    assert driver.current_window_handle.startswith("page-of-"), "Login must run in the isolated context."
+    if row["password"] != "right":
+        raise AssertionError("Welcome message not displayed.")
+    driver.current_url = f"{row['url']}#/lobby"
+
+
+def row(tenant, password="right", **extra):
+    return {"tenant": tenant, "url": f"https://{tenant}.example.com/", "username": f"user@{tenant}",
+            "password": password, **extra}
+
+
+@pytest.mark.parametrize("tenant_row, passed", [
+    (row("acme"), True),
+    (row("acme", password="wrong"), False),
+    (row("invalid", password="wrong", expected=" Failure "), True),
+    (row("invalid", expected="failure"), False),
+    # openpyxl returns cells that do not hold text as booleans or numbers
+    (row("acme", expected=True), True),
+    (row("acme", expected=0), True),
+])
+def test_check_compares_the_login_with_the_expected_outcome(tenant_row, passed):
+    driver = FakeDriver()
+
+    result = TenantFanout(login)._check(driver, tenant_row)
+
+    assert result.passed is passed
+    assert driver.disposed == driver.contexts == ["context-1"]
+    assert driver.current_window_handle == "main"
+
+
+def test_check_records_the_error_and_landing_url():
+    fanout, driver = TenantFanout(login), FakeDriver()
+
+    succeeded = fanout._check(driver, row("acme"))
+    failed = fanout._check(driver, row("globex", password="wrong"))
+
+    assert succeeded.landing_url == "https://acme.example.com/#/lobby" and succeeded.error is None
+    assert failed.landing_url is None
+    assert failed.error == "AssertionError: Welcome message not displayed."
+    assert driver.disposed == ["context-1", "context-2"]
+
+
+def test_report_summarizes_per_tenant(tmp_path):
+    fanout, driver = TenantFanout(login), FakeDriver()
+    results = [fanout._check(driver, tenant_row) for tenant_row in (
+        row("acme"), row("acme", password="wrong"), row("globex"), row("invalid", expected="failure"))]
+    path = tmp_path / "reports" / "tenants_report.json"
+
+    summary = write_tenant_report(results, str(path))
+
+    assert summary["tenants"] == 3 and summary["checks"] == 4
+    assert summary["failed_tenants"] == ["acme", "invalid"]
+    assert summary["by_tenant"]["acme"]["passed"] == 1 and summary["by_tenant"]["acme"]["failed"] == 1
+    assert summary["by_tenant"]["invalid"]["errors"] == ["user@invalid: login succeeded but failure was expected"]
+    with open(path) as f:
+        report = json.load(f)
+    assert report["summary"] == summary
+    assert [result["passed"] for result in report["results"]] == [True, False, True, False]
@@ -0,0 +1,87 @@
+import datetime
+import os
+
+import pytest
+
+openpyxl = pytest.importorskip("openpyxl")
+
+from utils import test_data  # noqa: E402
+from utils.test_data import iter_test_rows, load_test_cases  # noqa: E402
+
+
+def write_workbook(path, rows):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = "logins"
+    for row in rows:
+        sheet.append(row)
+    workbook.create_sheet("tenants").append(["tenant", "url"])
+    workbook["tenants"].append(["acme", "https://acme.example.com"])
+    workbook.save(path)
+
+
+@pytest.fixture()
+def builds(monkeypatch):
+    calls = []
+    build_cache = test_data._build_cache
+
+    def counting_build(*args):
+        calls.append(args[0])
+        return build_cache(*args)
+
+    monkeypatch.setattr(test_data, "_build_cache", counting_build)
+    return calls
+
+
+@pytest.fixture()
+def workbook(tmp_path):
+    path = str(tmp_path / "test_data.xlsx")
+    write_workbook(path, [
+        ["username", "password", None],
+        ["44@cympire.com", "234!", datetime.timedelta(minutes=1, seconds=30)],
+        [None, None, None],
+        ["55@cympire.com", 1234, datetime.date(2024, 5, 1)],
+    ])
+    return path
+
+
+def test_rows_are_read_from_a_cache_built_once(workbook, builds):
+    rows = list(iter_test_rows(workbook))
+
+    assert rows == [
+        {"username": "44@cympire.com", "password": "234!", "column_2": 90.0},
+        {"username": "55@cympire.com", "password": 1234, "column_2": "2024-05-01T00:00:00"},
+    ]
+    assert list(iter_test_rows(workbook, sheet="tenants")) == [{"tenant": "acme", "url": "https://acme.example.com"}]
+    assert builds == [workbook]
+    assert os.path.exists(test_data._cache_path(workbook))
+
+
+def test_touched_workbook_with_the_same_content_is_not_rebuilt(workbook, builds):
+    list(iter_test_rows(workbook))
+    stat = os.stat(workbook)
+    os.utime(workbook, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    list(iter_test_rows(workbook))
+    list(iter_test_rows(workbook))
+
+    assert builds == [workbook]
+
+
+def test_changed_workbook_is_rebuilt(workbook, builds):
+    list(iter_test_rows(workbook))
+    write_workbook(workbook, [["username", "password"], ["66@cympire.com", "secret"]])
+
+    assert list(iter_test_rows(workbook)) == [{"username": "66@cympire.com", "password": "secret"}]
+    assert len(builds) == 2
+
+
+def test_unknown_sheet_raises(workbook):
+    with pytest.raises(KeyError):
+        list(iter_test_rows(workbook, sheet="missing"))
+
+
+def test_test_cases_are_identified_by_column(workbook):
+    cases = load_test_cases(workbook, id_column="username")
+
+    assert [case.id for case in cases] == ["44@cympire.com", "55@cympire.com"]
@@ -0,0 +1,134 @@
+import base64
+import io
+import os
+import subprocess
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+
+from utils.screenshot_helpers import compare_screenshot, flush_screenshots  # noqa: E402
+from utils.visual_compare import baseline_path_for, compare_images, compare_to_baseline, difference_hash  # noqa: E402
+
+BASELINE = "Positive_Team_Player_Login_Test"
+# A 200x60 block over the event card: 0.7% of the frame, 7x the tolerance, with an unchanged difference hash
+HASH_INVISIBLE_BOX = (800, 420, 1000, 480)
+
+
+def png_bytes(image):
+    output = io.BytesIO()
+    image.save(output, format="PNG")
+    return output.getvalue()
+
+
+def painted(path, box, color=(255, 0, 0)):
+    image = Image.open(path).convert("RGB")
+    image.paste(color, box)
+    return image
+
+
+def test_identical_screenshot_matches_without_pixel_diff():
+    path = baseline_path_for(BASELINE)
+    with open(path, "rb") as f:
+        result = compare_images(f.read(), path)
+
+    assert result.matched and result.diff_ratio == 0.0
+
+
+def test_reencoded_identical_screenshot_matches():
+    path = baseline_path_for(BASELINE)
+    result = compare_images(png_bytes(Image.open(path).convert("RGB")), path)
+
+    assert result.matched and result.diff_pixels == 0
+
+
+def test_small_change_with_same_perceptual_hash_is_still_diffed(tmp_path):
+    path = baseline_path_for(BASELINE)
+    actual_image = painted(path, HASH_INVISIBLE_BOX)
+    assert (difference_hash(actual_image) == difference_hash(Image.open(path).convert("RGB"))).all()
+
+    result = compare_images(png_bytes(actual_image), path, diff_path=str(tmp_path / "diff.png"))
+
+    assert not result.matched
+    assert result.diff_ratio == pytest.approx(0.007, abs=0.001)
+    assert result.hash_distance == 0
+    assert os.path.exists(tmp_path / "diff.png")
+
+
+def test_change_inside_ignore_region_matches():
+    path = baseline_path_for(BASELINE)
+    actual = png_bytes(painted(path, HASH_INVISIBLE_BOX))
+
+    assert compare_images(actual, path, ignore_regions=[HASH_INVISIBLE_BOX]).matched
+
+
+def test_change_within_tolerance_matches():
+    path = baseline_path_for(BASELINE)
+    actual = png_bytes(painted(path, (0, 0, 10, 10)))
+
+    result = compare_images(actual, path)
+    assert result.matched and result.diff_pixels == 100
+
+
+def test_size_mismatch_fails():
+    path = baseline_path_for(BASELINE)
+    result = compare_images(png_bytes(Image.new("RGB", (800, 600))), path)
+
+    assert not result.matched and result.diff_ratio == 1.0
+
+
+def test_no_baseline_returns_none():
+    assert compare_to_baseline(png_bytes(Image.new("RGB", (10, 10))), "Test_Without_Baseline") is None
+
+
+class ScreenshotDriver:
+    def __init__(self, image):
+        self.png = png_bytes(image)
+
+    def get_screenshot_as_base64(self):
+        return base64.b64encode(self.png).decode()
+
+
+def test_compare_screenshot_reports_the_difference_to_the_test(tmp_path):
+    path = baseline_path_for(BASELINE)
+    driver = ScreenshotDriver(painted(path, HASH_INVISIBLE_BOX))
+
+    result = compare_screenshot(driver, str(tmp_path), BASELINE)
+    flush_screenshots()
+
+    assert not result.matched
+    assert os.path.exists(tmp_path / f"{BASELINE}_success.png")
+    assert os.path.exists(tmp_path / f"{BASELINE}_diff.png")
+
+
+def test_compare_screenshot_masks_ignored_regions(tmp_path):
+    path = baseline_path_for(BASELINE)
+    driver = ScreenshotDriver(painted(path, HASH_INVISIBLE_BOX))
+
+    result = compare_screenshot(driver, str(tmp_path), BASELINE, ignore_regions=[HASH_INVISIBLE_BOX])
+    flush_screenshots()
+
+    assert result.matched
+    assert not os.listdir(tmp_path)  # Matching success screenshots are not written
+
+
+def test_first_comparisons_on_parallel_threads_both_succeed():
+    # In a fresh interpreter, so NumPy and Pillow are loaded by the racing comparisons themselves
+    script = f"""
+import threading
+barrier, results = threading.Barrier(2), []
+def compare():
+    barrier.wait()
+    # The pipeline threads import the comparison on first use, as utils/screenshot_helpers.py does
+    from utils.visual_compare import baseline_path_for, compare_images
+    path = baseline_path_for({BASELINE!r})
+    results.append(compare_images(path, path).matched)
+threads = [threading.Thread(target=compare) for _ in range(2)]
+[thread.start() for thread in threads]
+[thread.join() for thread in threads]
+assert results == [True, True], results
+"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, "-c", script], cwd=root, check=True)
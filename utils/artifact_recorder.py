@@ -0,0 +1,231 @@
+"""
+Failure-only artifacts from an in-memory ring buffer of test steps.
+
+While a test runs, each recorded step keeps a snapshot (step name, error and
+the log lines emitted since the previous step) in a bounded ring buffer. Only
+the final failure snapshot reads the browser (URL, DOM and screenshot), so green
+runs pay no WebDriver round trips; ARTIFACT_STEP_CAPTURE=1 captures the browser
+state at every step. Nothing is written for passing tests; when a test fails,
+the buffer and the final snapshot are written to the run directory under unique
+per-test, per-step names.
+
+Also a pytest plugin (registered in the root conftest.py) that dumps the
+buffer of a failing test.
+"""
+import contextvars
+import functools
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import pytest
+
+from utils.log_config import LOG_FORMAT
+
+# Number of step snapshots kept per test
+ARTIFACT_RING_SIZE = int(os.environ.get("ARTIFACT_RING_SIZE", "10"))
+# Capture URL, DOM and screenshot with every step snapshot ("1") or only for the final failure snapshot ("0")
+ARTIFACT_STEP_CAPTURE = os.environ.get("ARTIFACT_STEP_CAPTURE", "0") == "1"
+# Log lines kept between two snapshots
+MAX_LOG_LINES = 500
+
+_SNAPSHOT_SCRIPT = "return [window.location.href, document.documentElement ? document.documentElement.outerHTML : ''];"
+
+_current_recorder = contextvars.ContextVar("artifact_recorder", default=None)
+RECORDER_KEY = pytest.StashKey()
+
+
+class StepSnapshot:
+    """State of the browser after one step."""
+
+    def __init__(self, index, step, url, dom, screenshot_base64, log_lines, error=None):
+        self.index = index
+        self.step = step
+        self.url = url
+        self.dom = dom
+        self.screenshot_base64 = screenshot_base64
+        self.log_lines = log_lines
+        self.error = error
+        self.recorded_at = time.time()
+
+
+class _RecorderLogHandler(logging.Handler):
+    """Copies log lines into the recorder of the context that logged them."""
+
+    def emit(self, record):
+        recorder = _current_recorder.get()
+        if recorder is not None:
+            try:
+                recorder.log_lines.append(self.format(record))
+            except Exception:
+                self.handleError(record)
+
+
+_log_handler = _RecorderLogHandler()
+_log_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+
+class ArtifactRecorder:
+    """
+    Ring buffer of the last step snapshots of one test.
+
+    :param artifact_dir: Directory the artifacts are written to if the test fails.
+    :param capacity: Number of step snapshots kept.
+    :param step_capture: Capture URL, DOM and screenshot with every step, not only on failure.
+    """
+
+    def __init__(self, artifact_dir, capacity=ARTIFACT_RING_SIZE, step_capture=ARTIFACT_STEP_CAPTURE):
+        self.artifact_dir = artifact_dir
+        self.step_capture = step_capture
+        self.snapshots = deque(maxlen=max(1, capacity))
+        self.log_lines = deque(maxlen=MAX_LOG_LINES)
+        self.driver = None
+        self.dumped = False
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def record(self, driver, step, error=None, capture=None):
+        """
+        Keep a snapshot of a step; the oldest one is dropped when the buffer is full.
+
+        :param driver: WebDriver instance, remembered for the final failure snapshot.
+        :param step: Step name, e.g. the flow function or the locator that failed.
+        :param error: Exception or message when the step failed.
+        :param capture: Read URL, DOM and screenshot from the browser (True) or not (False);
+                        defaults to the recorder setting.
+        """
+        self.driver = driver
+        url = dom = png_base64 = None
+        if self.step_capture if capture is None else capture:
+            try:
+                url, dom = driver.execute_script(_SNAPSHOT_SCRIPT)
+                png_base64 = driver.get_screenshot_as_base64()
+            except Exception as e:  # The browser may be gone; keep whatever was captured
+                logging.debug(f"Incomplete snapshot for step '{step}': {e}")
+        with self._lock:
+            self._count += 1
+            lines = list(self.log_lines)
+            self.log_lines.clear()
+            self.snapshots.append(StepSnapshot(self._count, step, url, dom, png_base64, lines,
+                                               str(error) if error is not None else None))
+
+    def dump(self, error=None):
+        """
+        Write the buffered snapshots, plus a final one of the current browser state, to ``artifact_dir``.
+
+        Files are named "<index>_<step>.json/.html/.png"; indexes keep counting across dropped
+        snapshots, so names stay unique and ordered. Only the first call writes anything.
+
+        :param error: Failure description stored with the final snapshot.
+        :return: List of written file paths (screenshots are written in the background).
+        """
+        if self.dumped:
+            return []
+        self.dumped = True
+        if self.driver is not None:
+            self.record(self.driver, "failure", error=error or "test failed", capture=True)
+        elif self.log_lines:
+            self.snapshots.append(StepSnapshot(self._count + 1, "failure", None, None, None, list(self.log_lines), error))
+        if not self.snapshots:
+            return []
+
+        from utils.screenshot_helpers import get_screenshot_pipeline
+
+        os.makedirs(self.artifact_dir, exist_ok=True)
+        written = []
+        for snapshot in self.snapshots:
+            base = os.path.join(self.artifact_dir, f"{snapshot.index:03d}_{_safe_name(snapshot.step)}")
+            with open(f"{base}.json", "w") as f:
+                json.dump({
+                    "index": snapshot.index, "step": snapshot.step, "url": snapshot.url, "error": snapshot.error,
+                    "recorded_at": snapshot.recorded_at, "log_lines": snapshot.log_lines,
+                }, f, indent=2)
+            written.append(f"{base}.json")
+            if snapshot.dom is not None:
+                with open(f"{base}.html", "w", encoding="utf-8") as f:
+                    f.write(snapshot.dom)
+                written.append(f"{base}.html")
+            if snapshot.screenshot_base64:
+                get_screenshot_pipeline().submit(snapshot.screenshot_base64, f"{base}.png")
+                written.append(f"{base}.png")
+        logging.info(f"Failure artifacts for {len(self.snapshots)} steps written to {self.artifact_dir}.")
+        return written
+
+
+def _safe_name(name):
+    return re.sub(r"[^\w.-]+", "_", name).strip("_")[:80] or "step"
+
+
+def current_recorder():
+    """Return the recorder of the running test, or None outside of a recording."""
+    return _current_recorder.get()
+
+
+@contextmanager
+def recording(item, artifact_dir):
+    """
+    Record the steps of a test; the plugin hook dumps them if the test fails.
+
+    :param item: The pytest item (``request.node``).
+    :param artifact_dir: Directory for this test's artifacts.
+    """
+    recorder = ArtifactRecorder(artifact_dir)
+    item.stash[RECORDER_KEY] = recorder
+    if _log_handler not in logging.root.handlers:
+        logging.root.addHandler(_log_handler)
+    token = _current_recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _current_recorder.reset(token)
+
+
+def attach_driver(driver):
+    """Remember the test's driver so a failure snapshot can be taken even if no step was recorded."""
+    recorder = _current_recorder.get()
+    if recorder is not None and recorder.driver is None:
+        recorder.driver = driver
+
+
+def record_step(driver, step, error=None):
+    """Record a snapshot in the running test's recorder, if any."""
+    recorder = _current_recorder.get()
+    if recorder is not None:
+        recorder.record(driver, step, error=error)
+
+
+def recorded(name=None):
+    """
+    Decorator recording a snapshot after every call of a flow function taking the driver first.
+
+    :param name: Step name; defaults to the function name.
+    """
+    def decorator(func):
+        step = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(driver, *args, **kwargs):
+            try:
+                result = func(driver, *args, **kwargs)
+            except Exception as e:
+                record_step(driver, step, error=e)
+                raise
+            record_step(driver, step)
+            return result
+        return wrapper
+    return decorator
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    # Runs right after the failing phase, before fixtures release the browser
+    outcome = yield
+    report = outcome.get_result()
+    recorder = item.stash.get(RECORDER_KEY, None)
+    if recorder is not None and report.failed:
+        recorder.dump(error=f"{report.when} failed: {call.excinfo.exconly() if call.excinfo else report.longreprtext}")
@@ -0,0 +1,175 @@
+"""
+Reuse of authenticated browser state between tests.
+
+Each role logs in through the UI once; its cookies, localStorage and
+sessionStorage are snapshotted and restored into later drivers with a single
+cheap navigation instead of a full UI login.
+"""
+import logging
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import TimeoutException
+
+from utils.wait_engine import NETWORK_SHIM, wait_for_condition
+
+DEFAULT_TTL = 15 * 60
+# Substrings of the URL that mean the application bounced us back to the login page
+DEFAULT_LOGIN_MARKERS = ("login", "signin", "sign-in")
+# Statuses of the landing page or of its fetch/XHR calls that mean the restored session was rejected
+REJECTED_STATUSES = (401, 403)
+# The landing page has checked the session once no fetch/XHR request was in flight for this long (ms)
+RESTORE_IDLE_MS = int(os.environ.get("NETWORK_IDLE_MS", "500"))
+RESTORE_IDLE_TIMEOUT = 15
+
+_SNAPSHOT_STORAGE_SCRIPT = """
+function dump(storage) {
+    var out = {};
+    try { for (var i = 0; i < storage.length; i++) { var k = storage.key(i); out[k] = storage.getItem(k); } } catch (e) {}
+    return out;
+}
+return {"local": dump(window.localStorage), "session": dump(window.sessionStorage)};
+"""
+
+_RESTORE_STORAGE_SCRIPT = """
+var state = arguments[0];
+Object.keys(state.local).forEach(function (k) { window.localStorage.setItem(k, state.local[k]); });
+Object.keys(state.session).forEach(function (k) { window.sessionStorage.setItem(k, state.session[k]); });
+"""
+
+# Status of the document and of every fetch/XHR response the network shim recorded on the page
+_RESPONSE_STATUSES_SCRIPT = NETWORK_SHIM + """
+var statuses = window.__netIdle.responses.map(function (response) { return response.status; });
+var entry = (performance.getEntriesByType("navigation") || [])[0];
+if (entry && entry.responseStatus) { statuses.push(entry.responseStatus); }
+return statuses;
+"""
+
+
+class AuthState:
+    """Snapshot of an authenticated browser session."""
+
+    def __init__(self, origin, landing_url, cookies, storage):
+        self.origin = origin
+        self.landing_url = landing_url
+        self.cookies = cookies
+        self.storage = storage
+        self.created_at = time.monotonic()
+
+    def age(self):
+        return time.monotonic() - self.created_at
+
+
+def _origin(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class AuthStateCache:
+    """
+    Per-role cache of authenticated session state.
+
+    :param login: Callable ``login(driver, role)`` that performs a UI login for the role.
+    :param ttl: Seconds after which a snapshot is discarded and the role logs in again.
+    :param restore_path: Path on the application origin loaded before cookies are injected;
+                         should be cheap to fetch (cookies can only be set on a matching origin).
+    :param login_markers: URL substrings identifying the login page.
+    """
+
+    def __init__(self, login, ttl=DEFAULT_TTL, restore_path="/favicon.ico", login_markers=DEFAULT_LOGIN_MARKERS):
+        self.login = login
+        self.ttl = ttl
+        self.restore_path = restore_path
+        self.login_markers = login_markers
+        self._states = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _role_lock(self, role):
+        with self._lock:
+            return self._locks.setdefault(role, threading.Lock())
+
+    def invalidate(self, role):
+        """Forget the snapshot of a role so the next request logs in again."""
+        with self._lock:
+            self._states.pop(role, None)
+        logging.info(f"Auth state for role '{role}' invalidated.")
+
+    def snapshot(self, driver, role):
+        """
+        Record the current session of an already logged-in driver for a role.
+
+        :param driver: WebDriver instance that has just logged in.
+        :param role: Role name, e.g. "player" or "admin".
+        """
+        state = AuthState(
+            origin=_origin(driver.current_url),
+            landing_url=driver.current_url,
+            cookies=driver.get_cookies(),
+            storage=driver.execute_script(_SNAPSHOT_STORAGE_SCRIPT),
+        )
+        with self._lock:
+            self._states[role] = state
+        logging.info(f"Auth state for role '{role}' cached ({len(state.cookies)} cookies).")
+        return state
+
+    def _valid_state(self, role):
+        with self._lock:
+            state = self._states.get(role)
+        if state is not None and state.age() > self.ttl:
+            logging.info(f"Auth state for role '{role}' expired after {state.age():.0f} seconds.")
+            self.invalidate(role)
+            return None
+        return state
+
+    def _restore(self, driver, state):
+        driver.get(state.origin + self.restore_path)
+        for cookie in state.cookies:
+            cookie = dict(cookie)
+            if "expiry" in cookie:
+                cookie["expiry"] = int(cookie["expiry"])
+            driver.add_cookie(cookie)
+        driver.execute_script(_RESTORE_STORAGE_SCRIPT, state.storage)
+        driver.get(state.landing_url)
+
+    def is_authenticated(self, driver):
+        """
+        Tell whether the page loaded in the driver is an authenticated page.
+
+        An SPA learns that a session was rejected from its API calls and redirects to the login
+        page on the client, after the load. So the page is first given until network idle, then
+        checked for a login URL and for a 401/403 on the document or on any fetch/XHR response.
+        """
+        try:
+            wait_for_condition(driver, "network_idle", value=RESTORE_IDLE_MS, timeout=RESTORE_IDLE_TIMEOUT)
+        except TimeoutException:
+            logging.warning("Landing page did not become idle; checking the restored session anyway.")
+        url = driver.current_url.lower()
+        if any(marker in url for marker in self.login_markers):
+            return False
+        return not any(status in REJECTED_STATUSES for status in driver.execute_script(_RESPONSE_STATUSES_SCRIPT))
+
+    def authenticate(self, driver, role):
+        """
+        Bring a driver into an authenticated session for a role.
+
+        Restores the cached snapshot when one is available and still accepted by the
+        application; otherwise logs in through the UI and caches the new session.
+
+        :param driver: WebDriver instance, typically freshly leased from the pool.
+        :param role: Role name, e.g. "player" or "admin".
+        """
+        with self._role_lock(role):
+            state = self._valid_state(role)
+            if state is not None:
+                self._restore(driver, state)
+                if self.is_authenticated(driver):
+                    logging.info(f"Restored cached auth state for role '{role}'.")
+                    return driver
+                logging.warning(f"Cached auth state for role '{role}' was rejected; logging in again.")
+                self.invalidate(role)
+            self.login(driver, role)
+            self.snapshot(driver, role)
+            return driver
@@ -0,0 +1,203 @@
+"""
+Chrome launch profiles for the test suite.
+
+A profile decides whether the browser runs headless, its fixed viewport, the
+page-load strategy and which resources (images, fonts, analytics) are blocked.
+Browsers start from a copy of a pre-warmed user-data-dir template so they skip
+first-run work. Tests pick a profile through their pytest markers.
+"""
+import logging
+import os
+import shutil
+import tempfile
+
+from utils.lazy import lazy_import
+from utils.wait_engine import install_network_shim
+
+# Executed when the first browser is launched, not when test modules are collected
+webdriver = lazy_import("selenium.webdriver")
+
+# Resources blocked for tests that do not validate the rendered page
+FONT_PATTERNS = ("*.woff", "*.woff2", "*.ttf", "*.otf", "*fonts.googleapis.com*", "*fonts.gstatic.com*")
+ANALYTICS_PATTERNS = (
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*hotjar.com*", "*segment.io*", "*segment.com*", "*mixpanel.com*", "*intercom.io*",
+)
+# Not "*.ico": AuthStateCache restores sessions by navigating to /favicon.ico, and a blocked
+# navigation leaves an error page on which cookies and storage cannot be set
+IMAGE_PATTERNS = ("*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg")
+
+COMMON_ARGUMENTS = (
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-sync",
+    "--disable-default-apps",
+    "--disable-dev-shm-usage",
+    "--mute-audio",
+)
+
+PROFILE_TEMPLATE_DIR = os.environ.get(
+    "BROWSER_PROFILE_TEMPLATE", os.path.join(tempfile.gettempdir(), "devopse2e_chrome_profile_template")
+)
+
+
+class BrowserProfile:
+    """
+    Launch settings for one kind of test.
+
+    :param name: Profile name, also used to key driver pools.
+    :param headless: Run Chrome without a window.
+    :param window_size: Fixed (width, height) viewport used instead of maximize_window().
+    :param page_load_strategy: "eager" returns after DOMContentLoaded, "normal" waits for the load event.
+    :param block_images: Disable image loading.
+    :param blocked_urls: URL patterns blocked through the DevTools protocol.
+    """
+
+    def __init__(self, name, headless=True, window_size=(1920, 1080), page_load_strategy="eager",
+                 block_images=False, blocked_urls=()):
+        self.name = name
+        self.headless = headless
+        self.window_size = window_size
+        self.page_load_strategy = page_load_strategy
+        self.block_images = block_images
+        self.blocked_urls = tuple(blocked_urls)
+
+    def __repr__(self):
+        return f"BrowserProfile({self.name!r})"
+
+
+PROFILES = {
+    # Functional tests: nothing on screen is validated, so skip everything that is only rendered
+    "fast": BrowserProfile("fast", page_load_strategy="eager", block_images=True,
+                           blocked_urls=IMAGE_PATTERNS + FONT_PATTERNS + ANALYTICS_PATTERNS),
+    # Screen validation: full rendering, only third-party analytics blocked. The viewport matches
+    # the screenshots in data/expected_images (a maximized full-HD window).
+    "full": BrowserProfile("full", window_size=(1920, 893), page_load_strategy="normal",
+                           blocked_urls=ANALYTICS_PATTERNS),
+    # Local debugging with a visible window
+    "headed": BrowserProfile("headed", headless=False, page_load_strategy="normal"),
+}
+
+DEFAULT_PROFILE = os.environ.get("BROWSER_PROFILE", "fast")
+
+# Markers from pytest.ini whose tests need the page fully rendered
+MARKER_PROFILES = {
+    "admin_login_validate_screens_positive": "full",
+    "player_login_positive_team_player": "full",
+    "player_login_verify_video_button_functionality": "full",
+    "login_page_verify_terms_and_conditions_displayed": "full",
+}
+
+
+def profile_for_markers(marker_names):
+    """
+    Choose the launch profile for a test from its marker names.
+
+    :param marker_names: Iterable of marker names applied to the test.
+    :return: BrowserProfile; the default profile when no marker asks for another one.
+    """
+    if DEFAULT_PROFILE == "headed":
+        return PROFILES["headed"]
+    for name in marker_names:
+        if name in MARKER_PROFILES:
+            return PROFILES[MARKER_PROFILES[name]]
+    return PROFILES[DEFAULT_PROFILE]
+
+
+def build_chrome_options(profile, user_data_dir=None):
+    """
+    Build ChromeOptions for a profile.
+
+    :param profile: BrowserProfile.
+    :param user_data_dir: Chrome user-data-dir to start from, if any.
+    """
+    options = webdriver.ChromeOptions()
+    for argument in COMMON_ARGUMENTS:
+        options.add_argument(argument)
+    if profile.headless:
+        options.add_argument("--headless=new")
+    options.add_argument(f"--window-size={profile.window_size[0]},{profile.window_size[1]}")
+    if user_data_dir:
+        options.add_argument(f"--user-data-dir={user_data_dir}")
+    if profile.block_images:
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    options.page_load_strategy = profile.page_load_strategy
+    return options
+
+
+def prepare_profile_template(template_dir=PROFILE_TEMPLATE_DIR):
+    """
+    Create the pre-warmed user-data-dir template if it does not exist yet.
+
+    Chrome is started once on an empty directory so first-run files, caches and
+    the component setup are already in place for every later launch.
+
+    :return: Path of the template directory.
+    """
+    if os.path.isdir(template_dir):
+        return template_dir
+    staging_dir = tempfile.mkdtemp(prefix="chrome_template_", dir=os.path.dirname(template_dir))
+    driver = webdriver.Chrome(options=build_chrome_options(PROFILES["fast"], user_data_dir=staging_dir))
+    try:
+        driver.get("about:blank")
+    finally:
+        driver.quit()
+    for lock_file in ("SingletonLock", "SingletonSocket", "SingletonCookie"):
+        path = os.path.join(staging_dir, lock_file)
+        if os.path.lexists(path):
+            os.remove(path)
+    try:
+        os.rename(staging_dir, template_dir)  # Atomic; another worker may have won the race
+        logging.info(f"Browser profile template prepared at {template_dir}.")
+    except OSError:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+    return template_dir
+
+
+def apply_page_settings(driver):
+    """
+    Apply the per-page DevTools settings of the driver's profile to its current window.
+
+    URL blocking and scripts registered for new documents belong to one page target, so this
+    runs at launch and again for every window or browser context opened later.
+
+    :param driver: WebDriver instance started by launch_chrome.
+    """
+    profile = getattr(driver, "browser_profile", None) or PROFILES[DEFAULT_PROFILE]
+    if profile.blocked_urls:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(profile.blocked_urls)})
+    # Every document gets the fetch/XHR tracker before its own scripts run, for network-idle waits
+    install_network_shim(driver)
+
+
+def launch_chrome(profile=None):
+    """
+    Launch Chrome for a profile from a private copy of the profile template.
+
+    :param profile: BrowserProfile; the default profile when None.
+    :return: WebDriver instance. Its user-data-dir is removed when the driver quits.
+    """
+    profile = profile or PROFILES[DEFAULT_PROFILE]
+    user_data_dir = tempfile.mkdtemp(prefix="chrome_profile_")
+    shutil.rmtree(user_data_dir)
+    shutil.copytree(prepare_profile_template(), user_data_dir, symlinks=True)
+
+    driver = webdriver.Chrome(options=build_chrome_options(profile, user_data_dir))  # Ensure ChromeDriver is in your PATH
+    driver.browser_profile = profile
+    apply_page_settings(driver)
+
+    quit_driver = driver.quit
+
+    def quit_and_clean_up():
+        try:
+            quit_driver()
+        finally:
+            shutil.rmtree(user_data_dir, ignore_errors=True)
+
+    driver.quit = quit_and_clean_up
+    logging.info(f"Launched Chrome with the '{profile.name}' profile.")
+    return driver
@@ -0,0 +1,132 @@
+"""
+Incremental scanning of the Global Library / Lobby event galleries.
+
+Each step is one async script call that scrolls the gallery by a page, waits
+for the DOM to settle and returns every rendered event name with its element.
+Names are indexed across steps, and the scan stops as soon as the target is
+indexed or scrolling stops producing anything new.
+"""
+import logging
+
+from utils.timing import timed
+from utils.wait_engine import JS_LOCATOR_HELPERS
+
+# Quiet period without DOM mutations after which a scroll step is considered settled
+DEFAULT_SETTLE_MS = 250
+# Upper bound for one step to wait for lazily loaded items
+DEFAULT_STEP_WAIT_MS = 4000
+DEFAULT_MAX_STEPS = 200
+
+_SCAN_STEP_SCRIPT = JS_LOCATOR_HELPERS + r"""
+var by = arguments[0], value = arguments[1], containerBy = arguments[2], containerValue = arguments[3];
+var doScroll = arguments[4], settleMs = arguments[5], maxWaitMs = arguments[6], done = arguments[arguments.length - 1];
+
+var container = containerBy ? __resolveAll(containerBy, containerValue)[0] : null;
+var scroller = container || document.scrollingElement || document.documentElement;
+var before = scroller.scrollTop, heightBefore = scroller.scrollHeight;
+var mutated = false, quietTimer = null, hardTimer = null, observer = null;
+
+function collect() {
+    if (observer) { observer.disconnect(); }
+    clearTimeout(quietTimer);
+    clearTimeout(hardTimer);
+    var items = [], els = __resolveAll(by, value);
+    for (var i = 0; i < els.length; i++) {
+        items.push([(els[i].innerText || els[i].textContent || "").trim(), els[i]]);
+    }
+    done({
+        "items": items,
+        "moved": scroller.scrollTop !== before,
+        "grew": scroller.scrollHeight !== heightBefore,
+        "mutated": mutated,
+        "at_end": scroller.scrollTop + scroller.clientHeight >= scroller.scrollHeight - 1
+    });
+}
+function quiet() {
+    clearTimeout(quietTimer);
+    quietTimer = setTimeout(collect, settleMs);
+}
+
+observer = new MutationObserver(function () { mutated = true; quiet(); });
+observer.observe(container || document.body, {childList: true, subtree: true, characterData: true});
+if (doScroll) { scroller.scrollTop = before + Math.max(scroller.clientHeight * 0.9, 1); }
+quiet();
+hardTimer = setTimeout(collect, maxWaitMs);
+"""
+
+
+class CatalogScanner:
+    """
+    Index of gallery entries (event name -> element) built incrementally while scrolling.
+
+    :param driver: WebDriver instance.
+    :param item_locator: (By, value) of the elements whose text is the event name.
+    :param container_locator: Optional (By, value) of the scrollable gallery; the page scrolls otherwise.
+    :param settle_ms: Mutation-free period after which a step is considered loaded.
+    :param step_wait_ms: Maximum time a single step waits for new items.
+    :param max_steps: Hard limit on scroll steps so a scan can never hang.
+    """
+
+    def __init__(self, driver, item_locator, container_locator=None, settle_ms=DEFAULT_SETTLE_MS,
+                 step_wait_ms=DEFAULT_STEP_WAIT_MS, max_steps=DEFAULT_MAX_STEPS):
+        self.driver = driver
+        self.item_locator = item_locator
+        self.container_locator = container_locator or (None, None)
+        self.settle_ms = settle_ms
+        self.step_wait_ms = step_wait_ms
+        self.max_steps = max_steps
+        self.index = {}
+        self.steps = 0
+        self.exhausted = False
+
+    def scan_step(self, scroll=True):
+        """
+        Scroll one page (optionally), wait for the gallery to settle and index what is rendered.
+
+        :param scroll: Scroll before collecting; the first step collects in place.
+        :return: Number of names that were not indexed before.
+        """
+        self.driver.set_script_timeout(self.step_wait_ms / 1000 + 5)
+        result = self.driver.execute_async_script(
+            _SCAN_STEP_SCRIPT, self.item_locator[0], self.item_locator[1],
+            self.container_locator[0], self.container_locator[1],
+            scroll, self.settle_ms, self.step_wait_ms,
+        )
+        self.steps += 1
+        new_names = 0
+        for name, element in result["items"]:
+            if name and name not in self.index:
+                new_names += 1
+            if name:
+                self.index[name] = element  # Keep the freshest handle for each name
+        # Nothing new and nothing more to load: the scroller reached the bottom or could not move
+        if scroll and not new_names and not result["grew"] and (result["at_end"] or not result["moved"]):
+            self.exhausted = True
+        logging.info(f"Gallery scan step {self.steps}: {len(result['items'])} rendered, {new_names} new, "
+                     f"{len(self.index)} indexed.")
+        return new_names
+
+    def invalidate(self):
+        """Forget the indexed handles, e.g. after the gallery re-rendered; the next find() rescans in place."""
+        self.index.clear()
+        self.steps = 0
+        self.exhausted = False
+
+    @timed("catalog_scan.find")
+    def find(self, name):
+        """
+        Scan until an event is indexed or scrolling makes no more progress.
+
+        :param name: Event name, e.g. "Extreme Measures".
+        :return: The element of the event, or None if the gallery does not contain it.
+        """
+        if name in self.index:
+            return self.index[name]
+        self.scan_step(scroll=self.steps > 0)
+        while name not in self.index and not self.exhausted and self.steps < self.max_steps:
+            self.scan_step(scroll=True)
+        if name in self.index:
+            logging.info(f"Event '{name}' indexed after {self.steps} scan step(s).")
+            return self.index[name]
+        logging.warning(f"Event '{name}' not found after scanning {len(self.index)} entries in {self.steps} step(s).")
+        return None
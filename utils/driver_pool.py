@@ -0,0 +1,193 @@
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium.common.exceptions import WebDriverException
+from utils.browser_profiles import launch_chrome
+from utils.timing import instrument_driver, timed_step
+
+# Number of browsers per worker process and how many tests a browser may
+# serve before it is replaced by a fresh one.
+DEFAULT_POOL_SIZE = int(os.environ.get("DRIVER_POOL_SIZE", "1"))
+DEFAULT_MAX_USES = int(os.environ.get("DRIVER_MAX_USES", "25"))
+DEFAULT_LEASE_TIMEOUT = 300
+
+
+def create_headless_chrome():
+    """Launch Chrome with the default (headless, resource-trimmed) browser profile."""
+    return launch_chrome()
+
+
+def reset_driver(driver):
+    """
+    Bring a browser back to a neutral state between leases.
+
+    Cookies are cleared for every domain (including SSO providers the test was
+    redirected through), storage for every origin open in one of the windows.
+
+    :param driver: WebDriver instance of a Chromium-based browser.
+    """
+    handles = driver.window_handles
+    origins = set()
+    for handle in reversed(handles):
+        driver.switch_to.window(handle)
+        # sessionStorage belongs to the tab and survives navigating away
+        origin = driver.execute_script(
+            "try { window.sessionStorage.clear(); } catch (e) {}"
+            "return window.location.origin;"
+        )
+        if origin and origin != "null":
+            origins.add(origin)
+        # Close any extra windows a test may have opened
+        if handle != handles[0]:
+            driver.close()
+    driver.switch_to.window(handles[0])
+    driver.get("about:blank")
+    driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+    for origin in sorted(origins):
+        driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+
+
+class DriverPool:
+    """
+    A fixed-size pool of WebDriver instances shared by the tests of one worker.
+
+    Browsers are launched up front, leased to one test at a time, reset when
+    they are returned and recycled after ``max_uses`` leases. A browser that
+    could not be replaced leaves a vacant slot, relaunched on the next acquire().
+    """
+
+    def __init__(self, size=DEFAULT_POOL_SIZE, max_uses=DEFAULT_MAX_USES, factory=create_headless_chrome):
+        """
+        :param size: Number of browsers kept alive by the pool.
+        :param max_uses: Number of leases after which a browser is replaced.
+        :param factory: Callable returning a new WebDriver instance.
+        """
+        self.size = max(1, size)
+        self.max_uses = max(1, max_uses)
+        self.factory = factory
+        self._idle = queue.Queue()
+        self._uses = {}
+        self._vacant = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def start(self):
+        """Pre-launch all browsers of the pool."""
+        for _ in range(self.size):
+            self._idle.put(self._launch())
+        logging.info(f"Driver pool started with {self.size} browser(s), recycling after {self.max_uses} uses.")
+        return self
+
+    def _launch(self):
+        with timed_step("pool.launch_browser"):
+            driver = instrument_driver(self.factory())
+        with self._lock:
+            self._uses[id(driver)] = 0
+        return driver
+
+    def _discard(self, driver):
+        with self._lock:
+            self._uses.pop(id(driver), None)
+        try:
+            driver.quit()
+        except WebDriverException as e:
+            logging.warning(f"Failed to quit browser cleanly: {e}")
+
+    def _replace(self, driver):
+        """Quit a browser and put a fresh one in its slot; the slot stays vacant if the launch fails."""
+        self._discard(driver)
+        try:
+            self._idle.put(self._launch())
+        except Exception as e:
+            logging.error(f"Failed to launch a replacement browser, relaunching on the next lease: {e}")
+            with self._lock:
+                self._vacant += 1
+
+    def acquire(self, timeout=DEFAULT_LEASE_TIMEOUT):
+        """
+        Lease a browser from the pool, waiting for one to become free.
+
+        :param timeout: Maximum time to wait for a free browser.
+        :return: WebDriver instance.
+        """
+        if self._closed:
+            raise RuntimeError("Driver pool is closed.")
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+                break
+            except queue.Empty:
+                pass
+            with self._lock:
+                relaunch = self._vacant > 0
+                if relaunch:
+                    self._vacant -= 1
+            if relaunch:
+                try:
+                    driver = self._launch()
+                except Exception:
+                    with self._lock:
+                        self._vacant += 1
+                    raise
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"No browser became available within {timeout} seconds.")
+            try:
+                # Wake up now and then to take over a slot that became vacant
+                driver = self._idle.get(timeout=min(remaining, 1.0))
+                break
+            except queue.Empty:
+                continue
+        with self._lock:
+            self._uses[id(driver)] += 1
+        return driver
+
+    def release(self, driver):
+        """
+        Return a leased browser, resetting or recycling it as needed.
+
+        :param driver: WebDriver instance previously returned by acquire().
+        """
+        with self._lock:
+            uses = self._uses.get(id(driver), self.max_uses)
+        if self._closed:
+            self._discard(driver)
+            return
+        if uses >= self.max_uses:
+            logging.info(f"Recycling browser after {uses} uses.")
+            self._replace(driver)
+            return
+        try:
+            with timed_step("pool.reset_browser"):
+                reset_driver(driver)
+        except WebDriverException as e:
+            logging.warning(f"Browser reset failed, replacing it: {e}")
+            self._replace(driver)
+            return
+        self._idle.put(driver)
+
+    @contextmanager
+    def lease(self, timeout=DEFAULT_LEASE_TIMEOUT):
+        """Context manager that acquires a browser and always releases it."""
+        driver = self.acquire(timeout=timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def close(self):
+        """Quit every idle browser. Browsers still leased are quit on release."""
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver)
+        logging.info("Driver pool closed.")
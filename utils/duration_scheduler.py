@@ -0,0 +1,234 @@
+"""
+Pytest plugin that schedules tests by their historical duration.
+
+Every run records the wall time, outcome and browser profile of each test in a
+local SQLite database. Later runs use it to:
+
+* run tests that failed last time first, then the rest longest-first, which is
+  what pytest-xdist's load schedulers need to approach a balanced finish;
+* with ``--dist loadgroup``, keep tests sharing a cached role/tenant login on
+  the same worker (split into chunks when a group would dominate one worker);
+* with ``--shard-count``/``--shard-index``, split the suite into statically
+  balanced shards (longest-processing-time-first) for separate CI jobs.
+
+Registered from the root conftest.py.
+"""
+import heapq
+import os
+import sqlite3
+import time
+
+import pytest
+
+DEFAULT_DB_NAME = ".pytest_durations.sqlite"
+# Duration assumed for tests that were never recorded
+DEFAULT_DURATION = 5.0
+# Weight of the newest run in the moving average of a test's duration
+EWMA_ALPHA = 0.3
+GROUP_PREFIX = "sched-"
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("duration-scheduler", "scheduling by historical test duration")
+    group.addoption("--durations-db", default=None,
+                    help=f"SQLite file with recorded test durations (default: <rootdir>/{DEFAULT_DB_NAME}).")
+    group.addoption("--no-duration-schedule", action="store_true", default=False,
+                    help="Keep file order and do not record durations.")
+    group.addoption("--shard-count", type=int, default=1, help="Split the selected tests into this many shards.")
+    group.addoption("--shard-index", type=int, default=0, help="Run only this shard (0-based).")
+
+
+class DurationDatabase:
+    """Per-test duration history stored in SQLite."""
+
+    def __init__(self, path):
+        self.path = path
+        self._connection = sqlite3.connect(path, timeout=30)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS durations ("
+                "nodeid TEXT PRIMARY KEY, runs INTEGER, mean REAL, last REAL, "
+                "last_failed INTEGER, failures INTEGER, profile TEXT, updated_at REAL)"
+            )
+
+    def load(self):
+        """Return {nodeid: (mean_duration, last_failed)}."""
+        rows = self._connection.execute("SELECT nodeid, mean, last_failed FROM durations")
+        return {nodeid: (mean, bool(last_failed)) for nodeid, mean, last_failed in rows}
+
+    def record(self, results):
+        """
+        Merge one run's results into the history.
+
+        :param results: {nodeid: (duration, failed, profile)}.
+        """
+        now = time.time()
+        with self._connection:
+            for nodeid, (duration, failed, profile) in results.items():
+                row = self._connection.execute("SELECT runs, mean, failures FROM durations WHERE nodeid = ?",
+                                               (nodeid,)).fetchone()
+                if row is None:
+                    runs, mean, failures = 1, duration, int(failed)
+                else:
+                    runs, mean, failures = row[0] + 1, EWMA_ALPHA * duration + (1 - EWMA_ALPHA) * row[1], row[2] + int(failed)
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO durations VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (nodeid, runs, mean, duration, int(failed), failures, profile, now),
+                )
+
+    def close(self):
+        self._connection.close()
+
+
+def auth_group(item):
+    """
+    Return the cached-login group of a test, or None when it logs in by itself.
+
+    Tests using a ``<role>_driver`` fixture (restored from the auth cache) share the
+    role's login; tenant fan-out tests share their tenant browsers.
+    """
+    for name in item.fixturenames:
+        if name.endswith("_driver") and name != "setup_driver":
+            return name[:-len("_driver")]
+    if item.get_closest_marker("tenants_login"):
+        return "tenants"
+    return None
+
+
+def lpt_partition(units, bins):
+    """
+    Longest-processing-time-first assignment of weighted units to bins.
+
+    :param units: List of (weight, payload).
+    :param bins: Number of bins.
+    :return: List of `bins` lists of payloads.
+    """
+    heap = [(0.0, index) for index in range(bins)]
+    assignment = [[] for _ in range(bins)]
+    for weight, payload in sorted(units, key=lambda unit: -unit[0]):
+        load, index = heapq.heappop(heap)
+        assignment[index].append(payload)
+        heapq.heappush(heap, (load + weight, index))
+    return assignment
+
+
+class DurationScheduler:
+    """Plugin object ordering, grouping and recording the tests of one pytest process."""
+
+    def __init__(self, config):
+        self.config = config
+        path = config.getoption("durations_db") or os.path.join(str(config.rootpath), DEFAULT_DB_NAME)
+        self.db = DurationDatabase(path)
+        self.history = self.db.load()
+        self.results = {}
+        # Under pytest-xdist only the controller, which receives every worker's reports, records
+        self.recording = not hasattr(config, "workerinput")
+        known = sorted(mean for mean, _ in self.history.values())
+        self.default_duration = known[len(known) // 2] if known else DEFAULT_DURATION
+
+    def _nodeid(self, nodeid):
+        # Strip the "@group" suffix pytest-xdist appends under --dist loadgroup
+        base, _, group = nodeid.rpartition("@")
+        return base if base and group.startswith(GROUP_PREFIX) else nodeid
+
+    def expected(self, item):
+        return self.history.get(self._nodeid(item.nodeid), (self.default_duration, False))
+
+    def _units(self, items, workers):
+        """Group items into scheduling units of (weight, failed_before, [items])."""
+        groups, units = {}, []
+        for item in items:
+            key = auth_group(item)
+            if key is None:
+                duration, failed = self.expected(item)
+                units.append((duration, failed, [item]))
+            else:
+                groups.setdefault(key, []).append(item)
+        # A group bigger than a fair share of the suite would pin one worker, so it is chunked;
+        # each chunk still pays for a single login.
+        total = sum(self.expected(item)[0] for item in items)
+        limit = total / max(workers, 1)
+        for key, members in groups.items():
+            chunk, weight, failed = [], 0.0, False
+            for item in sorted(members, key=lambda i: -self.expected(i)[0]):
+                duration, item_failed = self.expected(item)
+                if chunk and weight + duration > limit:
+                    units.append((weight, failed, chunk))
+                    chunk, weight, failed = [], 0.0, False
+                chunk.append(item)
+                weight += duration
+                failed = failed or item_failed
+            units.append((weight, failed, chunk))
+        return units
+
+    def order(self, items):
+        """Reorder items in place: previously failing units first, then longest first."""
+        workers = self.config.getoption("numprocesses", default=None) or 1
+        workers = workers if isinstance(workers, int) else 1
+        units = self._units(items, workers)
+        units.sort(key=lambda unit: (not unit[1], -unit[0]))
+        loadgroup = self.config.getoption("dist", default="no") == "loadgroup"
+        ordered = []
+        for index, (_, _, members) in enumerate(units):
+            for item in members:
+                if loadgroup and not item.get_closest_marker("xdist_group"):
+                    item.add_marker(pytest.mark.xdist_group(f"{GROUP_PREFIX}{index}"))
+                ordered.append(item)
+        items[:] = ordered
+
+    def shard(self, items, count, index):
+        """Keep only the items of one LPT-balanced shard; return the deselected ones."""
+        units = [(weight, members) for weight, _, members in self._units(items, count)]
+        shards = lpt_partition(units, count)
+        selected = {id(item) for members in shards[index] for item in members}
+        kept = [item for item in items if id(item) in selected]
+        deselected = [item for item in items if id(item) not in selected]
+        items[:] = kept
+        return deselected
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_collection_modifyitems(self, config, items):
+        # Runs before pytest-xdist turns xdist_group marks into nodeid suffixes
+        self.order(items)
+
+    def pytest_runtest_logreport(self, report):
+        if not self.recording:
+            return
+        nodeid = self._nodeid(report.nodeid)
+        duration, failed, profile = self.results.get(nodeid, (0.0, False, None))
+        if profile is None:
+            profile = _profile_name(report.keywords)
+        self.results[nodeid] = (duration + report.duration, failed or report.failed, profile)
+
+    def pytest_sessionfinish(self, session):
+        if self.results:
+            self.db.record(self.results)
+        self.db.close()
+
+
+def _profile_name(keywords):
+    try:
+        from utils.browser_profiles import profile_for_markers
+    except ImportError:
+        return None
+    return profile_for_markers(keywords).name
+
+
+def pytest_configure(config):
+    if config.getoption("no_duration_schedule"):
+        return
+    count, index = config.getoption("shard_count"), config.getoption("shard_index")
+    if count < 1 or not 0 <= index < count:
+        raise pytest.UsageError(f"--shard-index must be between 0 and --shard-count - 1 (got {index} of {count}).")
+    config.pluginmanager.register(DurationScheduler(config), "duration_scheduler")
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(config, items):
+    # Sharding runs after -m/-k deselection so shards are balanced over the selected tests only
+    scheduler = config.pluginmanager.get_plugin("duration_scheduler")
+    count = config.getoption("shard_count")
+    if scheduler is not None and count > 1:
+        deselected = scheduler.shard(items, count, config.getoption("shard_index"))
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
@@ -0,0 +1,41 @@
+"""
+Deferred imports for heavy optional libraries.
+
+Test modules are imported by every pytest worker at collection time, even when
+``-k``/``-m`` deselect all of their tests. Libraries that are only needed once a
+test actually runs (Selenium's WebDriver and action chains) are bound through
+``lazy_import`` and only executed on first attribute access. NumPy and Pillow
+are kept out of collection by importing utils.visual_compare inside functions.
+"""
+import importlib
+import importlib.util
+import sys
+
+
+def lazy_import(name):
+    """
+    Return a module that is executed on first attribute access.
+
+    A module that is already imported is returned as is. A missing module raises
+    ImportError here, like a regular import, so optional-dependency checks keep working.
+    The first attribute access is not thread-safe before Python 3.12: modules used from
+    worker threads (e.g. the screenshot pipeline) must be imported normally instead.
+
+    :param name: Absolute module name, e.g. "selenium.webdriver" or "PIL.Image".
+    :raises ImportError: If the module cannot be found.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    parent, _, child = name.rpartition(".")
+    if parent:
+        # Bind the submodule on its parent, as a regular import would
+        setattr(sys.modules[parent], child, module)
+    return module
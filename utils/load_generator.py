@@ -0,0 +1,224 @@
+"""
+Protocol-level load generator for the login flow.
+
+Replays what the browser suite does - load the login page, submit the
+username/password/"sign in" form and fetch the lobby - over HTTP with a
+pooled keep-alive client. Virtual users arrive following an open model
+(Poisson arrivals with a linear ramp-up) and are capped by a concurrency
+limit. Requires aiohttp.
+
+Example:
+    python -m utils.load_generator --login-url https://tenant/login --lobby-url https://tenant/#/lobby \\
+        --data data/test_data.xlsx --rate 50 --ramp-up 30 --duration 120 --concurrency 500
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import random
+import time
+
+from utils.timing import percentile
+
+FLOW_STEPS = ("login_page", "login_submit", "lobby", "flow")
+
+
+class LoadStats:
+    """Latency samples and error counts collected during a load run."""
+
+    def __init__(self):
+        self.latencies = {step: [] for step in FLOW_STEPS}
+        self.errors = {}
+        self.arrivals = 0
+        self.completed = 0
+        self.failed = 0
+        self.max_queue_delay = 0.0
+        self.started_at = None
+        self.finished_at = None
+
+    def error(self, step, kind):
+        key = f"{step}:{kind}"
+        self.errors[key] = self.errors.get(key, 0) + 1
+
+    def report(self):
+        """
+        Summarize the run.
+
+        :return: Dict with throughput, error rate and p50/p95/p99 latency (seconds) per step.
+        """
+        elapsed = max((self.finished_at or time.monotonic()) - (self.started_at or time.monotonic()), 1e-9)
+        steps = {}
+        for step, values in self.latencies.items():
+            values = sorted(values)
+            steps[step] = {
+                "count": len(values),
+                "mean": sum(values) / len(values) if values else None,
+                "p50": percentile(values, 0.50),
+                "p95": percentile(values, 0.95),
+                "p99": percentile(values, 0.99),
+                "max": values[-1] if values else None,
+            }
+        finished = self.completed + self.failed
+        return {
+            "duration": elapsed,
+            "arrivals": self.arrivals,
+            "completed": self.completed,
+            "failed": self.failed,
+            "throughput": self.completed / elapsed,
+            "error_rate": self.failed / finished if finished else 0.0,
+            "max_queue_delay": self.max_queue_delay,
+            "errors": dict(self.errors),
+            "steps": steps,
+        }
+
+
+def _is_login_page(url, login_url):
+    return str(url).rstrip("/") == login_url.rstrip("/")
+
+
+async def _login_flow(aiohttp, connector, user, login_url, lobby_url, stats, timeout):
+    """Run one virtual user's login flow with its own cookie jar on the shared connection pool."""
+    flow_start = time.perf_counter()
+    step = "login_page"
+    async with aiohttp.ClientSession(
+        connector=connector, connector_owner=False, cookie_jar=aiohttp.CookieJar(unsafe=True), timeout=timeout
+    ) as session:
+        try:
+            start = time.perf_counter()
+            async with session.get(login_url) as response:
+                await response.read()
+                if response.status >= 400:
+                    stats.error(step, f"http_{response.status}")
+                    return False
+            stats.latencies[step].append(time.perf_counter() - start)
+
+            step = "login_submit"
+            form = {"username": user["username"], "password": user["password"], "sign in": ""}
+            start = time.perf_counter()
+            async with session.post(login_url, data=form) as response:
+                await response.read()
+                if response.status >= 400:
+                    stats.error(step, f"http_{response.status}")
+                    return False
+                if _is_login_page(response.url, login_url):
+                    stats.error(step, "rejected")
+                    return False
+            stats.latencies[step].append(time.perf_counter() - start)
+
+            step = "lobby"
+            start = time.perf_counter()
+            async with session.get(lobby_url) as response:
+                await response.read()
+                if response.status >= 400 or _is_login_page(response.url, login_url):
+                    stats.error(step, f"http_{response.status}")
+                    return False
+            stats.latencies[step].append(time.perf_counter() - start)
+        except asyncio.TimeoutError:
+            stats.error(step, "timeout")
+            return False
+        except aiohttp.ClientError as e:
+            stats.error(step, type(e).__name__)
+            return False
+    stats.latencies["flow"].append(time.perf_counter() - flow_start)
+    return True
+
+
+def _arrival_rate(elapsed, rate, ramp_up):
+    if ramp_up and elapsed < ramp_up:
+        return rate * max(elapsed / ramp_up, 0.01)
+    return rate
+
+
+async def run_login_load(login_url, lobby_url, users, rate, duration, ramp_up=0.0, concurrency=1000,
+                         request_timeout=30.0, seed=None):
+    """
+    Generate open-model login load and collect statistics.
+
+    :param login_url: URL of the login form (GET) and its submission (POST).
+    :param lobby_url: URL fetched after a successful login.
+    :param users: Non-empty list of dicts with "username" and "password"; reused round-robin.
+    :param rate: Target arrival rate in virtual users per second.
+    :param duration: Seconds during which new virtual users arrive (ramp-up included).
+    :param ramp_up: Seconds over which the arrival rate grows linearly to ``rate``.
+    :param concurrency: Maximum number of virtual users in flight; later arrivals wait.
+    :param request_timeout: Total timeout per HTTP request in seconds.
+    :param seed: Seed for the arrival process, for reproducible runs.
+    :return: LoadStats.report() dict.
+    """
+    import aiohttp  # Optional dependency, only needed for load runs
+
+    if not users:
+        raise ValueError("At least one user is required to generate login load.")
+    rng = random.Random(seed)
+    stats = LoadStats()
+    slots = asyncio.Semaphore(concurrency)
+    user_cycle = itertools.cycle(users)
+    connector = aiohttp.TCPConnector(limit=concurrency, keepalive_timeout=30, ttl_dns_cache=300)
+    timeout = aiohttp.ClientTimeout(total=request_timeout)
+    tasks = set()
+
+    async def virtual_user(user, arrived_at):
+        async with slots:
+            stats.max_queue_delay = max(stats.max_queue_delay, time.monotonic() - arrived_at)
+            if await _login_flow(aiohttp, connector, user, login_url, lobby_url, stats, timeout):
+                stats.completed += 1
+            else:
+                stats.failed += 1
+
+    stats.started_at = time.monotonic()
+    next_arrival = 0.0
+    try:
+        while next_arrival < duration:
+            # Sleep against an absolute schedule so event-loop overhead does not lower the arrival rate
+            delay = stats.started_at + next_arrival - time.monotonic()
+            await asyncio.sleep(max(delay, 0))  # Always yield so in-flight users keep progressing
+            stats.arrivals += 1
+            task = asyncio.ensure_future(virtual_user(next(user_cycle), time.monotonic()))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            # Exponential inter-arrival times give a Poisson arrival process
+            next_arrival += rng.expovariate(_arrival_rate(next_arrival, rate, ramp_up))
+        if tasks:
+            await asyncio.gather(*tasks)
+    finally:
+        stats.finished_at = time.monotonic()
+        await connector.close()
+
+    report = stats.report()
+    logging.info(f"Login load finished: {report['completed']} completed, {report['failed']} failed, "
+                 f"{report['throughput']:.1f} logins/s, p95 flow {report['steps']['flow']['p95']}.")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate HTTP-level login load.")
+    parser.add_argument("--login-url", required=True)
+    parser.add_argument("--lobby-url", required=True)
+    parser.add_argument("--data", default="data/test_data.xlsx", help="Test data workbook with username/password columns.")
+    parser.add_argument("--sheet", default=None)
+    parser.add_argument("--rate", type=float, default=10.0, help="Virtual user arrivals per second.")
+    parser.add_argument("--duration", type=float, default=60.0)
+    parser.add_argument("--ramp-up", type=float, default=0.0)
+    parser.add_argument("--concurrency", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--report", default=None, help="Write the JSON report to this file.")
+    args = parser.parse_args(argv)
+
+    from utils.test_data import iter_test_rows
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    users = [row for row in iter_test_rows(args.data, args.sheet) if row.get("username")]
+    report = asyncio.run(run_login_load(
+        args.login_url, args.lobby_url, users, args.rate, args.duration,
+        ramp_up=args.ramp_up, concurrency=args.concurrency, request_timeout=args.timeout,
+    ))
+    output = json.dumps(report, indent=2)
+    if args.report:
+        with open(args.report, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Central registry of page locators and a cache of resolved element handles.
+
+Locators are declared once per page, validated at import time and compiled to
+an equivalent CSS selector where the XPath/class/name form allows it. Resolved
+elements are cached per driver and page generation; the cache is dropped on
+navigation and entries are re-resolved on stale-element errors.
+"""
+import re
+import threading
+
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.webdriver.common.by import By
+
+from utils.timing import timed_step
+from utils.wait_engine import JS_LOCATOR_HELPERS, wait_for_condition
+
+_STRATEGIES = {By.ID, By.NAME, By.CLASS_NAME, By.TAG_NAME, By.CSS_SELECTOR, By.XPATH, By.LINK_TEXT, By.PARTIAL_LINK_TEXT}
+_NAVIGATION_COMMANDS = {"get", "goBack", "goForward", "refresh", "newWindow", "switchToWindow", "switchToFrame"}
+
+_IDENT = r"[A-Za-z_][\w-]*"
+_QUOTED = r"'[^']*'|\"[^\"]*\""
+# XPath steps that have an exact CSS equivalent
+_XPATH_STEP = re.compile(rf"^(?P<tag>{_IDENT}|\*)(?P<predicates>(\[(?:{_QUOTED}|[^\]'\"])+\])*)$")
+_XPATH_PREDICATES = [
+    (re.compile(rf"^contains\(\s*@(?P<attr>{_IDENT})\s*,\s*(?P<value>{_QUOTED})\s*\)$"), "[{attr}*={value}]"),
+    (re.compile(rf"^starts-with\(\s*@(?P<attr>{_IDENT})\s*,\s*(?P<value>{_QUOTED})\s*\)$"), "[{attr}^={value}]"),
+    (re.compile(rf"^@(?P<attr>{_IDENT})\s*=\s*(?P<value>{_QUOTED})$"), "[{attr}={value}]"),
+    (re.compile(rf"^@(?P<attr>{_IDENT})$"), "[{attr}]"),
+]
+
+
+class Locator:
+    """
+    A registered locator.
+
+    ``by``/``value`` hold the fastest equivalent form (CSS when it could be compiled), so a
+    locator unpacks straight into the wait helpers: ``wait_for_element_to_be_visible(driver, *locator)``.
+
+    :param name: Unique dotted name, e.g. "lobby.global_gallery_button".
+    :param by: Locator strategy after compilation.
+    :param value: Locator value after compilation.
+    :param source: The (by, value) pair as declared.
+    """
+
+    __slots__ = ("name", "by", "value", "source")
+
+    def __init__(self, name, by, value, source):
+        self.name = name
+        self.by = by
+        self.value = value
+        self.source = source
+
+    def __iter__(self):
+        return iter((self.by, self.value))
+
+    def __getitem__(self, index):
+        return (self.by, self.value)[index]
+
+    def __repr__(self):
+        return f"Locator({self.name!r}, {self.by!r}, {self.value!r})"
+
+
+def _split_steps(xpath):
+    """Split a "//a//b" XPath on the "//" separators outside quoted values."""
+    steps, start, quote = [], 2, None
+    for index in range(2, len(xpath)):
+        char = xpath[index]
+        if quote:
+            quote = None if char == quote else quote
+        elif char in "'\"":
+            quote = char
+        elif index >= start and xpath.startswith("//", index):
+            steps.append(xpath[start:index])
+            start = index + 2
+    steps.append(xpath[start:])
+    return steps
+
+
+def _xpath_to_css(xpath):
+    """Compile a simple absolute-descendant XPath to CSS, or return None if it has no exact equivalent."""
+    # Backslashes are literal in XPath strings but escapes in CSS
+    if not xpath.startswith("//") or "///" in xpath or "\\" in xpath:
+        return None
+    parts = []
+    for step in _split_steps(xpath):
+        match = _XPATH_STEP.match(step.strip())
+        if not match or "/" in re.sub(_QUOTED, "", step):
+            return None
+        css = "" if match.group("tag") == "*" else match.group("tag")
+        for predicate in re.findall(rf"\[((?:{_QUOTED}|[^\]'\"])+)\]", match.group("predicates")):
+            for pattern, template in _XPATH_PREDICATES:
+                found = pattern.match(predicate.strip())
+                if found:
+                    # contains(@a, '') is true for any element, CSS [a*=''] matches nothing
+                    if template.endswith(("*={value}]", "^={value}]")) and found.group("value") in ("''", '""'):
+                        return None
+                    css += template.format(**found.groupdict())
+                    break
+            else:
+                return None  # text(), positions, boolean logic... stay XPath
+        parts.append(css or "*")
+    return " ".join(parts)
+
+
+def compile_locator(by, value):
+    """Return the (by, value) pair to use for a declared locator, preferring CSS."""
+    if by == By.XPATH:
+        css = _xpath_to_css(value)
+        return (By.CSS_SELECTOR, css) if css else (by, value)
+    if by == By.CLASS_NAME and re.fullmatch(_IDENT, value):
+        return By.CSS_SELECTOR, f".{value}"
+    if by == By.ID and re.fullmatch(_IDENT, value):
+        return By.CSS_SELECTOR, f"#{value}"
+    if by == By.NAME:
+        return (By.CSS_SELECTOR, f"[name='{value}']") if "'" not in value else (by, value)
+    return by, value
+
+
+def validate_locator(name, by, value):
+    """
+    Reject malformed locators at import time instead of at the first failing lookup.
+
+    :raises ValueError: If the strategy is unknown or the value cannot be a valid selector.
+    """
+    if by not in _STRATEGIES:
+        raise ValueError(f"Locator {name}: unknown strategy {by!r}.")
+    if not value or value != value.strip():
+        raise ValueError(f"Locator {name}: empty value or surrounding whitespace in {value!r}.")
+    if by == By.CLASS_NAME and re.search(r"\s", value):
+        raise ValueError(f"Locator {name}: class name {value!r} contains whitespace; use CSS or XPath.")
+    if by in (By.XPATH, By.CSS_SELECTOR):
+        unquoted = re.sub(_QUOTED, "", value)
+        if unquoted.count("'") or unquoted.count('"'):
+            raise ValueError(f"Locator {name}: unbalanced quotes in {value!r}.")
+        for opening, closing in ("[]", "()"):
+            if unquoted.count(opening) != unquoted.count(closing):
+                raise ValueError(f"Locator {name}: unbalanced {opening}{closing} in {value!r}.")
+    if by == By.XPATH and not value.startswith(("/", "(", ".")):
+        raise ValueError(f"Locator {name}: XPath {value!r} must start with '/', '(' or '.'.")
+
+
+REGISTRY = {}
+
+
+def locator(name, by, value):
+    """
+    Declare, validate and register a locator.
+
+    :param name: Unique dotted name, e.g. "lobby.global_gallery_button".
+    :param by: Locator strategy (e.g., By.XPATH, By.CLASS_NAME).
+    :param value: Locator value.
+    :return: Locator holding the compiled (by, value).
+    """
+    validate_locator(name, by, value)
+    if name in REGISTRY:
+        raise ValueError(f"Locator {name} is declared twice.")
+    REGISTRY[name] = Locator(name, *compile_locator(by, value), source=(by, value))
+    return REGISTRY[name]
+
+
+class LoginPage:
+    USERNAME = locator("login.username", By.NAME, "username")
+    PASSWORD = locator("login.password", By.NAME, "password")
+    SIGN_IN = locator("login.sign_in", By.NAME, "sign in")
+    WELCOME_MESSAGE = locator("login.welcome_message", By.CLASS_NAME, "WelcomeMsgName")
+
+
+class LobbyPage:
+    GLOBAL_GALLERY_BUTTON = locator("lobby.global_gallery_button", By.XPATH, "//button[contains(@class, 'GlobalGalleryButton')]")
+    GLOBAL_LIBRARY_BUTTON = locator("lobby.global_library_button", By.CLASS_NAME, "GlobalLibraryButton")
+    EVENT_NAMES = locator(
+        "lobby.event_names", By.XPATH,
+        "//div[@class='sc-eNSrOW bfIymq EventsGalleryItemContainer']//span[contains(@class, 'sc-kCMKrZ')]",
+    )
+    JOIN_BUTTON = locator("lobby.join_button", By.XPATH, "//button[contains(@class, 'LobbyJoinButton')]")
+    EVENT_WELCOME_MESSAGE = locator("lobby.event_welcome_message", By.XPATH, "//span[contains(text(), 'Welcome to Extreme Measures')]")
+
+
+class GlobalLibraryPage:
+    MAIN_CONTAINER = locator("global_library.main_container", By.XPATH, "//div[contains(@class, 'GlobalLibraryMainContainer')]")
+    TITLE = locator("global_library.title", By.XPATH, "//div[contains(@class, 'GlobalLibraryTitle')]")
+    SEARCH_FIELD = locator("global_library.search_field", By.XPATH, "//input[@class='search-filter_search_field__1ZFKm']")
+    CAMPAIGN_NAMES = locator("global_library.campaign_names", By.XPATH, "//div[contains(@class, 'CampaignName')]")
+    PICK_IT_BUTTON = locator("global_library.pick_it_button", By.XPATH, "//button[contains(@class, 'PickItButton')]")
+    CLOSE_BUTTON = locator("global_library.close_button", By.CLASS_NAME, "close_GlobalLibrary_button")
+
+
+def gallery_link(href):
+    """Link with a given href inside the Global Library (built per href, so not registered)."""
+    return By.CSS_SELECTOR, f"{GlobalLibraryPage.MAIN_CONTAINER.value} a[href='{href}']"
+
+
+_IS_CLICKABLE_SCRIPT = JS_LOCATOR_HELPERS + "return __isClickable(arguments[0]);"
+
+
+class ElementCache:
+    """Resolved element handles of one driver, valid for one page generation."""
+
+    def __init__(self):
+        self.generation = 0
+        self._elements = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        with self._lock:
+            entry = self._elements.get(name)
+        if entry and entry[0] == self.generation:
+            return entry[1]
+        return None
+
+    def put(self, name, element):
+        with self._lock:
+            self._elements[name] = (self.generation, element)
+
+    def drop(self, name):
+        with self._lock:
+            self._elements.pop(name, None)
+
+    def invalidate(self):
+        """Forget every handle; called on navigation."""
+        with self._lock:
+            self.generation += 1
+            self._elements.clear()
+
+
+def element_cache(driver):
+    """
+    Return the element cache of a driver, installing navigation tracking on first use.
+
+    :param driver: WebDriver instance.
+    """
+    cache = getattr(driver, "_element_cache", None)
+    if cache is not None:
+        return cache
+    cache = ElementCache()
+    execute = driver.execute
+
+    def tracking_execute(command, params=None):
+        if command in _NAVIGATION_COMMANDS:
+            cache.invalidate()
+        return execute(command, params)
+
+    driver.execute = tracking_execute
+    driver._element_cache = cache
+    return cache
+
+
+def find(driver, page_locator, timeout=20):
+    """
+    Return a clickable element for a registered locator, reusing the cached handle when it is still valid.
+
+    A cached handle costs one round trip to confirm it is attached and clickable; otherwise the
+    element is waited for with the event-driven wait engine and cached.
+
+    :param driver: WebDriver instance.
+    :param page_locator: Locator from the registry.
+    :param timeout: Maximum time to wait when the element has to be resolved again.
+    """
+    cache = element_cache(driver)
+    element = cache.get(page_locator.name)
+    if element is not None:
+        try:
+            if driver.execute_script(_IS_CLICKABLE_SCRIPT, element):
+                return element
+        except StaleElementReferenceException:
+            pass
+        cache.drop(page_locator.name)
+    element = wait_for_condition(driver, "clickable", page_locator.by, page_locator.value, timeout=timeout)
+    cache.put(page_locator.name, element)
+    return element
+
+
+def click(driver, page_locator, timeout=20):
+    """Click a registered element, re-resolving it once if the cached handle went stale."""
+    with timed_step("locators.click", locator=page_locator.name):
+        try:
+            find(driver, page_locator, timeout).click()
+        except StaleElementReferenceException:
+            element_cache(driver).drop(page_locator.name)
+            find(driver, page_locator, timeout).click()
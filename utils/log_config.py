@@ -1,24 +1,280 @@
+import atexit
+import contextvars
+import json
 import logging
 import os
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+# Buffered lines are written out once this many accumulate or this many seconds pass
+FLUSH_LINES = 200
+FLUSH_INTERVAL = 0.5
+
+# Per-test log file of the code currently running; set per test instead of swapping handlers
+_current_log_file = contextvars.ContextVar("current_log_file", default=None)
+
+_listener = None
+_routing_handler = None
+_flusher = None
+_setup_lock = threading.Lock()
+
+
+class _ContextQueueHandler(QueueHandler):
+    """Queue handler that stamps each record with the per-test log file of its context."""
+
+    def prepare(self, record):
+        record = super().prepare(record)
+        record.test_log_file = _current_log_file.get()
+        record.worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+        return record
+
+
+class _BatchedFile:
+    """Append-only file that collects lines in memory and writes them in batches."""
+
+    def __init__(self, path, mode="w"):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._stream = open(path, mode, encoding="utf-8")
+        self._lines = []
+        self._last_flush = time.monotonic()
+
+    def write(self, line, urgent=False):
+        self._lines.append(line)
+        if urgent or len(self._lines) >= FLUSH_LINES or time.monotonic() - self._last_flush >= FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        if self._lines:
+            # One write call per batch keeps lines whole when several processes append to the same file
+            self._stream.write("".join(self._lines))
+            self._stream.flush()
+            self._lines = []
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        self.flush()
+        self._stream.close()
+
+
+class _BatchedFileHandler(logging.Handler):
+    """Handler writing formatted records to one file through a _BatchedFile."""
+
+    def __init__(self, path, mode="w"):
+        super().__init__()
+        self._file = _BatchedFile(path, mode)
+
+    def emit(self, record):
+        try:
+            self._file.write(self.format(record) + "\n", urgent=record.levelno >= logging.ERROR)
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        # Called by the flusher thread while the listener may be emitting
+        with self.lock:
+            self._file.flush()
+
+    def close(self):
+        with self.lock:
+            self._file.close()
+        super().close()
+
+
+class _RoutingFileHandler(logging.Handler):
+    """Handler sending each record to the per-test log file it was stamped with."""
+
+    def __init__(self):
+        super().__init__()
+        self._files = {}
+
+    def emit(self, record):
+        release = getattr(record, "release_log_file", None)
+        if release:
+            self.close_file(release)
+            return
+        path = getattr(record, "test_log_file", None)
+        if not path:
+            return
+        try:
+            target = self._files.get(path)
+            if target is None:
+                target = self._files[path] = _BatchedFile(path, "w")  # Clear log file for new test
+            target.write(self.format(record) + "\n", urgent=record.levelno >= logging.ERROR)
+        except Exception:
+            self.handleError(record)
+
+    def close_file(self, path):
+        """Flush and close the file of a finished test."""
+        target = self._files.pop(path, None)
+        if target is not None:
+            target.close()
+
+    def flush(self):
+        with self.lock:
+            for target in list(self._files.values()):
+                target.flush()
+
+    def close(self):
+        with self.lock:
+            for target in list(self._files.values()):
+                target.close()
+            self._files.clear()
+        super().close()
+
+
+class _ConsoleHandler(logging.StreamHandler):
+    """Console handler that always writes to the current sys.stderr (pytest swaps it per phase)."""
+
+    @property
+    def stream(self):
+        return sys.stderr
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+class _JsonLinesFormatter(logging.Formatter):
+    """Structured one-line JSON representation of a record."""
+
+    def format(self, record):
+        return json.dumps({
+            "time": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "worker": getattr(record, "worker", None),
+            "test_log": getattr(record, "test_log_file", None),
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        })
+
+
+def _is_log_line(record):
+    """Filter for the file and console handlers: release markers are not log lines."""
+    return not hasattr(record, "release_log_file")
+
+
+class _PeriodicFlusher:
+    """Background thread flushing the batched handlers every FLUSH_INTERVAL, so quiet periods still reach the disk."""
+
+    def __init__(self, handlers, interval=FLUSH_INTERVAL):
+        self.handlers = handlers
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="log-flusher", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.flush()
+
+    def flush(self):
+        for handler in self.handlers:
+            try:
+                handler.flush()
+            except (OSError, ValueError):
+                pass
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+        self.flush()
+
+
+def configure_logging(log_file, jsonl_file=None):
+    """
+    Route all logging through a queue drained by one background listener per process.
+
+    The first call installs the listener, writing to ``log_file`` and the console.
+    Later calls are ignored; per-test logs are routed with per_test_log().
+
+    :param log_file: Session log file.
+    :param jsonl_file: Optional merged JSON-lines stream for the whole run; every worker
+                       appends to it. Defaults to the LOG_JSONL environment variable.
+    """
+    global _listener, _routing_handler, _flusher
+    with _setup_lock:
+        if _listener is not None:
+            logging.debug(f"Logging already configured; {log_file} is not used. Use per_test_log() for per-test logs.")
+            return
+
+        formatter = logging.Formatter(LOG_FORMAT)
+        session_handler = _BatchedFileHandler(log_file, mode="w")  # Clear log file for new run
+        console_handler = _ConsoleHandler()
+        _routing_handler = _RoutingFileHandler()
+        handlers = [session_handler, console_handler, _routing_handler]
+        for handler in handlers:
+            handler.setFormatter(formatter)
+        session_handler.addFilter(_is_log_line)
+        console_handler.addFilter(_is_log_line)
+
+        jsonl_file = jsonl_file or os.environ.get("LOG_JSONL")
+        if jsonl_file:
+            jsonl_handler = _BatchedFileHandler(jsonl_file, mode="a")
+            jsonl_handler.setFormatter(_JsonLinesFormatter())
+            jsonl_handler.addFilter(_is_log_line)
+            handlers.append(jsonl_handler)
+
+        # Reset existing handlers to avoid duplicates
+        for handler in logging.root.handlers[:]:
+            logging.root.removeHandler(handler)
+        log_queue = queue.Queue()
+        logging.root.addHandler(_ContextQueueHandler(log_queue))
+        logging.root.setLevel(logging.INFO)
+
+        _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        _flusher = _PeriodicFlusher(handlers)
+        _flusher.start()
+        atexit.register(stop_logging)
+
+
+@contextmanager
+def per_test_log(log_file):
+    """
+    Also send the records logged inside the block to a per-test log file.
+
+    :param log_file: Per-test log file; it is flushed and closed once the block's records are written.
+    """
+    token = _current_log_file.set(log_file)
+    try:
+        yield
+    finally:
+        _current_log_file.reset(token)
+        if _listener is not None:
+            # Queued behind the test's records, so the file is only closed after all of them
+            marker = logging.LogRecord(__name__, logging.INFO, __file__, 0, "Per-test log complete.", None, None)
+            marker.release_log_file = log_file
+            _listener.queue.put_nowait(marker)
+
+
+def stop_logging():
+    """Drain the log queue, flush every file and stop the background listener."""
+    global _listener, _routing_handler, _flusher
+    with _setup_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        _flusher.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        for handler in logging.root.handlers[:]:
+            logging.root.removeHandler(handler)
+        _listener = None
+        _routing_handler = None
+        _flusher = None
 
-def configure_logging(log_file):
-    # Ensure log directory exists
-    log_dir = os.path.dirname(log_file)
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir)
-
-    # Reset existing loggers to avoid duplicates
-    for handler in logging.root.handlers[:]:
-        logging.root.removeHandler(handler)
-
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s - %(levelname)s - %(message)s",
-        handlers=[
-            logging.FileHandler(log_file, mode="w"),  # Clear log file for new run
-            logging.StreamHandler()  # Log to console
-        ]
-    )
 
 def log_test_start(test_name):
     logging.info("=" * 50)
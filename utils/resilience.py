@@ -0,0 +1,291 @@
+"""
+Resilience of waits and flows against a slow or failing application.
+
+Wait helpers derive their default timeout from the observed latency of the same
+helper and locator instead of a fixed worst case, and repeat stale-element and
+transient WebDriver errors a bounded number of times with jittered exponential
+backoff. A circuit breaker (a pytest plugin registered in the root conftest.py)
+fails the remaining tests immediately once several consecutive tests failed
+because the application or the browser is unreachable, instead of letting each
+of them run into its timeouts.
+"""
+import functools
+import inspect
+import logging
+import os
+import random
+import re
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+import pytest
+from selenium.common.exceptions import (ElementClickInterceptedException, StaleElementReferenceException,
+                                        TimeoutException, WebDriverException)
+
+from utils.timing import histogram, percentile, timed_step
+
+# Adaptive timeout: this percentile of the recent calls of a step, times the factor
+ADAPTIVE_TIMEOUT_PERCENTILE = float(os.environ.get("ADAPTIVE_TIMEOUT_PERCENTILE", "0.95"))
+ADAPTIVE_TIMEOUT_FACTOR = float(os.environ.get("ADAPTIVE_TIMEOUT_FACTOR", "3"))
+# Lowest adaptive timeout, as a fraction of the default: fast calls only trim extreme timeouts
+ADAPTIVE_TIMEOUT_FLOOR = float(os.environ.get("ADAPTIVE_TIMEOUT_FLOOR", "0.5"))
+# Calls of a step needed before its timeout adapts, and how many of the latest calls count
+ADAPTIVE_TIMEOUT_MIN_SAMPLES = int(os.environ.get("ADAPTIVE_TIMEOUT_MIN_SAMPLES", "5"))
+ADAPTIVE_TIMEOUT_WINDOW = int(os.environ.get("ADAPTIVE_TIMEOUT_WINDOW", "50"))
+# Highest adaptive timeout of a wait helper, as a multiple of its declared default timeout
+ADAPTIVE_TIMEOUT_CEILING = float(os.environ.get("ADAPTIVE_TIMEOUT_CEILING", "3"))
+# Attempts (first call included) and backoff bounds (seconds) for transient errors
+RETRY_ATTEMPTS = int(os.environ.get("RETRY_ATTEMPTS", "3"))
+RETRY_BASE_DELAY = float(os.environ.get("RETRY_BASE_DELAY", "0.25"))
+RETRY_MAX_DELAY = float(os.environ.get("RETRY_MAX_DELAY", "2"))
+# Consecutive infrastructure failures after which the remaining tests fail fast (0 disables)
+CIRCUIT_BREAKER_THRESHOLD = int(os.environ.get("CIRCUIT_BREAKER_THRESHOLD", "3"))
+# Probed when a test times out, to tell a slow page from an application that is down
+HEALTH_CHECK_URL = os.environ.get("HEALTH_CHECK_URL") or os.environ.get("BASE_URL", "")
+HEALTH_CHECK_TIMEOUT = 5
+
+TRANSIENT_ERRORS = (StaleElementReferenceException, ElementClickInterceptedException)
+# WebDriver errors worth retrying: the request was cut off, not refused
+_TRANSIENT_MESSAGES = re.compile(r"ERR_CONNECTION_RESET|ERR_NETWORK_CHANGED|ERR_EMPTY_RESPONSE|ERR_TIMED_OUT")
+# The application or the browser cannot be reached
+_INFRASTRUCTURE_MESSAGES = re.compile(
+    r"net::ERR_|chrome not reachable|disconnected|invalid session id|session deleted|"
+    r"Connection refused|Max retries exceeded|Failed to establish a new connection|50[234] "
+)
+
+BREAKER_KEY = pytest.StashKey()
+
+
+def adaptive_timeout(step, default, floor=None, ceiling=None):
+    """
+    Timeout for a wait, derived from the latency observed for its step in this process.
+
+    Calls that timed out count with their duration, a lower bound of the latency they needed:
+    after a timeout the estimate grows (up to the ceiling) instead of staying at the latency seen
+    while the application was fast. Only the last ADAPTIVE_TIMEOUT_WINDOW calls count, so the
+    timeout shrinks again once the application recovers, but never below the floor: a run of
+    fast calls must not turn the first ordinary slowdown into a failure. Until the step has
+    ADAPTIVE_TIMEOUT_MIN_SAMPLES calls, the default is used.
+
+    :param step: Step name in the timing histogram, e.g. "lobby.join_button".
+    :param default: Timeout (seconds) while too few calls were observed.
+    :param floor: Lowest timeout returned; defaults to ADAPTIVE_TIMEOUT_FLOOR times `default`.
+    :param ceiling: Highest timeout returned; defaults to `default`.
+    """
+    samples = sorted(histogram.durations(step)[-ADAPTIVE_TIMEOUT_WINDOW:])
+    if len(samples) < ADAPTIVE_TIMEOUT_MIN_SAMPLES:
+        return default
+    observed = percentile(samples, ADAPTIVE_TIMEOUT_PERCENTILE) * ADAPTIVE_TIMEOUT_FACTOR
+    floor = default * ADAPTIVE_TIMEOUT_FLOOR if floor is None else floor
+    return min(max(observed, floor), default if ceiling is None else ceiling)
+
+
+def adaptive_wait(step, wait, driver, *args, default=20, ceiling=None, **kwargs):
+    """
+    Call a wait helper with an adaptive timeout and time it as `step`.
+
+    :param step: Step name the latency is observed under.
+    :param wait: Wait helper taking a ``timeout`` keyword, e.g. wait_for_element_to_be_visible.
+    :param default: Timeout while too few calls were observed.
+    :param ceiling: Highest timeout; defaults to `default`.
+    """
+    timeout = adaptive_timeout(step, default, ceiling=ceiling)
+    with timed_step(step):
+        return wait(driver, *args, timeout=timeout, **kwargs)
+
+
+def page_of(url):
+    """Host, path and client-side route of a URL, without query strings: the page a wait runs on."""
+    parts = urllib.parse.urlsplit(url or "")
+    route = parts.fragment.partition("?")[0]
+    return f"{parts.netloc}{parts.path}" + (f"#{route}" if route else "")
+
+
+def current_page(arguments):
+    """Key of a wait helper that waits for the page it runs on rather than for a locator."""
+    return page_of(arguments["driver"].current_url)
+
+
+def resilient(ceiling_factor=ADAPTIVE_TIMEOUT_CEILING, key=None, on_failure=None):
+    """
+    Decorator for wait helpers: adaptive default timeout and retries of transient errors.
+
+    When the caller passes no timeout, it is derived from the latency of earlier calls with the
+    same key, starting at the helper's declared default and going up to `ceiling_factor`
+    times that default. A timeout passed explicitly is kept as is, e.g. for short waits that
+    assert an element is absent.
+
+    :param ceiling_factor: Highest adaptive timeout as a multiple of the declared default.
+    :param key: Callable taking the bound arguments and returning the key; defaults to the
+                locator (``by``/``value``) or the ``url`` argument of the helper.
+    :param on_failure: Callable taking the bound arguments and the error, called once when the
+                       last attempt failed.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        default = signature.parameters["timeout"].default
+
+        def attempt(*args, **kwargs):
+            try:
+                return retry(func, *args, **kwargs)
+            except Exception as e:
+                if on_failure is not None:
+                    on_failure(signature.bind(*args, **kwargs).arguments, e)
+                raise
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            if "timeout" in bound.arguments:
+                return attempt(*args, **kwargs)
+            step = f"adaptive.{func.__name__}"
+            if key is not None:
+                step += f"[{key(bound.arguments)}]"
+            elif "value" in bound.arguments:
+                step += f"[{bound.arguments.get('by')}={bound.arguments['value']}]"
+            elif "url" in bound.arguments:
+                step += f"[{bound.arguments['url']}]"
+            timeout = adaptive_timeout(step, default, ceiling=default * ceiling_factor)
+            with timed_step(step):
+                return attempt(*args, timeout=timeout, **kwargs)
+        return wrapper
+    return decorator
+
+
+def is_transient(error):
+    """Whether an error is likely to go away when the step is repeated."""
+    if isinstance(error, TRANSIENT_ERRORS):
+        return True
+    return isinstance(error, WebDriverException) and bool(_TRANSIENT_MESSAGES.search(str(error)))
+
+
+def is_infrastructure_error(error):
+    """Whether an error means the application or the browser cannot be reached."""
+    if isinstance(error, TimeoutException):
+        return False
+    if isinstance(error, (ConnectionError, urllib.error.URLError)):
+        return True
+    return bool(_INFRASTRUCTURE_MESSAGES.search(f"{type(error).__name__}: {error}"))
+
+
+def backoff_delay(attempt, base_delay=RETRY_BASE_DELAY, max_delay=RETRY_MAX_DELAY):
+    """Exponential backoff with full jitter: a random delay of up to base_delay * 2 ** attempt, capped."""
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+
+def retry(func, *args, attempts=RETRY_ATTEMPTS, retry_on=is_transient, **kwargs):
+    """
+    Call a function, repeating it after transient errors.
+
+    :param func: Callable to run.
+    :param attempts: Maximum number of calls; the last error is raised.
+    :param retry_on: Predicate telling whether an error is worth another attempt.
+    :return: The function's result.
+    """
+    for attempt in range(attempts):
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            if attempt == attempts - 1 or not retry_on(e):
+                raise
+            delay = backoff_delay(attempt)
+            logging.warning(f"{func.__name__} failed with {type(e).__name__}; retrying in {delay:.2f} s "
+                            f"(attempt {attempt + 2} of {attempts}).")
+            time.sleep(delay)
+
+
+def retrying(attempts=RETRY_ATTEMPTS, retry_on=is_transient):
+    """Decorator repeating a function after transient errors; see retry()."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return retry(func, *args, attempts=attempts, retry_on=retry_on, **kwargs)
+        return wrapper
+    return decorator
+
+
+def probe(url, timeout=HEALTH_CHECK_TIMEOUT):
+    """Return True when `url` answers with a status below 500."""
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return response.status < 500
+    except urllib.error.HTTPError as e:
+        return e.code < 500
+    except (urllib.error.URLError, OSError, ValueError):
+        return False
+
+
+class CircuitBreaker:
+    """
+    Counts consecutive tests that failed for infrastructure reasons.
+
+    A timeout only counts when the health check URL does not answer either; any other
+    failure, or a passed test, shows the application is up and resets the count.
+
+    :param threshold: Consecutive infrastructure failures that open the breaker (0 disables it).
+    :param health_url: URL probed after a timeout; timeouts are not counted without it.
+    """
+
+    def __init__(self, threshold=CIRCUIT_BREAKER_THRESHOLD, health_url=HEALTH_CHECK_URL):
+        self.threshold = threshold
+        self.health_url = health_url
+        self.failures = 0
+        self.reason = None
+
+    @property
+    def open(self):
+        return self.threshold > 0 and self.failures >= self.threshold
+
+    def record_success(self):
+        if not self.open:
+            self.failures = 0
+
+    def record_failure(self, error):
+        """Count a failed test phase; the breaker stays open once it opened."""
+        if self.open:
+            return
+        unreachable = is_infrastructure_error(error) or (
+            isinstance(error, TimeoutException) and bool(self.health_url) and not probe(self.health_url))
+        if not unreachable:
+            self.failures = 0
+            return
+        self.failures += 1
+        self.reason = f"{type(error).__name__}: {str(error).strip().splitlines()[0] if str(error).strip() else ''}"
+        logging.error(f"Infrastructure failure {self.failures} of {self.threshold}: {self.reason}")
+        if self.open:
+            logging.error(f"Circuit breaker open after {self.failures} consecutive infrastructure failures; "
+                          f"the remaining tests fail immediately.")
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("circuit-breaker", "failing fast when the application is down")
+    group.addoption("--circuit-breaker-threshold", type=int, default=CIRCUIT_BREAKER_THRESHOLD,
+                    help="Consecutive infrastructure failures after which the remaining tests fail "
+                         "immediately (0 disables).")
+
+
+def pytest_configure(config):
+    config.stash[BREAKER_KEY] = CircuitBreaker(config.getoption("circuit_breaker_threshold"))
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    # Fails before any fixture launches a browser or logs in
+    breaker = item.config.stash.get(BREAKER_KEY, None)
+    if breaker is not None and breaker.open:
+        pytest.fail(f"Circuit breaker open, the application is unavailable ({breaker.reason}).", pytrace=False)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    breaker = item.config.stash.get(BREAKER_KEY, None)
+    if breaker is None:
+        return
+    if report.failed and call.excinfo is not None:
+        breaker.record_failure(call.excinfo.value)
+    elif report.when == "call" and report.passed:
+        breaker.record_success()
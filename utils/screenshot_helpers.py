@@ -1,13 +1,215 @@
-import os
+import base64
+import io
 import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# Screenshot encoding settings, overridable from the environment
+SCREENSHOT_WORKERS = int(os.environ.get("SCREENSHOT_WORKERS", "2"))
+SCREENSHOT_MAX_PENDING = int(os.environ.get("SCREENSHOT_MAX_PENDING", "16"))
+SCREENSHOT_MAX_WIDTH = int(os.environ.get("SCREENSHOT_MAX_WIDTH", "0")) or None
+# Compare "<test_name>_success.png" screenshots with data/expected_images/<test_name>_Expected.png
+VISUAL_COMPARE = os.environ.get("VISUAL_COMPARE", "1") != "0"
+SUCCESS_SUFFIX = "_success.png"
+# Success screenshots only reach the disk when they differ from their baseline, unless kept explicitly
+KEEP_SUCCESS_SCREENSHOTS = os.environ.get("KEEP_SUCCESS_SCREENSHOTS", "0") == "1"
+
+
+class ScreenshotPipeline:
+    """
+    Decode, optionally downscale and write screenshots on a background thread pool.
+
+    At most ``max_pending`` screenshots are queued at once; further submissions
+    block until a worker frees a slot, so a slow disk cannot grow memory unbounded.
+    """
+
+    def __init__(self, max_workers=SCREENSHOT_WORKERS, max_pending=SCREENSHOT_MAX_PENDING, max_width=SCREENSHOT_MAX_WIDTH,
+                 visual_compare=VISUAL_COMPARE, keep_success=KEEP_SUCCESS_SCREENSHOTS):
+        """
+        :param max_workers: Number of encoding/writing threads.
+        :param max_pending: Maximum number of screenshots queued or in progress.
+        :param max_width: Downscale screenshots wider than this (requires Pillow); None keeps full size.
+        :param visual_compare: Compare success screenshots against their expected images, if any.
+        :param keep_success: Write success screenshots that match (or have no) baseline too.
+        """
+        self.max_width = max_width
+        self.visual_compare = visual_compare
+        self.keep_success = keep_success
+        self.visual_failures = []
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="screenshot")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def submit(self, png_base64, screenshot_path, ignore_regions=(), compare=True):
+        """
+        Queue a base64 PNG payload for writing, blocking while the queue is full.
+
+        :param png_base64: Screenshot as returned by driver.get_screenshot_as_base64().
+        :param screenshot_path: Destination file path.
+        :param ignore_regions: (left, top, right, bottom) boxes left out of the baseline comparison.
+        :param compare: Compare success screenshots with their baseline before writing them.
+        :return: Future resolving to the written path.
+        """
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(self._write, png_base64, screenshot_path, ignore_regions, compare)
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future):
+        with self._lock:
+            self._pending.discard(future)
+        self._slots.release()
+        if future.exception() is not None:
+            logging.error(f"Failed to save screenshot: {future.exception()}")
+
+    def needs_capture(self, file_name):
+        """Tell whether a screenshot is worth capturing: success screenshots only when they will be compared or kept."""
+        if not file_name.endswith(SUCCESS_SUFFIX) or self.keep_success:
+            return True
+        if not self.visual_compare:
+            return False
+        try:
+            from utils.visual_compare import baseline_path_for
+        except ImportError:
+            return False
+        return baseline_path_for(file_name[:-len(SUCCESS_SUFFIX)]) is not None
+
+    def _write(self, png_base64, screenshot_path, ignore_regions=(), compare=True):
+        raw_png = png = base64.b64decode(png_base64)
+        file_name = os.path.basename(screenshot_path)
+        if compare and file_name.endswith(SUCCESS_SUFFIX):
+            # Baselines are full size, so compare the screenshot before any downscaling
+            result = self.compare(raw_png, file_name[:-len(SUCCESS_SUFFIX)], os.path.dirname(screenshot_path),
+                                  ignore_regions)
+            if result is not None and not result.matched:
+                with self._lock:
+                    self.visual_failures.append((file_name[:-len(SUCCESS_SUFFIX)], result))
+            if not self.keep_success and (result is None or result.matched):
+                return None
+        if self.max_width:
+            png = _downscale(png, self.max_width)
+        os.makedirs(os.path.dirname(screenshot_path) or ".", exist_ok=True)
+        with open(screenshot_path, "wb") as f:
+            f.write(png)
+        logging.info(f"Screenshot saved at {screenshot_path}")
+        return screenshot_path
+
+    def compare(self, png, test_name, diff_dir, ignore_regions=()):
+        """
+        Compare a PNG with the baseline of a test in the calling thread.
+
+        :return: ComparisonResult, or None when comparisons are off or the test has no baseline.
+        """
+        if not self.visual_compare:
+            return None
+        try:
+            from utils.visual_compare import compare_to_baseline
+        except ImportError as e:
+            logging.warning(f"Visual comparison skipped, NumPy/Pillow not available: {e}")
+            self.visual_compare = False
+            return None
+        return compare_to_baseline(png, test_name, diff_dir=diff_dir, ignore_regions=ignore_regions)
+
+    def flush(self, timeout=None):
+        """Wait until every queued screenshot has been written."""
+        with self._lock:
+            pending = list(self._pending)
+        wait(pending, timeout=timeout)
+
+    def shutdown(self):
+        """Flush outstanding screenshots and stop the worker threads."""
+        self._executor.shutdown(wait=True)
+
 
-def save_screenshot(driver, screenshot_dir, file_name):
-    """Save a screenshot with error handling."""
-    if not os.path.exists(screenshot_dir):
-        os.makedirs(screenshot_dir)
+def _downscale(png, max_width):
+    """Shrink a PNG to max_width keeping its aspect ratio; returns the input if Pillow is missing."""
+    try:
+        from PIL import Image
+    except ImportError:
+        logging.warning("Pillow is not installed; screenshots are written at full size.")
+        return png
+    image = Image.open(io.BytesIO(png))
+    if image.width <= max_width:
+        return png
+    height = round(image.height * max_width / image.width)
+    output = io.BytesIO()
+    image.resize((max_width, height), Image.LANCZOS).save(output, format="PNG", optimize=True)
+    return output.getvalue()
+
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def get_screenshot_pipeline():
+    """Return the process-wide screenshot pipeline, creating it on first use."""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = ScreenshotPipeline()
+        return _pipeline
+
+
+def flush_screenshots(timeout=None):
+    """
+    Wait for all pending screenshots of this process to be written.
+
+    :return: List of (test_name, ComparisonResult) for screenshots that differ from their baseline.
+    """
+    if _pipeline is None:
+        return []
+    _pipeline.flush(timeout=timeout)
+    return list(_pipeline.visual_failures)
+
+
+def save_screenshot(driver, screenshot_dir, file_name, ignore_regions=()):
+    """
+    Capture a screenshot and hand the encoding and file write to the background pipeline.
+
+    "<test>_success.png" screenshots are only compared with the test's baseline and written when
+    they differ (or with KEEP_SUCCESS_SCREENSHOTS=1); without a baseline they are not even captured.
+    Differences are only reported at session end; use compare_screenshot() to fail the test instead.
+
+    :param ignore_regions: (left, top, right, bottom) boxes left out of the baseline comparison.
+    """
     screenshot_path = os.path.join(screenshot_dir, file_name)
     try:
-        driver.save_screenshot(screenshot_path)
-        logging.info(f"Screenshot saved at {screenshot_path}")
+        pipeline = get_screenshot_pipeline()
+        if not pipeline.needs_capture(file_name):
+            return None
+        png_base64 = driver.get_screenshot_as_base64()
+        return pipeline.submit(png_base64, screenshot_path, ignore_regions)
     except Exception as e:
         logging.error(f"Failed to save screenshot: {e}")
+
+
+def compare_screenshot(driver, screenshot_dir, test_name, ignore_regions=()):
+    """
+    Capture a screenshot and compare it with the test's baseline before returning.
+
+    The screenshot is written to "<screenshot_dir>/<test_name>_success.png" in the background
+    when it differs from the baseline (or with KEEP_SUCCESS_SCREENSHOTS=1), next to its diff image.
+
+    :param driver: WebDriver instance.
+    :param screenshot_dir: Directory for the screenshot and the diff image.
+    :param test_name: Test name used to look up "<test_name>_Expected.png".
+    :param ignore_regions: (left, top, right, bottom) boxes with dynamic content left out of the comparison.
+    :return: ComparisonResult, or None when the test has no baseline or comparisons are off.
+    """
+    pipeline = get_screenshot_pipeline()
+    file_name = f"{test_name}{SUCCESS_SUFFIX}"
+    if not pipeline.needs_capture(file_name):
+        return None
+    png_base64 = driver.get_screenshot_as_base64()
+    result = pipeline.compare(base64.b64decode(png_base64), test_name, screenshot_dir, ignore_regions)
+    if pipeline.keep_success or (result is not None and not result.matched):
+        pipeline.submit(png_base64, os.path.join(screenshot_dir, file_name), compare=False)
+    return result
@@ -0,0 +1,191 @@
+"""
+Fan-out of the login flow over many tenants.
+
+Tenants come from the "tenants" sheet of the test data workbook. Each tenant's
+login runs in its own incognito-like browser context (separate cookies, storage
+and cache) created through the DevTools protocol inside a few shared Chrome
+processes, so checking hundreds of tenants costs the memory of a few browsers.
+Results are aggregated per tenant.
+"""
+import json
+import logging
+import os
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from utils.browser_profiles import apply_page_settings
+from utils.driver_pool import DriverPool, create_headless_chrome
+from utils.test_data import iter_test_rows
+from utils.timing import timed_step
+
+# Shared browser processes used by one fan-out run
+DEFAULT_FANOUT_BROWSERS = int(os.environ.get("TENANT_FANOUT_BROWSERS", "4"))
+TENANTS_SHEET = "tenants"
+
+
+def load_tenants(file_path, sheet=TENANTS_SHEET):
+    """
+    Read the tenants to check from the test data workbook.
+
+    Expected columns: ``tenant``, ``url``, ``username``, ``password`` and optionally
+    ``expected`` ("success", the default, or "failure" for tenants that must reject the login,
+    such as invalid tenants). A tenant may appear on several rows, one per user.
+
+    :return: List of row dicts; empty when the workbook or the sheet is missing.
+    """
+    try:
+        return [row for row in iter_test_rows(file_path, sheet) if row.get("tenant") and row.get("url")]
+    except KeyError:
+        logging.warning(f"No '{sheet}' sheet in {file_path}; no tenants to check.")
+        return []
+
+
+class TenantResult:
+    """Outcome of one tenant login."""
+
+    def __init__(self, tenant, url, username, expected, succeeded, duration, error=None, landing_url=None):
+        self.tenant = tenant
+        self.url = url
+        self.username = username
+        self.expected = expected
+        self.succeeded = succeeded
+        self.duration = duration
+        self.error = error
+        self.landing_url = landing_url
+
+    @property
+    def passed(self):
+        """The login behaved as the tenant row expects."""
+        return self.succeeded == (self.expected != "failure")
+
+    def as_dict(self):
+        return {
+            "tenant": self.tenant, "url": self.url, "username": self.username, "expected": self.expected,
+            "succeeded": self.succeeded, "passed": self.passed, "duration": self.duration,
+            "error": self.error, "landing_url": self.landing_url,
+        }
+
+
+@contextmanager
+def isolated_context(driver):
+    """
+    Run a block in a fresh browser context of a shared browser, then dispose of the context.
+
+    The context has its own cookies, storage and cache, like an incognito window; the driver
+    is switched to its page for the duration of the block.
+
+    :param driver: WebDriver instance of a Chromium-based browser.
+    """
+    original_handle = driver.current_window_handle
+    context_id = driver.execute_cdp_cmd("Target.createBrowserContext", {})["browserContextId"]
+    try:
+        target = driver.execute_cdp_cmd("Target.createTarget", {"url": "about:blank", "browserContextId": context_id})
+        driver.switch_to.window(target["targetId"])  # ChromeDriver window handles are target ids
+        apply_page_settings(driver)
+        yield driver
+    finally:
+        driver.switch_to.window(original_handle)
+        # Disposing of the context also closes its page
+        driver.execute_cdp_cmd("Target.disposeBrowserContext", {"browserContextId": context_id})
+
+
+class TenantFanout:
+    """
+    Runs a login callable for many tenants over a few shared browsers.
+
+    :param login: Callable ``login(driver, tenant_row)`` that raises if the login fails.
+    :param browsers: Number of browser processes, each working through the tenant queue.
+    :param factory: Callable returning a new WebDriver instance.
+    """
+
+    def __init__(self, login, browsers=DEFAULT_FANOUT_BROWSERS, factory=create_headless_chrome):
+        self.login = login
+        self.browsers = max(1, browsers)
+        self.factory = factory
+
+    def _check(self, driver, row):
+        # openpyxl returns booleans and numbers for cells that do not hold text
+        expected = str(row.get("expected") or "success").strip().lower()
+        start = time.perf_counter()
+        error = landing_url = None
+        try:
+            with isolated_context(driver):
+                with timed_step("tenant.login", locator=row["tenant"]):
+                    self.login(driver, row)
+                landing_url = driver.current_url
+            succeeded = True
+        except Exception as e:  # Recorded per tenant; one tenant must not stop the fan-out
+            succeeded = False
+            error = f"{type(e).__name__}: {e}"
+        result = TenantResult(row["tenant"], row["url"], row.get("username"), expected, succeeded,
+                              time.perf_counter() - start, error, landing_url)
+        log = logging.info if result.passed else logging.error
+        log(f"Tenant '{result.tenant}' ({result.username}): login {'succeeded' if succeeded else 'failed'}, "
+            f"expected {expected}, {result.duration:.2f} s.{f' {error}' if error else ''}")
+        return result
+
+    def _work(self, pool, tenants, results):
+        with pool.lease() as driver:
+            while True:
+                try:
+                    index, row = tenants.get_nowait()
+                except queue.Empty:
+                    return
+                results[index] = self._check(driver, row)
+
+    def run(self, tenants):
+        """
+        Check every tenant row.
+
+        :param tenants: Rows from load_tenants().
+        :return: List of TenantResult in the order of the rows.
+        """
+        browsers = min(self.browsers, len(tenants)) or 1
+        work = queue.Queue()
+        for index, row in enumerate(tenants):
+            work.put((index, row))
+        results = [None] * len(tenants)
+        pool = DriverPool(size=browsers, factory=self.factory).start()
+        try:
+            with ThreadPoolExecutor(max_workers=browsers, thread_name_prefix="tenant-fanout") as executor:
+                for future in [executor.submit(self._work, pool, work, results) for _ in range(browsers)]:
+                    future.result()
+        finally:
+            pool.close()
+        return results
+
+
+def summarize(results):
+    """
+    Aggregate results per tenant.
+
+    :return: Dict with overall counts and, per tenant, checks, passed, failed, max duration and errors.
+    """
+    tenants = {}
+    for result in results:
+        entry = tenants.setdefault(result.tenant, {"url": result.url, "checks": 0, "passed": 0, "failed": 0,
+                                                   "max_duration": 0.0, "errors": []})
+        entry["checks"] += 1
+        entry["passed" if result.passed else "failed"] += 1
+        entry["max_duration"] = max(entry["max_duration"], result.duration)
+        if not result.passed:
+            entry["errors"].append(f"{result.username}: {result.error or 'login succeeded but failure was expected'}")
+    return {
+        "tenants": len(tenants),
+        "checks": len(results),
+        "failed_tenants": sorted(name for name, entry in tenants.items() if entry["failed"]),
+        "by_tenant": tenants,
+    }
+
+
+def write_tenant_report(results, path):
+    """Write the per-tenant summary and the individual results as JSON; return the summary."""
+    summary = summarize(results)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"summary": summary, "results": [result.as_dict() for result in results]}, f, indent=2)
+    logging.info(f"Tenant report written to {path}: {summary['tenants']} tenants, "
+                 f"{len(summary['failed_tenants'])} with failures.")
+    return summary
@@ -0,0 +1,156 @@
+"""
+Cached access to the Excel test data.
+
+The workbook is converted once into a SQLite file keyed on the source file's
+mtime, size and SHA-256 hash. Later reads stream rows straight from SQLite;
+openpyxl is only imported when the cache is missing or stale.
+"""
+import datetime
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+
+import pytest
+
+CACHE_DIR_NAME = ".test_data_cache"
+CACHE_FORMAT_VERSION = "1"
+
+
+def _cache_path(file_path):
+    directory = os.path.join(os.path.dirname(os.path.abspath(file_path)), CACHE_DIR_NAME)
+    return os.path.join(directory, os.path.basename(file_path) + ".sqlite")
+
+
+def _file_hash(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _json_value(value):
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta):  # Duration cells
+        return value.total_seconds()
+    return str(value)
+
+
+def _read_meta(connection):
+    try:
+        return dict(connection.execute("SELECT key, value FROM meta"))
+    except sqlite3.DatabaseError:
+        return {}
+
+
+def _build_cache(file_path, cache_path, stat, file_hash):
+    """Convert every sheet of the workbook into a fresh SQLite cache file."""
+    from openpyxl import load_workbook  # Only needed when the cache is stale
+
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path), suffix=".tmp")
+    os.close(fd)
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        connection = sqlite3.connect(tmp_path)
+        with connection:
+            connection.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+            connection.execute("CREATE TABLE sheets (position INTEGER PRIMARY KEY, name TEXT, columns TEXT)")
+            connection.execute("CREATE TABLE rows (sheet INTEGER, idx INTEGER, data TEXT, PRIMARY KEY (sheet, idx))")
+            for position, sheet in enumerate(workbook.worksheets):
+                rows = sheet.iter_rows(values_only=True)
+                header = next(rows, None) or ()
+                columns = [str(c) if c is not None else f"column_{i}" for i, c in enumerate(header)]
+                connection.execute("INSERT INTO sheets VALUES (?, ?, ?)", (position, sheet.title, json.dumps(columns)))
+                connection.executemany(
+                    "INSERT INTO rows VALUES (?, ?, ?)",
+                    (
+                        (position, idx, json.dumps([_json_value(v) for v in row]))
+                        for idx, row in enumerate(rows)
+                        if any(v is not None for v in row)
+                    ),
+                )
+            connection.executemany("INSERT INTO meta VALUES (?, ?)", [
+                ("version", CACHE_FORMAT_VERSION),
+                ("mtime_ns", str(stat.st_mtime_ns)),
+                ("size", str(stat.st_size)),
+                ("sha256", file_hash),
+            ])
+        connection.close()
+        os.replace(tmp_path, cache_path)  # Atomic, so parallel workers never see a partial cache
+    finally:
+        workbook.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    logging.info(f"Test data cache rebuilt from {file_path}.")
+
+
+def _open_cache(file_path):
+    """Return a connection to an up-to-date cache of the workbook, rebuilding it if needed."""
+    cache_path = _cache_path(file_path)
+    stat = os.stat(file_path)
+    file_hash = None
+    if os.path.exists(cache_path):
+        connection = sqlite3.connect(cache_path)
+        meta = _read_meta(connection)
+        if meta.get("version") == CACHE_FORMAT_VERSION:
+            if meta.get("mtime_ns") == str(stat.st_mtime_ns) and meta.get("size") == str(stat.st_size):
+                return connection
+            # The file was touched; only rebuild if its content actually changed
+            file_hash = _file_hash(file_path)
+            if meta.get("sha256") == file_hash:
+                with connection:
+                    connection.execute("UPDATE meta SET value = ? WHERE key = 'mtime_ns'", (str(stat.st_mtime_ns),))
+                    connection.execute("UPDATE meta SET value = ? WHERE key = 'size'", (str(stat.st_size),))
+                return connection
+        connection.close()
+    _build_cache(file_path, cache_path, stat, file_hash or _file_hash(file_path))
+    return sqlite3.connect(cache_path)
+
+
+def iter_test_rows(file_path, sheet=None):
+    """
+    Lazily yield the rows of a test data workbook as dictionaries keyed by header.
+
+    :param file_path: Path to the Excel file.
+    :param sheet: Sheet name or position; defaults to the first sheet.
+    :return: Generator of dicts, one per non-empty data row.
+    """
+    if not os.path.exists(file_path):
+        logging.warning(f"Test data file not found: {file_path}")
+        return
+    connection = _open_cache(file_path)
+    try:
+        if sheet is None or isinstance(sheet, int):
+            found = connection.execute("SELECT position, columns FROM sheets WHERE position = ?", (sheet or 0,)).fetchone()
+        else:
+            found = connection.execute("SELECT position, columns FROM sheets WHERE name = ?", (sheet,)).fetchone()
+        if found is None:
+            raise KeyError(f"Sheet {sheet!r} not found in {file_path}")
+        position, columns = found[0], json.loads(found[1])
+        for (data,) in connection.execute("SELECT data FROM rows WHERE sheet = ? ORDER BY idx", (position,)):
+            yield dict(zip(columns, json.loads(data)))
+    finally:
+        connection.close()
+
+
+def load_test_cases(file_path, sheet=None, id_column=None):
+    """
+    Build pytest parameters for each test data row, for use with pytest.mark.parametrize.
+
+    :param file_path: Path to the Excel file.
+    :param sheet: Sheet name or position; defaults to the first sheet.
+    :param id_column: Column used as the test id; row numbers are used otherwise.
+    :return: List of pytest.param objects (pytest requires a collection, not a generator).
+    """
+    cases = []
+    for index, row in enumerate(iter_test_rows(file_path, sheet)):
+        test_id = str(row.get(id_column)) if id_column and row.get(id_column) is not None else f"row{index}"
+        cases.append(pytest.param(row, id=test_id))
+    return cases
@@ -0,0 +1,181 @@
+"""
+Per-step timing instrumentation for the test harness.
+
+Steps (wait helpers, fixtures, flow functions) are timed into an in-memory
+histogram together with the number of WebDriver commands they issued. At the
+end of a session the histogram is written as JSON and CSV with p50/p95/p99
+latencies per step.
+"""
+import csv
+import functools
+import inspect
+import json
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+_local = threading.local()
+
+
+def _command_count():
+    return getattr(_local, "commands", 0)
+
+
+def instrument_driver(driver):
+    """
+    Count the WebDriver commands a driver sends, attributed to the calling thread.
+
+    :param driver: WebDriver instance; its execute method is wrapped in place.
+    :return: The same driver.
+    """
+    if getattr(driver, "_timing_instrumented", False):
+        return driver
+    execute = driver.execute
+
+    @functools.wraps(execute)
+    def counting_execute(*args, **kwargs):
+        _local.commands = _command_count() + 1
+        return execute(*args, **kwargs)
+
+    driver.execute = counting_execute
+    driver._timing_instrumented = True
+    return driver
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class StepHistogram:
+    """Thread-safe store of step durations and command counts."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._durations = {}
+        self._commands = {}
+        self._failures = {}
+        self._locators = {}
+
+    def record(self, name, duration, commands=0, locator=None, failed=False):
+        with self._lock:
+            self._durations.setdefault(name, []).append(duration)
+            self._commands[name] = self._commands.get(name, 0) + commands
+            self._failures[name] = self._failures.get(name, 0) + (1 if failed else 0)
+            if locator:
+                self._locators.setdefault(name, set()).add(locator)
+
+    def durations(self, name):
+        """Return a copy of the recorded durations of a step (seconds)."""
+        with self._lock:
+            return list(self._durations.get(name, ()))
+
+    def summary(self):
+        """
+        Summarize every step.
+
+        :return: List of dicts with count, failures, mean/p50/p95/p99/max (seconds) and commands.
+        """
+        with self._lock:
+            items = [(name, sorted(values)) for name, values in self._durations.items()]
+            commands = dict(self._commands)
+            failures = dict(self._failures)
+            locators = {name: sorted(values) for name, values in self._locators.items()}
+        rows = []
+        for name, values in sorted(items):
+            rows.append({
+                "step": name,
+                "locators": " | ".join(locators.get(name, [])),
+                "count": len(values),
+                "failures": failures.get(name, 0),
+                "mean": sum(values) / len(values),
+                "p50": percentile(values, 0.50),
+                "p95": percentile(values, 0.95),
+                "p99": percentile(values, 0.99),
+                "max": values[-1],
+                "commands": commands.get(name, 0),
+                "commands_per_call": commands.get(name, 0) / len(values),
+            })
+        return rows
+
+    def reset(self):
+        with self._lock:
+            self._durations.clear()
+            self._commands.clear()
+            self._failures.clear()
+            self._locators.clear()
+
+
+# Process-wide histogram used by the helpers and fixtures
+histogram = StepHistogram()
+
+
+@contextmanager
+def timed_step(name, locator=None):
+    """
+    Time a block of code as a named step.
+
+    :param name: Step name, e.g. "wait.clickable" or "flow.join_event_in_lobby".
+    :param locator: Optional locator description recorded with the step.
+    """
+    start = time.perf_counter()
+    commands_before = _command_count()
+    failed = False
+    try:
+        yield
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        histogram.record(name, time.perf_counter() - start, _command_count() - commands_before, locator, failed)
+
+
+def timed(name=None):
+    """
+    Decorator timing every call of a function as a step.
+
+    When the function takes ``by`` and ``value`` arguments they are recorded as the locator.
+
+    :param name: Step name; defaults to the function name.
+    """
+    def decorator(func):
+        step_name = name or func.__name__
+        signature = inspect.signature(func)
+        has_locator = "by" in signature.parameters and "value" in signature.parameters
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            locator = None
+            if has_locator:
+                bound = signature.bind_partial(*args, **kwargs).arguments
+                if "value" in bound:
+                    locator = f"{bound.get('by')}={bound['value']}"
+            with timed_step(step_name, locator):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def write_timing_report(path_prefix):
+    """
+    Write the step summary as "<path_prefix>.json" and "<path_prefix>.csv".
+
+    :param path_prefix: Output path without extension.
+    :return: The summary rows that were written.
+    """
+    rows = histogram.summary()
+    os.makedirs(os.path.dirname(path_prefix) or ".", exist_ok=True)
+    with open(f"{path_prefix}.json", "w") as f:
+        json.dump(rows, f, indent=2)
+    with open(f"{path_prefix}.csv", "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ["step"])
+        writer.writeheader()
+        writer.writerows(rows)
+    logging.info(f"Step timing report written to {path_prefix}.json and {path_prefix}.csv ({len(rows)} steps).")
+    return rows
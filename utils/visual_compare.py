@@ -0,0 +1,173 @@
+"""
+Visual regression checks against the baselines in data/expected_images.
+
+Each screenshot is decoded once. Pillow's C difference of the two frames gives
+the bounding box of every changed pixel; frames that are exactly the baseline
+(byte-equal PNG or an empty box) stop there, and the per-pixel threshold runs
+with NumPy over that box only. A perceptual difference hash of failed frames is
+reported to tell a shifted layout from a changed one.
+"""
+import io
+import logging
+import os
+from collections import namedtuple
+from functools import lru_cache
+
+# Plain imports: this module is itself only imported on the first comparison (see
+# utils/screenshot_helpers.py), and the comparisons run on several pipeline threads
+import numpy as np
+from PIL import Image, ImageChops
+
+EXPECTED_IMAGES_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "expected_images")
+BASELINE_SUFFIX = "_Expected.png"
+
+# Per-channel difference (0-255) above which a pixel counts as changed
+DEFAULT_PIXEL_THRESHOLD = 16
+# Fraction of changed pixels tolerated before a comparison fails
+DEFAULT_TOLERANCE = 0.001
+# Side of the difference hash; 16 gives a 256-bit fingerprint
+HASH_SIZE = 16
+
+ComparisonResult = namedtuple(
+    "ComparisonResult", ["matched", "diff_ratio", "diff_pixels", "hash_distance", "diff_path"]
+)
+
+
+def _load_rgb(image):
+    """Accept a path, PNG bytes or PIL image and return it as an RGB PIL image."""
+    if isinstance(image, (bytes, bytearray)):
+        image = Image.open(io.BytesIO(image))
+    elif isinstance(image, str):
+        image = Image.open(image)
+    # Screenshots are already RGB; convert() would copy the whole frame again
+    return image if image.mode == "RGB" else image.convert("RGB")
+
+
+def difference_hash(image, hash_size=HASH_SIZE):
+    """
+    Compute a difference hash (dHash) of an image.
+
+    :param image: PIL image.
+    :param hash_size: Hash side length.
+    :return: Boolean NumPy array of hash_size * hash_size bits.
+    """
+    small = image.convert("L").resize((hash_size + 1, hash_size), Image.BILINEAR, reducing_gap=2.0)
+    pixels = np.asarray(small, dtype=np.int16)
+    return (pixels[:, 1:] > pixels[:, :-1]).ravel()
+
+
+@lru_cache(maxsize=16)
+def _load_baseline(path, mtime_ns):
+    with open(path, "rb") as f:
+        png = f.read()
+    image = _load_rgb(png)
+    image.load()
+    return png, image, difference_hash(image)
+
+
+def baseline_path_for(test_name, expected_dir=EXPECTED_IMAGES_DIR):
+    """
+    Return the baseline image path for a test, or None when there is no baseline.
+
+    :param test_name: Test name, e.g. "Positive_Admin_Login_Test".
+    :param expected_dir: Directory holding the expected images.
+    """
+    path = os.path.normpath(os.path.join(expected_dir, f"{test_name}{BASELINE_SUFFIX}"))
+    return path if os.path.exists(path) else None
+
+
+def _ignore_mask(shape, ignore_regions):
+    """Build a boolean mask that is False inside the (left, top, right, bottom) ignore regions."""
+    mask = np.ones(shape[:2], dtype=bool)
+    for left, top, right, bottom in ignore_regions:
+        mask[max(top, 0):bottom, max(left, 0):right] = False
+    return mask
+
+
+def _write_diff_image(actual, changed, diff_path):
+    """Dim the actual screenshot and paint changed pixels red."""
+    overlay = (actual // 3).astype(np.uint8)
+    overlay[changed] = (255, 0, 0)
+    os.makedirs(os.path.dirname(diff_path) or ".", exist_ok=True)
+    Image.fromarray(overlay).save(diff_path, format="PNG")
+
+
+def compare_images(actual, expected, ignore_regions=(), pixel_threshold=DEFAULT_PIXEL_THRESHOLD,
+                   tolerance=DEFAULT_TOLERANCE, diff_path=None, exact_prefilter=True):
+    """
+    Compare a screenshot against an expected image.
+
+    :param actual: Screenshot as a path, PNG bytes or PIL image.
+    :param expected: Baseline as a path, PNG bytes or PIL image.
+    :param ignore_regions: Iterable of (left, top, right, bottom) boxes excluded from the comparison.
+    :param pixel_threshold: Per-channel difference above which a pixel counts as changed.
+    :param tolerance: Maximum fraction of changed pixels for the images to match.
+    :param diff_path: Where to write a diff image when the comparison fails.
+    :param exact_prefilter: Skip decoding when the screenshot is byte-for-byte the baseline PNG.
+    :return: ComparisonResult; hash_distance is only computed for failed comparisons.
+    """
+    if isinstance(expected, str):
+        expected_png, expected_image, expected_hash = _load_baseline(expected, os.stat(expected).st_mtime_ns)
+    else:
+        expected_png, expected_image, expected_hash = None, _load_rgb(expected), None
+    if exact_prefilter and expected_png is not None and isinstance(actual, (bytes, bytearray)) and actual == expected_png:
+        return ComparisonResult(True, 0.0, 0, 0, None)
+    actual_image = _load_rgb(actual)
+
+    if actual_image.size != expected_image.size:
+        logging.error(f"Screenshot size {actual_image.size} does not match baseline size {expected_image.size}.")
+        return ComparisonResult(False, 1.0, actual_image.width * actual_image.height, None, None)
+
+    # One pass in C; an empty bounding box means the frames are identical
+    delta_image = ImageChops.difference(actual_image, expected_image)
+    box = delta_image.getbbox()
+    if box is None:
+        return ComparisonResult(True, 0.0, 0, 0, None)
+
+    left, top, right, bottom = box
+    over = np.asarray(delta_image.crop(box)) > pixel_threshold
+    # OR-ing the channel planes is several times faster than a reduction over axis 2
+    changed = over[..., 0] | over[..., 1] | over[..., 2]
+    if ignore_regions:
+        mask = _ignore_mask((expected_image.height, expected_image.width), ignore_regions)
+        changed &= mask[top:bottom, left:right]
+        compared = int(np.count_nonzero(mask)) or 1
+    else:
+        compared = expected_image.width * expected_image.height
+
+    diff_pixels = int(np.count_nonzero(changed))
+    diff_ratio = diff_pixels / compared
+    matched = diff_ratio <= tolerance
+    hash_distance = None
+    if not matched:
+        if expected_hash is None:
+            expected_hash = difference_hash(expected_image)
+        hash_distance = int(np.count_nonzero(difference_hash(actual_image) != expected_hash))
+    if not matched and diff_path:
+        changed_frame = np.zeros((expected_image.height, expected_image.width), dtype=bool)
+        changed_frame[top:bottom, left:right] = changed
+        _write_diff_image(np.asarray(actual_image), changed_frame, diff_path)
+        logging.error(f"Visual difference of {diff_ratio:.2%} exceeds tolerance {tolerance:.2%}; diff saved at {diff_path}")
+    else:
+        diff_path = None
+    return ComparisonResult(matched, diff_ratio, diff_pixels, hash_distance, diff_path)
+
+
+def compare_to_baseline(actual, test_name, diff_dir=None, **kwargs):
+    """
+    Compare a screenshot with the baseline of a test, if one exists.
+
+    :param actual: Screenshot as a path, PNG bytes or PIL image.
+    :param test_name: Test name used to look up "<test_name>_Expected.png".
+    :param diff_dir: Directory for the diff image on failure; no diff image when None.
+    :param kwargs: Passed on to compare_images().
+    :return: ComparisonResult, or None when the test has no baseline.
+    """
+    baseline = baseline_path_for(test_name)
+    if baseline is None:
+        return None
+    diff_path = os.path.join(diff_dir, f"{test_name}_diff.png") if diff_dir else None
+    result = compare_images(actual, baseline, diff_path=diff_path, **kwargs)
+    if result.matched:
+        logging.info(f"Screenshot matches baseline for {test_name} ({result.diff_ratio:.3%} changed).")
+    return result
@@ -0,0 +1,304 @@
+"""
+Event-driven waits executed inside the page.
+
+Instead of polling the browser over WebDriver every 500 ms, each wait installs
+MutationObserver / readystatechange / hashchange listeners through a single
+async script and blocks until the condition fires or the timeout expires.
+Network readiness comes from a shim counting in-flight fetch/XHR requests.
+"""
+import json
+import logging
+import os
+import time
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+# Extra seconds granted to the WebDriver script timeout on top of the in-page deadline
+SCRIPT_TIMEOUT_MARGIN = 5
+
+# URL substrings of requests that never settle (long polling, analytics beacons) and must not hold off network idle
+NETWORK_IGNORE_PATTERNS = tuple(p for p in os.environ.get("NETWORK_IDLE_IGNORE", "").split(",") if p)
+
+# Page shim counting in-flight fetch/XHR requests. It is registered for every new document through
+# the DevTools protocol when the browser starts, and installed lazily by network waits otherwise
+# (requests started before a lazy install are not seen).
+NETWORK_SHIM = r"""
+(function (ignore) {
+    if (window.__netIdle) { return; }
+    // lastChange 0: a page without requests since its navigation started is already idle
+    var net = window.__netIdle = {inflight: 0, lastChange: 0, seq: 0, responses: []};
+    function ignored(url) {
+        for (var i = 0; i < ignore.length; i++) { if (String(url).indexOf(ignore[i]) !== -1) { return true; } }
+        return false;
+    }
+    function started() {
+        net.inflight++;
+        net.lastChange = performance.now();
+    }
+    function finished(method, url, status) {
+        net.inflight = Math.max(net.inflight - 1, 0);
+        net.lastChange = performance.now();
+        net.seq++;
+        net.responses.push({"seq": net.seq, "method": method, "url": String(url), "status": status});
+        if (net.responses.length > 200) { net.responses.shift(); }
+        window.dispatchEvent(new Event("__netidle"));
+    }
+    if (window.fetch) {
+        var originalFetch = window.fetch;
+        window.fetch = function (input, init) {
+            var url = input && input.url ? input.url : input;
+            var method = (init && init.method) || (input && input.method) || "GET";
+            if (ignored(url)) { return originalFetch.apply(this, arguments); }
+            started();
+            return originalFetch.apply(this, arguments).then(function (response) {
+                finished(method, response.url || url, response.status);
+                return response;
+            }, function (error) {
+                finished(method, url, 0);
+                throw error;
+            });
+        };
+    }
+    var open = XMLHttpRequest.prototype.open, send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.open = function (method, url) {
+        this.__netIdleRequest = [method, url];
+        return open.apply(this, arguments);
+    };
+    XMLHttpRequest.prototype.send = function () {
+        var xhr = this, request = xhr.__netIdleRequest || ["GET", ""];
+        if (!ignored(request[1])) {
+            started();
+            xhr.addEventListener("loadend", function () {
+                finished(request[0], xhr.responseURL || request[1], xhr.status);
+            });
+        }
+        return send.apply(this, arguments);
+    };
+})(""" + json.dumps(list(NETWORK_IGNORE_PATTERNS)) + ");"
+
+# JavaScript helpers shared by every in-page script: locator resolution and visibility checks
+# mirroring Selenium's By strategies and expected conditions.
+JS_LOCATOR_HELPERS = r"""
+function __resolveAll(by, value) {
+    var doc = document, out = [], i, nodes;
+    switch (by) {
+        case "id":
+            nodes = doc.querySelectorAll("[id=" + JSON.stringify(value) + "]"); break;
+        case "name":
+            nodes = doc.querySelectorAll("[name=" + JSON.stringify(value) + "]"); break;
+        case "class name":
+            nodes = doc.getElementsByClassName(value); break;
+        case "tag name":
+            nodes = doc.getElementsByTagName(value); break;
+        case "css selector":
+            nodes = doc.querySelectorAll(value); break;
+        case "xpath":
+            var snap = doc.evaluate(value, doc, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            for (i = 0; i < snap.snapshotLength; i++) { out.push(snap.snapshotItem(i)); }
+            return out;
+        case "link text":
+        case "partial link text":
+            var links = doc.getElementsByTagName("a");
+            for (i = 0; i < links.length; i++) {
+                var text = (links[i].innerText || "").trim();
+                if (by === "link text" ? text === value : text.indexOf(value) !== -1) { out.push(links[i]); }
+            }
+            return out;
+        default:
+            throw new Error("Unsupported locator strategy: " + by);
+    }
+    for (i = 0; i < nodes.length; i++) { out.push(nodes[i]); }
+    return out;
+}
+function __isVisible(el) {
+    if (!el || !el.isConnected) { return false; }
+    var style = window.getComputedStyle(el);
+    if (style.visibility === "hidden" || style.display === "none" || style.opacity === "0") { return false; }
+    return el.getClientRects().length > 0 && (el.offsetWidth > 0 || el.offsetHeight > 0);
+}
+function __isClickable(el) {
+    return __isVisible(el) && !el.disabled && el.getAttribute("aria-disabled") !== "true";
+}
+"""
+
+_WAIT_SCRIPT = JS_LOCATOR_HELPERS + r"""
+var kind = arguments[0], by = arguments[1], value = arguments[2];
+var timeoutMs = arguments[3], originalUrl = arguments[4], since = arguments[5], done = arguments[arguments.length - 1];
+var finished = false, observer = null, timer = null, fallback = null, idleTimer = null, scheduled = false;
+
+if (kind === "network_idle" || kind === "api_response") {
+    """ + NETWORK_SHIM + r"""
+}
+
+function check() {
+    var net = window.__netIdle;
+    switch (kind) {
+        case "ready":
+            return document.readyState === "complete" ? true : null;
+        case "network_idle":
+            // No fetch/XHR in flight for `value` ms once the DOM is parsed; third-party assets are not waited for
+            if (document.readyState === "loading" || net.inflight > 0) { return null; }
+            var quietFor = performance.now() - net.lastChange;
+            if (quietFor >= value) { return true; }
+            clearTimeout(idleTimer);
+            idleTimer = setTimeout(evaluate, value - quietFor);
+            return null;
+        case "api_response":
+            for (var r = 0; r < net.responses.length; r++) {
+                var response = net.responses[r];
+                if (response.seq > since && response.url.indexOf(value) !== -1) { return response; }
+            }
+            return null;
+        case "url_change":
+            return window.location.href !== originalUrl ? true : null;
+        case "present":
+            return __resolveAll(by, value)[0] || null;
+        case "visible":
+            var els = __resolveAll(by, value);
+            return els.length && __isVisible(els[0]) ? els[0] : null;
+        case "clickable":
+            var cands = __resolveAll(by, value);
+            return cands.length && __isClickable(cands[0]) ? cands[0] : null;
+    }
+    throw new Error("Unknown wait condition: " + kind);
+}
+function finish(result) {
+    if (finished) { return; }
+    finished = true;
+    if (observer) { observer.disconnect(); }
+    clearTimeout(timer);
+    clearTimeout(idleTimer);
+    clearInterval(fallback);
+    document.removeEventListener("readystatechange", evaluate, true);
+    document.removeEventListener("transitionend", schedule, true);
+    document.removeEventListener("animationend", schedule, true);
+    window.removeEventListener("hashchange", evaluate, true);
+    window.removeEventListener("popstate", evaluate, true);
+    window.removeEventListener("__netidle", evaluate, true);
+    done(result);
+}
+function evaluate() {
+    scheduled = false;
+    if (finished) { return; }
+    try {
+        var result = check();
+        if (result) { finish(result); }
+    } catch (e) {
+        finish({"error": String(e && e.message || e)});
+    }
+}
+function schedule() {
+    // Coalesce bursts of mutations into one check per animation frame
+    if (!scheduled) { scheduled = true; window.requestAnimationFrame(evaluate); }
+}
+
+evaluate();
+if (!finished) {
+    observer = new MutationObserver(schedule);
+    observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+    document.addEventListener("readystatechange", evaluate, true);
+    document.addEventListener("transitionend", schedule, true);
+    document.addEventListener("animationend", schedule, true);
+    window.addEventListener("hashchange", evaluate, true);
+    window.addEventListener("popstate", evaluate, true);
+    window.addEventListener("__netidle", evaluate, true);
+    // In-page safety net for changes no event reports (pushState, stylesheet-driven visibility)
+    fallback = setInterval(evaluate, 250);
+    timer = setTimeout(function () { finish(null); }, timeoutMs);
+}
+"""
+
+
+# Resolve a list of [by, value] locators and report presence, visibility and text for each
+BATCH_QUERY_SCRIPT = JS_LOCATOR_HELPERS + r"""
+var locators = arguments[0], results = [];
+for (var i = 0; i < locators.length; i++) {
+    try {
+        var els = __resolveAll(locators[i][0], locators[i][1]), first = els[0] || null;
+        results.push({
+            "count": els.length,
+            "present": els.length > 0,
+            "visible": __isVisible(first),
+            "text": first ? (first.innerText || first.textContent || "").trim() : null,
+            "element": first
+        });
+    } catch (e) {
+        results.push({"error": String(e && e.message || e)});
+    }
+}
+return results;
+"""
+
+
+def _is_navigation_error(error):
+    """Tell whether a script failure was caused by the page navigating away."""
+    message = str(error.msg or "").lower()
+    return any(marker in message for marker in ("unload", "navigat", "execution context", "detached"))
+
+
+def install_network_shim(driver):
+    """
+    Register the fetch/XHR tracking shim for every document the browser loads from now on.
+
+    Uses Page.addScriptToEvaluateOnNewDocument, so the shim sees requests from the very start
+    of each page. Browsers without the DevTools protocol fall back to the lazy install done by
+    the network waits.
+
+    :param driver: WebDriver instance.
+    """
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": NETWORK_SHIM})
+    except (AttributeError, WebDriverException) as e:
+        logging.debug(f"Network shim not registered through DevTools, installing lazily: {e}")
+
+
+def network_sequence(driver):
+    """
+    Return the number of fetch/XHR responses the current page has completed so far.
+
+    Take it before an action and pass it as ``since`` to only match responses the action caused.
+    """
+    return driver.execute_script(NETWORK_SHIM + "return window.__netIdle.seq;")
+
+
+def wait_for_condition(driver, kind, by=None, value=None, timeout=10, original_url=None, since=0):
+    """
+    Block until a condition becomes true inside the page.
+
+    :param driver: WebDriver instance.
+    :param kind: One of "ready", "url_change", "present", "visible", "clickable",
+                 "network_idle" (value: quiet period in ms) or "api_response" (value: URL substring).
+    :param by: Locator strategy for element conditions (e.g., By.ID, By.XPATH).
+    :param value: Locator value for element conditions; see ``kind`` for network conditions.
+    :param timeout: Maximum time to wait in seconds.
+    :param original_url: URL to wait for a change from ("url_change" only).
+    :param since: Only match responses completed after this network_sequence() ("api_response" only).
+    :return: The WebElement for element conditions, the response ({"url", "status", "method", "seq"})
+             for "api_response", True otherwise.
+    :raises TimeoutException: If the condition did not fire within the timeout.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        driver.set_script_timeout(remaining + SCRIPT_TIMEOUT_MARGIN)
+        try:
+            result = driver.execute_async_script(
+                _WAIT_SCRIPT, kind, by, value, int(remaining * 1000), original_url, since
+            )
+        except TimeoutException:
+            break
+        except WebDriverException as e:
+            if not _is_navigation_error(e):
+                raise
+            # The document was replaced while the script was waiting; re-install on the new page
+            logging.debug(f"Wait script interrupted by navigation, retrying: {e.msg}")
+            continue
+        if isinstance(result, dict) and "error" in result:
+            raise WebDriverException(f"Wait condition '{kind}' failed in page: {result['error']}")
+        if result:
+            return result
+        break
+    target = f" for {by}='{value}'" if by else f" for {value!r}" if value is not None else ""
+    raise TimeoutException(f"Condition '{kind}'{target} not met within {timeout} seconds.")
@@ -1,19 +1,21 @@
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
-from selenium.webdriver.common.by import By
+from utils.artifact_recorder import record_step
+from utils.locators import GlobalLibraryPage, LobbyPage, click, gallery_link
+from utils.resilience import current_page, page_of, resilient
+from utils.timing import timed
+from utils.wait_engine import BATCH_QUERY_SCRIPT, wait_for_condition
 
 
 import logging
 import os
 import time
 
-def ensure_directory_exists(directory):
-    """Ensure that a directory exists."""
-    if not os.path.exists(directory):
-        os.makedirs(directory)
+# Quiet period (ms) without fetch/XHR activity after which a page counts as loaded
+NETWORK_IDLE_MS = int(os.environ.get("NETWORK_IDLE_MS", "500"))
 
 
+@timed()
+@resilient(key=lambda arguments: page_of(arguments["original_url"]))
 def wait_for_url_to_change(driver, original_url, timeout=10):
     """
     Wait until the URL of the page changes from the original URL.
@@ -23,28 +25,72 @@ def wait_for_url_to_change(driver, original_url, timeout=10):
     :param timeout: Maximum time to wait for the URL to change.
     """
     try:
-        WebDriverWait(driver, timeout).until(EC.url_changes(original_url))
+        wait_for_condition(driver, "url_change", timeout=timeout, original_url=original_url)
         logging.info("URL has changed from the original URL.")
     except TimeoutException:
         logging.error(f"Timed out waiting for URL to change from {original_url}.")
         raise  # Re-raise the exception to indicate failure
 
-def wait_for_page_to_load(driver, timeout=30):
+@timed()
+@resilient(key=current_page)
+def wait_for_page_to_load(driver, timeout=30, idle_ms=NETWORK_IDLE_MS):
     """
-    Wait for the page to fully load by checking document.readyState.
-    
+    Wait for the page to be ready: DOM parsed and no fetch/XHR request in flight for `idle_ms`.
+
+    Unlike document.readyState, this waits for the data an SPA loads after "complete"
+    and does not wait for slow third-party assets.
+
     :param driver: WebDriver instance.
     :param timeout: Maximum time to wait for the page to load.
+    :param idle_ms: Quiet period that counts as idle.
     """
     try:
-        WebDriverWait(driver, timeout).until(
-            lambda d: d.execute_script("return document.readyState") == "complete"
-        )
+        wait_for_condition(driver, "network_idle", value=idle_ms, timeout=timeout)
         logging.info("Page loaded completely.")
     except TimeoutException:
         logging.error(f"Page did not load completely within {timeout} seconds.")
         raise  # Re-raise the exception to indicate failure
 
+@timed()
+@resilient(key=current_page)
+def wait_for_network_idle(driver, idle_ms=NETWORK_IDLE_MS, timeout=30):
+    """
+    Wait until no fetch/XHR request has been in flight for `idle_ms`.
+
+    :param driver: WebDriver instance.
+    :param idle_ms: Quiet period that counts as idle.
+    :param timeout: Maximum time to wait.
+    """
+    try:
+        wait_for_condition(driver, "network_idle", value=idle_ms, timeout=timeout)
+        logging.info(f"Network idle for {idle_ms} ms.")
+    except TimeoutException:
+        logging.error(f"Network did not become idle within {timeout} seconds.")
+        raise
+
+@timed()
+@resilient()
+def wait_for_api_response(driver, url, timeout=30, since=0):
+    """
+    Wait for a fetch/XHR response whose URL contains `url`.
+
+    :param driver: WebDriver instance.
+    :param url: Substring of the response URL, e.g. "/api/events".
+    :param timeout: Maximum time to wait.
+    :param since: Only match responses completed after this network_sequence(driver) value;
+                  take it before the action that triggers the request.
+    :return: Dict with "url", "status", "method" and "seq" of the response.
+    """
+    try:
+        response = wait_for_condition(driver, "api_response", value=url, timeout=timeout, since=since)
+        logging.info(f"Response {response['status']} received from {response['url']}.")
+        return response
+    except TimeoutException:
+        logging.error(f"No response from a URL containing '{url}' within {timeout} seconds.")
+        raise
+
+@timed()
+@resilient()
 def wait_for_element_to_be_visible(driver, by, value, timeout=20):
     """
     Wait for an element to be visible.
@@ -56,13 +102,21 @@ def wait_for_element_to_be_visible(driver, by, value, timeout=20):
     :return: The WebElement if found.
     """
     try:
-        WebDriverWait(driver, timeout).until(EC.visibility_of_element_located((by, value)))
+        element = wait_for_condition(driver, "visible", by, value, timeout=timeout)
         logging.info(f"Element located with {by}='{value}' is now visible.")
+        return element
     except TimeoutException:
         logging.error(f"Timeout while waiting for element with {by}='{value}' to become visible after {timeout} seconds.")
         raise  # Re-raise the exception to indicate failure
 
 
+def _record_element_not_found(arguments, error):
+    # Once per call, after the retries: the snapshot is written with the test's artifacts if the test fails
+    record_step(arguments["driver"], f"element_not_found_{arguments['by']}={arguments['value']}", error=error)
+
+
+@timed()
+@resilient(on_failure=_record_element_not_found)
 def wait_for_element_to_be_visible_and_clickable(driver, by, value, timeout=20):
     """
     Wait for an element to be visible and clickable.
@@ -74,44 +128,20 @@ def wait_for_element_to_be_visible_and_clickable(driver, by, value, timeout=20):
     :return: WebElement if found, else raise TimeoutException.
     """
     start_time = time.time()
-    screenshots_dir = "logs/screenshots"
-    ensure_directory_exists(screenshots_dir)
 
     try:
-        # Wait for the page to fully load before locating the element
-        wait_for_page_to_load(driver, timeout=timeout)
-
-        # Wait for the element to be clickable
-        element = WebDriverWait(driver, timeout).until(
-            EC.element_to_be_clickable((by, value))
-        )
+        # The element's own condition is enough; network idle is left to explicit page-load waits,
+        # since long-polling requests would otherwise hold every element wait until its timeout
+        element = wait_for_condition(driver, "clickable", by, value, timeout=timeout)
         elapsed_time = time.time() - start_time
         logging.info(f"Element located with {by}='{value}' and clickable after {elapsed_time:.2f} seconds.")
         return element
     except Exception as e:
-        # Log the failure and save a screenshot
-        elapsed_time = time.time() - start_time
-        screenshot_path = os.path.join(screenshots_dir, f"element_not_found_{value}.png")
-        driver.save_screenshot(screenshot_path)
         logging.error(f"Failed to locate element with {by}='{value}' within {timeout} seconds: {e}")
-        logging.error(f"Screenshot saved at {screenshot_path}")
         raise
 
-def wait_for_url_to_change(driver, original_url, timeout=10):
-    """
-    Wait until the URL of the page changes from the original URL.
-
-    :param driver: WebDriver instance.
-    :param original_url: The URL to wait for a change from.
-    :param timeout: Maximum time to wait for the URL to change.
-    """
-    try:
-        WebDriverWait(driver, timeout).until(EC.url_changes(original_url))
-        logging.info("URL has changed from the original URL.")
-    except TimeoutException:
-        logging.error(f"Timed out waiting for URL to change from {original_url}.")
-        raise  # Re-raise the exception to indicate failure
-    
+@timed()
+@resilient()
 def wait_for_button_to_be_available(driver, by, value, timeout=10):
     """
     Wait for a button to be available for clicking after any animations are done.
@@ -123,14 +153,13 @@ def wait_for_button_to_be_available(driver, by, value, timeout=10):
     """
     try:
         # Wait for the button to be clickable (implicitly waits for visibility)
-        WebDriverWait(driver, timeout).until(
-            EC.element_to_be_clickable((by, value))
-        )
+        wait_for_condition(driver, "clickable", by, value, timeout=timeout)
         logging.info(f"Button located with {by}='{value}' is ready for interaction.")
     except Exception as e:
         logging.error(f"Button with {by}='{value}' is not clickable within {timeout} seconds: {e}")
         raise
 
+@timed()
 def verify_single_player_gallery_items_absence(driver):
     """
     Verify that unwanted items are absent in the gallery for a Single Player.
@@ -138,14 +167,12 @@ def verify_single_player_gallery_items_absence(driver):
     :param driver: WebDriver instance.
     """
     try:
-        # Locate and click on the Gallery button
-        gallery_button = wait_for_element_to_be_visible_and_clickable(driver, By.CLASS_NAME, "GlobalGalleryButton", timeout=5)
-        gallery_button.click()
+        # Locate and click on the Gallery button (reusing its handle while the page has not changed)
+        click(driver, LobbyPage.GLOBAL_GALLERY_BUTTON, timeout=5)
         logging.info("Clicked on the Global Gallery button.")
 
         # Locate the gallery container
-        gallery_container_xpath = "//div[contains(@class, 'GlobalLibraryMainContainer')]"
-        wait_for_element_to_be_visible_and_clickable(driver, By.XPATH, gallery_container_xpath)
+        wait_for_element_to_be_visible_and_clickable(driver, *GlobalLibraryPage.MAIN_CONTAINER)
         logging.info("Gallery is displayed successfully.")
 
         # Define unwanted hrefs or text that should not be present
@@ -155,26 +182,27 @@ def verify_single_player_gallery_items_absence(driver):
             "#/teams"        # Another item to check for absence
         ]
 
-        # Verify that each unwanted item is NOT displayed
-        for href in unwanted_items:
-            item_present = driver.find_elements(By.XPATH, f"{gallery_container_xpath}//a[@href='{href}']")
-            # Assert that the length of the list is 0, meaning the item should not exist
-            assert len(item_present) == 0, f"Unwanted item with href '{href}' should not be present, but it was found."
+        # Verify that each unwanted item is NOT displayed, checking all of them in one round trip
+        locators = [gallery_link(href) for href in unwanted_items]
+        for href, result in zip(unwanted_items, query_locators(driver, locators)):
+            assert not result["present"], f"Unwanted item with href '{href}' should not be present, but it was found."
             logging.info(f"Unwanted item with href '{href}' is not found as expected.")
 
     except Exception as e:
         logging.error(f"An error occurred while verifying Single Player gallery items absence: {e}")
         raise
+@timed()
 def verify_global_library_player_button_absence(driver):
     """
     Verify that the Global Library button is not present after login.
     """
     try:
-        wait_for_element_to_be_visible_and_clickable(driver, By.CLASS_NAME, "GlobalLibraryButton", timeout=5)
+        wait_for_element_to_be_visible_and_clickable(driver, *LobbyPage.GLOBAL_LIBRARY_BUTTON, timeout=5)
         assert False, "Global Library button should not be visible, but it was found."
     except TimeoutException:
         logging.info("Global Library button not found as expected.")
         
+@timed()
 def verify_global_library_player_button_presence(driver):
     """
     Check that the Global Library button is visible after login. 
@@ -183,30 +211,21 @@ def verify_global_library_player_button_presence(driver):
     :param driver: WebDriver instance.
     """
     try:
-        # XPath for the Global Library title to check if it's already open
-        global_library_title_xpath = "//div[contains(@class, 'GlobalLibraryTitle')]"
-
         # Check if the Global Library is currently open
-        global_library_open = is_element_present(driver, By.XPATH, global_library_title_xpath)
-        
-        if global_library_open:
+        global_library_state = query_locators(driver, [GlobalLibraryPage.TITLE])[0]
+
+        if global_library_state["present"]:
             logging.info("Global Library is currently open. Closing it.")
             # Implement logic to close the Global Library, assuming there's a close button
             close_global_library(driver)
 
-        # Try to find the Global Gallery button
-        global_gallery_button = wait_for_element_to_be_visible_and_clickable(driver, By.CLASS_NAME, "GlobalGalleryButton", timeout=5)
-        logging.info("Global Gallery button found.")
-
-        # Click on the Global Gallery button
-        global_gallery_button.click()
+        # Find and click the Global Gallery button
+        click(driver, LobbyPage.GLOBAL_GALLERY_BUTTON, timeout=5)
         logging.info("Clicked on the Global Gallery button.")
 
-        # Wait for the Global Library title to be visible after clicking the Gallery button
-        wait_for_element_to_be_visible_and_clickable(driver, By.XPATH, global_library_title_xpath, timeout=5)
-
-        # Assert that the Global Library title is displayed
-        assert driver.find_element(By.XPATH, global_library_title_xpath).is_displayed(), "Global Library title should be visible after clicking the gallery."
+        # Wait for the Global Library title to be visible after clicking the Gallery button.
+        # The in-page wait only resolves once the title is displayed, so no second lookup is needed.
+        wait_for_element_to_be_visible(driver, *GlobalLibraryPage.TITLE, timeout=5)
         logging.info("Global Library title found as expected after clicking Global Gallery button.")
 
     except TimeoutException:
@@ -215,6 +234,23 @@ def verify_global_library_player_button_presence(driver):
 
     logging.info("Global Library button interaction completed successfully.")
 
+@timed()
+def query_locators(driver, locators):
+    """
+    Resolve several locators in a single WebDriver round trip.
+
+    :param driver: WebDriver instance.
+    :param locators: List of (By, value) tuples or registered Locators.
+    :return: One dict per locator with "present", "visible", "text", "count" and "element"
+             (the first matching WebElement or None), in the order of the input.
+    """
+    results = driver.execute_script(BATCH_QUERY_SCRIPT, [[by, value] for by, value in locators])
+    for (by, value), result in zip(locators, results):
+        if "error" in result:
+            raise ValueError(f"Invalid locator {by}='{value}': {result['error']}")
+    return results
+
+@timed()
 def is_element_present(driver, by, value):
     """
     Check if an element is present in the DOM.
@@ -226,6 +262,7 @@ def is_element_present(driver, by, value):
     """
     return len(driver.find_elements(by, value)) > 0  # Returns True if found, False otherwise
     
+@timed()
 def close_global_library(driver):
     """
     Close the Global Library if it is open. 
@@ -235,6 +272,5 @@ def close_global_library(driver):
     """
     # Replace with the actual logic to close the Global Library, 
     # for example, clicking a close button.
-    close_button = wait_for_element_to_be_visible_and_clickable(driver, By.CLASS_NAME, "close_GlobalLibrary_button")  # Use the correct selector
-    close_button.click()
+    click(driver, GlobalLibraryPage.CLOSE_BUTTON)
     logging.info("Global Library closed.")
\ No newline at end of file